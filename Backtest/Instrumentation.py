@@ -0,0 +1,182 @@
+"""
+Named timing spans and counters around the hot paths of the analyses, evolution and storage.
+
+Instrumentation is off by default; span() then returns a shared no-op context manager and count()
+returns at once, so instrumented code pays one flag check per call. Enable it for a run with
+
+    with instrument() as recorder:
+        MomentumAnalysis(prices).sweep(...)
+    print(recorder.report())
+
+or by setting the BACKTEST_INSTRUMENT environment variable. Durations are recorded in the calling
+process only: spans inside process pool workers are not collected, while thread pool workers
+record into the same recorder.
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+PERCENTILES = (50, 90, 99)
+
+
+class Recorder():
+    """Collects the duration of every span and the total of every counter, by name. Thread safe."""
+
+    durations: Dict[str, array]
+    counters: Dict[str, int]
+
+    def __init__(self):
+        self.durations = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            samples = self.durations.get(name)
+            if samples is None:
+                samples = self.durations[name] = array("d")
+            samples.append(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.durations = {}
+            self.counters = {}
+
+    def _snapshot(self):
+        with self._lock:
+            durations = {name: array("d", samples) for (name, samples) in self.durations.items()}
+            return durations, dict(self.counters)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return {span: {calls, total, mean, p50, p90, p99, max}} in seconds, slowest total first."""
+        import numpy as np
+
+        stages = {}
+        for (name, samples) in self._snapshot()[0].items():
+            values = np.frombuffer(samples, dtype=np.float64)
+            stages[name] = {
+                "calls": len(values),
+                "total": float(values.sum()),
+                "mean": float(values.mean()),
+                **{f"p{q}": float(value) for (q, value) in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+                "max": float(values.max()),
+            }
+        return dict(sorted(stages.items(), key=lambda item: -item[1]["total"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"spans": self.summary(), "counters": dict(sorted(self._snapshot()[1].items()))}
+
+    def report(self, format: str = "table") -> str:
+        """
+        Return the per-stage totals, percentiles and the counters as a text table or as JSON.
+
+        Args:
+            format (str): "table" or "json". Defaults to "table".
+        """
+        if format == "json":
+            return json.dumps(self.to_dict(), indent=2)
+        if format != "table":
+            raise ValueError(f"Unknown report format '{format}'. Expected 'table' or 'json'.")
+
+        lines = [f"{'span':<36}{'calls':>8}{'total (s)':>12}{'mean (ms)':>12}"
+                 + "".join(f"{f'p{q} (ms)':>12}" for q in PERCENTILES) + f"{'max (ms)':>12}"]
+        for (name, stage) in self.summary().items():
+            lines.append(f"{name:<36}{stage['calls']:>8}{stage['total']:>12.3f}{stage['mean'] * 1e3:>12.3f}"
+                         + "".join(f"{stage[f'p{q}'] * 1e3:>12.3f}" for q in PERCENTILES)
+                         + f"{stage['max'] * 1e3:>12.3f}")
+        counters = self._snapshot()[1]
+        if counters:
+            lines.append("")
+            lines.append(f"{'counter':<36}{'total':>8}")
+            lines.extend(f"{name:<36}{total:>8}" for (name, total) in sorted(counters.items()))
+        return "\n".join(lines)
+
+
+class _Span():
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _recorder.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullSpan():
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_recorder = Recorder()
+_enabled = os.environ.get("BACKTEST_INSTRUMENT", "") not in ("", "0")
+
+
+def span(name: str):
+    """Return a context manager that records the time spent in its block under name."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def count(name: str, n: int = 1):
+    """Add n to the counter name."""
+    if _enabled:
+        _recorder.count(name, n)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def get_recorder() -> Recorder:
+    return _recorder
+
+
+@contextmanager
+def instrument(reset: bool = True, report: Optional[str] = None, format: str = "table"):
+    """
+    Enable instrumentation for the duration of the block and yield the recorder.
+
+    Args:
+        reset (bool): If True, clear earlier spans and counters first. Defaults to True.
+        report (str or Path, optional): A file the report is written to when the block ends.
+        format (str): The format of the report file, "table" or "json". Defaults to "table".
+    """
+    was_enabled = _enabled
+    if reset:
+        _recorder.reset()
+    enable()
+    try:
+        yield _recorder
+    finally:
+        if not was_enabled:
+            disable()
+        if report is not None:
+            with open(report, "w") as file:
+                file.write(_recorder.report(format) + "\n")
@@ -1,10 +1,105 @@
-from vectorbt.portfolio import Portfolio
-from typing import Any, Optional
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import scipy.stats as stats
+from typing import TYPE_CHECKING, Any, Optional, Callable, Dict, List, Sequence
 import numpy as np
 import pandas as pd
+from Backtest.Instrumentation import count, span
+from Backtest.models.ResultCache import ResultCache, data_fingerprint
+
+if TYPE_CHECKING:
+    # vectorbt, plotly, matplotlib and scipy take seconds to import, so they are imported where used.
+    from vectorbt.portfolio import Portfolio
+
+PORTFOLIO_METRICS: Dict[str, Callable[["Portfolio"], Any]] = {
+    "sharpe_ratio": lambda portfolio: portfolio.sharpe_ratio(),
+    "total_return": lambda portfolio: portfolio.total_return(),
+    "max_drawdown": lambda portfolio: portfolio.max_drawdown(),
+    "trade_count": lambda portfolio: portfolio.trades.count(),
+    "exposure": lambda portfolio: portfolio.position_coverage(),
+}
+
+def portfolio_metrics(portfolio: "Portfolio", metrics: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Return a table of metrics with one row per column (or group) of a vectorbt portfolio.
+
+    Args:
+        portfolio (Portfolio): The portfolio, usually simulating many parameter sets as columns.
+        metrics (list of str, optional): Keys of PORTFOLIO_METRICS to compute. Defaults to all of them.
+
+    Returns:
+        pd.DataFrame: The metrics, indexed like the portfolio's columns (or groups).
+    """
+    metrics = list(PORTFOLIO_METRICS) if metrics is None else metrics
+    values = {}
+    with span("analysis.metrics"):
+        for metric in metrics:
+            value = PORTFOLIO_METRICS[metric](portfolio)
+            values[metric] = value if isinstance(value, pd.Series) else pd.Series([value])
+    return pd.DataFrame(values)
+
+class MetricsRecord():
+    """
+    The metrics of one simulated portfolio, without the portfolio.
+
+    A vectorbt Portfolio keeps its prices, orders, trades and cached intermediate arrays alive, so a
+    list of thousands of them grows with bars and trades. A record keeps one float per metric, and
+    optionally an equity curve downsampled to a fixed number of points, so a list of records grows
+    only with the number of metrics.
+    """
+
+    METRICS = ("sharpe_ratio", "total_return", "max_drawdown", "trade_count", "exposure")
+    __slots__ = METRICS + ("equity",)
+
+    sharpe_ratio: float
+    total_return: float
+    max_drawdown: float
+    trade_count: float
+    exposure: float
+    equity: Optional[pd.Series]
+
+    def __init__(self, sharpe_ratio: float = np.nan, total_return: float = np.nan, max_drawdown: float = np.nan,
+                 trade_count: float = np.nan, exposure: float = np.nan, equity: Optional[pd.Series] = None):
+        self.sharpe_ratio = sharpe_ratio
+        self.total_return = total_return
+        self.max_drawdown = max_drawdown
+        self.trade_count = trade_count
+        self.exposure = exposure
+        self.equity = equity
+
+    @classmethod
+    def from_portfolio(cls, portfolio: "Portfolio", equity_points: Optional[int] = None) -> "MetricsRecord":
+        """
+        Return the record of a portfolio with a single column or group.
+
+        Args:
+            portfolio (Portfolio): The portfolio.
+            equity_points (int, optional): If given, keep the portfolio value at this many evenly spaced
+                bars (including the first and last) as a float32 series. Defaults to None (no equity curve).
+        """
+        values = {}
+        for metric in cls.METRICS:
+            value = np.asarray(PORTFOLIO_METRICS[metric](portfolio), dtype=np.float64)
+            if value.size != 1:
+                raise ValueError("MetricsRecord holds one portfolio column or group; use portfolio_metrics for many.")
+            values[metric] = float(value.item())
+
+        equity = None
+        if equity_points is not None:
+            value = portfolio.value()
+            positions = np.unique(np.linspace(0, len(value) - 1, min(equity_points, len(value))).round().astype(int))
+            equity = pd.Series(np.asarray(value)[positions].astype(np.float32), index=value.index[positions])
+        return cls(equity=equity, **values)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {metric: getattr(self, metric) for metric in self.METRICS}
+
+    def __repr__(self) -> str:
+        metrics = ", ".join(f"{metric}={getattr(self, metric):.4g}" for metric in self.METRICS)
+        return f"MetricsRecord({metrics})"
+
+def records_frame(records: Sequence[MetricsRecord], index: Any = None) -> pd.DataFrame:
+    """Return a table of records with one row per record and one column per metric."""
+    values = np.array([[getattr(record, metric) for metric in MetricsRecord.METRICS] for record in records],
+                      dtype=np.float64).reshape(len(records), len(MetricsRecord.METRICS))
+    return pd.DataFrame(values, index=index, columns=list(MetricsRecord.METRICS))
 
 def plot_table_statistics(data: np.ndarray, **kwargs):   
     """
@@ -16,6 +111,8 @@ def plot_table_statistics(data: np.ndarray, **kwargs):
         Returns:
         None
     """
+    import plotly.graph_objects as go
+    import scipy.stats as stats
 
     benchmark_stats = stats.describe(data)
 
@@ -49,6 +146,9 @@ def plot_statistics(data: np.ndarray, target: float = None, **kwargs):
         **kwargs: Additional keyword arguments to pass to the figure's layout. These can be any valid Plotly layout options.
 
     """
+    import plotly.graph_objects as go
+    import scipy.stats as stats
+
     mean = np.mean(data)
     variance = np.var(data)
     std_dev = np.sqrt(variance)
@@ -129,15 +229,25 @@ def plot_statistics(data: np.ndarray, target: float = None, **kwargs):
     fig.show()
 
 def plot_datetime_splits(data: np.ndarray, **kwargs):
-    datetime_ranges = [(pd.to_datetime(split[0]), pd.to_datetime(split[-1])) for split in data]
+    """
+    Plots the date range of each split as a horizontal line.
+
+    Args:
+        data (list): Each element holds the datetimes of one split. An element may also be a
+            (train, test) pair, e.g. WalkForwardResult.fold_splits, drawn in blue and orange.
+    """
+    import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    for i, (start, end) in enumerate(datetime_ranges):
-        ax.plot([start, end], [i, i], color='blue', marker='o', linewidth=5)
+    for i, split in enumerate(data):
+        parts = split if isinstance(split, tuple) else (split,)
+        for part, color in zip(parts, ('blue', 'orange')):
+            (start, end) = (pd.to_datetime(part[0]), pd.to_datetime(part[-1]))
+            ax.plot([start, end], [i, i], color=color, marker='o', linewidth=5)
 
-    ax.set_yticks(range(len(datetime_ranges)))
-    ax.set_yticklabels([f'Range {i+1}' for i in range(len(datetime_ranges))])
+    ax.set_yticks(range(len(data)))
+    ax.set_yticklabels([f'Range {i+1}' for i in range(len(data))])
 
     ax.xaxis_date()
     fig.autofmt_xdate()
@@ -148,7 +258,111 @@ def plot_datetime_splits(data: np.ndarray, **kwargs):
 
 class BaseAnalysis():
     price_data: Any
-    portfolio: Optional[Portfolio] = None
+    portfolio: Optional["Portfolio"] = None
+    result_cache: Optional[ResultCache] = None
+    _portfolio_key: Optional[str] = None
+    _fingerprint: Optional[tuple] = None
+
+    def fingerprint(self) -> str:
+        """Return the data_fingerprint of price_data, recomputed when price_data is replaced.
+
+        price_data is treated as immutable: modifying it in place does not change the fingerprint.
+        """
+        if self._fingerprint is None or self._fingerprint[0] is not self.price_data:
+            self._fingerprint = (self.price_data, data_fingerprint(self.price_data))
+        return self._fingerprint[1]
+
+    def to_record(self, equity_points: Optional[int] = None) -> MetricsRecord:
+        """Return the MetricsRecord of the current portfolio and release the portfolio.
+
+        Use this in large sweeps over splits to keep metrics instead of portfolios, e.g.
+        `analysis.MomentumBasedLongShort(15, 50); records.append(analysis.to_record())`.
+
+        Args:
+            equity_points (int, optional): Keep a downsampled equity curve with this many points.
+                Defaults to None.
+        """
+        if self.portfolio is None:
+            raise ValueError("No portfolio has been built yet.")
+        record = MetricsRecord.from_portfolio(self.portfolio, equity_points)
+        self.portfolio = None
+        self._portfolio_key = None
+        return record
+
+    def _run_portfolio(self, strategy: str, params: Dict[str, Any], overwrite: bool,
+                       build: Callable[[], "Portfolio"]) -> "Portfolio":
+        """Return self.portfolio, rebuilding it if it was built with other data, strategy or params.
+
+        A rebuilt portfolio is recorded in result_cache, so later sweeps over the same params reuse it.
+        """
+        key = ResultCache.key(self.fingerprint(), strategy, params)
+        if self.portfolio is None or overwrite or key != self._portfolio_key:
+            self.portfolio = build()
+            self._portfolio_key = key
+            count("portfolios_built")
+            if self.result_cache is not None:
+                self.result_cache.put(key, portfolio_metrics(self.portfolio), self.portfolio.returns())
+        return self.portfolio
+
+    def _cached_sweep(self, strategy: str, params: Sequence[Dict[str, Any]],
+                      simulate: Callable[[List[int]], "Portfolio"], metrics: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return the metrics table of a sweep, simulating only the params missing from result_cache.
+
+        Args:
+            strategy (str): The name of the strategy, part of the cache key.
+            params (sequence of dict): Every parameter set of the sweep.
+            simulate (callable): Takes positions into params and returns one portfolio simulating
+                those parameter sets in order, with the same number of columns (or groups) each.
+            metrics (list of str, optional): Keys of PORTFOLIO_METRICS to compute. Defaults to all of them.
+
+        Returns:
+            pd.DataFrame: The metrics with a default index, in the order of params. With a cache,
+                every metric is stored and metrics are float64.
+        """
+        if self.result_cache is None:
+            count("portfolios_built", len(params))
+            return portfolio_metrics(simulate(list(range(len(params)))), metrics)
+
+        metrics = list(PORTFOLIO_METRICS) if metrics is None else metrics
+        fingerprint = self.fingerprint()
+        keys = [ResultCache.key(fingerprint, strategy, param) for param in params]
+        tables = {}
+        for (position, key) in enumerate(keys):
+            cached = self.result_cache.get(key)
+            if cached is not None and set(metrics) <= set(cached[0].columns):
+                tables[position] = cached[0]
+
+        missing = [position for position in range(len(params)) if position not in tables]
+        count("result_cache.hits", len(params) - len(missing))
+        count("result_cache.misses", len(missing))
+        if missing:
+            count("portfolios_built", len(missing))
+            portfolio = simulate(missing)
+            table = portfolio_metrics(portfolio)
+            returns = portfolio.returns() if self.result_cache.store_returns else None
+            # A portfolio of a single column returns a Series, which cannot be sliced by column.
+            returns = returns.to_frame() if isinstance(returns, pd.Series) else returns
+            rows = len(table) // len(missing)
+            for (i, position) in enumerate(missing):
+                rows_slice = slice(i * rows, (i + 1) * rows)
+                tables[position] = table.iloc[rows_slice].reset_index(drop=True)
+                self.result_cache.put(keys[position], tables[position],
+                                      None if returns is None else returns.iloc[:, rows_slice])
+
+        table = pd.concat([tables[position] for position in range(len(params))], ignore_index=True)
+        return table[metrics]
+
+    @classmethod
+    def from_cube(cls, cube, start: Any = None, end: Any = None, **kwargs):
+        """Construct the analysis over a read-only view of a PriceCube between start and end.
+
+        Args:
+            cube (PriceCube): The memory mapped prices.
+            start (optional): The first timestamp to include. Defaults to the start of the cube.
+            end (optional): The last timestamp to include. Defaults to the end of the cube.
+            **kwargs: Additional keyword arguments to be passed to PriceCube.frame, e.g. columns.
+        """
+        return cls(cube.frame(start, end, **kwargs))
 
     
 
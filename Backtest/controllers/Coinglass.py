@@ -1,12 +1,18 @@
-from Backtest.models.CoinGlassData import CoinGlassOI, CoinGlassFearGreedIndex
+from Backtest.models.CoinGlassData import CoinGlassOI, CoinGlassFearGreedIndex, COINGLASS_API_URL
 from pathlib import Path
-from scipy import stats
-import vectorbt as vbt
+from typing import Dict, List, Optional
+import asyncio
+import os
 
-current_dir = Path.cwd()
+# The directories of the cached data files. None means the working directory at call time.
+oi_data_file: Optional[Path] = None
+fg_data_file: Optional[Path] = None
 
-oi_data_file = current_dir
-fg_data_file = current_dir / "data/coin_glass_fg.csv"
+def oi_store(coin: str) -> CoinGlassOI:
+    """Return the open interest store for a specific coin."""
+    data_dir = Path.cwd() if oi_data_file is None else Path(oi_data_file)
+    coin_file = data_dir / "data/coin_glass_{}_oi.csv".format(coin)
+    return CoinGlassOI(file_path=coin_file, coin=coin)
 
 def fetch_oi(coin: str, **kwargs):
     """
@@ -18,8 +24,7 @@ def fetch_oi(coin: str, **kwargs):
     Returns:
         CoinGlassOI: The open interest data for the specified coin.
     """
-    coin_file = oi_data_file / "data/coin_glass_{}_oi.csv".format(coin)
-    data = CoinGlassOI(file_path=coin_file, coin=coin)
+    data = oi_store(coin)
     data.load(**kwargs)
     return data
 
@@ -30,6 +35,68 @@ def fetch_fear_greed_index(**kwargs):
     Returns:
         CoinGlassFearGreedIndex: The fear and greed index data.
     """
-    data = CoinGlassFearGreedIndex(file_path=fg_data_file)
+    file_path = Path.cwd() / "data/coin_glass_fg.csv" if fg_data_file is None else fg_data_file
+    data = CoinGlassFearGreedIndex(file_path=file_path)
     data.load(**kwargs)
-    return data
\ No newline at end of file
+    return data
+
+async def fetch_oi_many_async(coins: List[str], max_concurrency: int = 8, max_retries: int = 5,
+                              backoff: float = 1.0, base_url: str = COINGLASS_API_URL,
+                              **kwargs) -> Dict[str, CoinGlassOI]:
+    """
+    Fetches the open interest data for many coins concurrently over one pooled connection.
+
+    Coins with an existing cache file are loaded from disk. The others are requested with at most
+    max_concurrency requests in flight, and each coin's cache file is written as soon as its
+    response arrives. A coin with no data is returned empty and not cached. If some coins fail, the remaining coins are still fetched and cached before
+    the first error is raised, so running again only requests the coins that are missing.
+
+    Args:
+        coins (list of str): The names of the coins.
+        max_concurrency (int): Maximum number of concurrent requests. Defaults to 8.
+        max_retries (int): Number of retries of rate limited requests per coin. Defaults to 5.
+        backoff (float): Initial wait in seconds between retries. Defaults to 1.0.
+        base_url (str): The CoinGlass API url. Defaults to COINGLASS_API_URL.
+        **kwargs: Additional keyword arguments to be passed to CoinGlassOI.fetch_async, e.g. days.
+
+    Returns:
+        dict: Mapping of coin name to its loaded CoinGlassOI.
+    """
+    import httpx
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+    async def fetch_coin(client: httpx.AsyncClient, coin: str) -> CoinGlassOI:
+        data = oi_store(coin)
+        if os.path.exists(data.file_path):
+            data.load()
+            return data
+        async with semaphore:
+            df = await data.fetch_async(client, max_retries=max_retries, backoff=backoff, **kwargs)
+        if len(df) > 0:
+            data.write(df)
+        data.data = df
+        return data
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        results = await asyncio.gather(*[fetch_coin(client, coin) for coin in coins], return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return dict(zip(coins, results))
+
+def fetch_oi_many(coins: List[str], **kwargs) -> Dict[str, CoinGlassOI]:
+    """
+    Fetches the open interest data for many coins concurrently. See fetch_oi_many_async.
+
+    Inside a running event loop (e.g. a notebook cell), await fetch_oi_many_async instead.
+
+    Args:
+        coins (list of str): The names of the coins.
+
+    Returns:
+        dict: Mapping of coin name to its loaded CoinGlassOI.
+    """
+    return asyncio.run(fetch_oi_many_async(coins, **kwargs))
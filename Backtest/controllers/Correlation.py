@@ -0,0 +1,143 @@
+import numpy as np
+from typing import Any, List, Optional, Sequence, Tuple
+
+class IncrementalCorrelation():
+    """
+    Correlation matrix of asset returns that is updated one bar at a time.
+
+    Instead of recomputing over the whole history, a running mean and co-moment are kept so each
+    new bar updates the N x N matrix in O(N^2). Three modes are supported:
+        - full sample (default): Welford updates of the mean and the centred co-moment.
+        - rolling (window): the same updates over the last window bars, removing the bar that leaves.
+        - exponentially weighted (halflife): an exponentially weighted mean and covariance.
+
+    The updates are centred on the running mean, so they stay accurate on price levels and long
+    histories as well as on returns.
+
+    Bars where any asset has no return (NaN) are skipped, like pct_change().dropna().
+
+    If corr_threshold is given, every update after the warm-up also counts which pairs are above
+    the threshold, so pairs that stayed correlated can be screened with pairs(min_fraction=...).
+
+    rows_seen counts every row passed to update, skipped or not, so a caller holding a growing
+    history can feed only the rows added since the last update (see generate_pairs).
+    """
+
+    n_assets: int
+    window: Optional[int]
+    halflife: Optional[float]
+    corr_threshold: Optional[float]
+    count: int
+    rows_seen: int
+    evaluations: int
+
+    def __init__(self, n_assets: int, window: Optional[int] = None, halflife: Optional[float] = None,
+                 corr_threshold: Optional[float] = None):
+        """
+        Args:
+            n_assets (int): The number of assets.
+            window (int, optional): Number of bars of the rolling window.
+            halflife (float, optional): Halflife in bars of the exponential weights. Only one of
+                window and halflife may be given.
+            corr_threshold (float, optional): Threshold above which pairs are counted as correlated.
+        """
+        if window is not None and halflife is not None:
+            raise ValueError("Only one of window and halflife may be given.")
+        if window is not None and window < 2:
+            raise ValueError("The rolling window needs at least 2 bars.")
+        self.n_assets = n_assets
+        self.window = window
+        self.halflife = halflife
+        self.corr_threshold = corr_threshold
+        self.alpha = None if halflife is None else 1 - np.exp(np.log(0.5) / halflife)
+        self.min_periods = window if window is not None else (int(np.ceil(halflife)) if halflife is not None else 2)
+
+        self.count = 0
+        self.rows_seen = 0
+        self.mean = np.zeros(n_assets)
+        self.comoment = np.zeros((n_assets, n_assets))
+        self.cov = np.zeros((n_assets, n_assets))
+        self.buffer = None if window is None else np.empty((window, n_assets))
+        self.evaluations = 0
+        self.above = np.zeros((n_assets, n_assets), dtype=np.int64)
+
+    def update(self, returns: Any):
+        """
+        Add one bar (shape (n_assets,)) or a batch of bars (shape (bars, n_assets)) of returns.
+        """
+        for row in np.atleast_2d(np.asarray(returns, dtype=float)):
+            self.rows_seen += 1
+            if np.isnan(row).any():
+                continue
+            self._update_row(row)
+            if self.corr_threshold is not None and self.count >= self.min_periods:
+                self.evaluations += 1
+                self.above += self.corr() > self.corr_threshold
+
+    def _update_row(self, row: np.ndarray):
+        if self.alpha is not None:
+            if self.count == 0:
+                self.mean = row.copy()
+            else:
+                delta = row - self.mean
+                self.mean += self.alpha * delta
+                self.cov = (1 - self.alpha) * (self.cov + self.alpha * np.outer(delta, delta))
+            self.count += 1
+            return
+
+        n = self.count if self.window is None else min(self.count, self.window)
+        if self.window is not None:
+            slot = self.count % self.window
+            if self.count >= self.window:
+                leaving = self.buffer[slot]
+                delta = leaving - self.mean
+                n -= 1
+                self.mean -= delta / n
+                self.comoment -= np.outer(delta, leaving - self.mean)
+            self.buffer[slot] = row
+        delta = row - self.mean
+        self.mean += delta / (n + 1)
+        self.comoment += np.outer(delta, row - self.mean)
+        self.count += 1
+
+    def corr(self) -> np.ndarray:
+        """
+        Return the current N x N correlation matrix (NaN where a variance is zero).
+
+        Before two bars have been added the matrix is all NaN.
+        """
+        if self.count < 2:
+            return np.full((self.n_assets, self.n_assets), np.nan)
+        if self.alpha is not None:
+            cov = self.cov
+        else:
+            n = min(self.count, self.window) if self.window is not None else self.count
+            cov = self.comoment / (n - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        return np.clip(corr, -1, 1)
+
+    def pairs(self, labels: Sequence[Any], corr_threshold: Optional[float] = None,
+              min_fraction: Optional[float] = None) -> List[Tuple[Any, Any]]:
+        """
+        Return the labels of strongly correlated pairs.
+
+        Args:
+            labels (sequence): The label of each asset.
+            corr_threshold (float, optional): Threshold on the current correlation. Defaults to the
+                threshold given at construction.
+            min_fraction (float, optional): If given, instead return the pairs that were above the
+                construction threshold in at least this fraction of the updates since the warm-up.
+
+        Returns:
+            list of tuple: The (label1, label2) of each pair, first label before the second.
+        """
+        if min_fraction is not None:
+            if self.evaluations == 0:
+                return []
+            mask = self.above >= min_fraction * self.evaluations
+        else:
+            corr_threshold = self.corr_threshold if corr_threshold is None else corr_threshold
+            mask = self.corr() > corr_threshold
+        return [(labels[i], labels[j]) for i, j in zip(*np.where(mask)) if i < j]
@@ -1,19 +1,29 @@
 import vectorbt as vbt
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+from vectorbt.generic.nb import crossed_above_nb
 from vectorbt.portfolio import Portfolio
+from Backtest.Instrumentation import span
 from Backtest.controllers.Analysis import BaseAnalysis
+from Backtest.controllers.Streaming import StreamingRSI
+from Backtest.models.ResultCache import ResultCache
 
 
 class MeanReversionAnalysis(BaseAnalysis):
     """Class to perform mean-reversion analysis on price_data."""
 
-    def __init__(self, price_data):
+    def __init__(self, price_data, result_cache: Optional[ResultCache] = None):
         """Initialize the MeanReversionAnalysis class.
 
         Args:
             price_data (Any): The price data on which the analysis is to be performed.
+            result_cache (ResultCache, optional): A disk cache of the metrics of every simulated
+                parameter set, reused by sweep. Defaults to None.
         """
         self.price_data = price_data
         self.portfolio = None
+        self.result_cache = result_cache
 
     def _MRStrategy(self, window: int=15, level: int=30):
         """Return vbt entries and exits after applying RSI strategy on price_data.
@@ -32,33 +42,145 @@ class MeanReversionAnalysis(BaseAnalysis):
         """
 
 
-        rsi = vbt.RSI.run(self.price_data, window=window)
-        entries = rsi.rsi_crossed_below(level)
-        exits = rsi.rsi_crossed_above(100-level)
+        with span("mean_reversion.indicators"):
+            rsi = vbt.RSI.run(self.price_data, window=window)
+            entries = rsi.rsi_crossed_below(level)
+            exits = rsi.rsi_crossed_above(100-level)
         return [entries, exits]
     
-    def MeanReversionBasedLongOnly(self, init_cash: float = 100000, overwrite: bool = False):
+    def _MRGridStrategy(self, windows: Sequence[int], levels: Sequence[float]):
+        """Return vbt entries and exits of the RSI strategy for every window and level combination.
+
+        The RSI is computed for all windows in one vbt.RSI.run call, and the crossings of every level
+        are derived against the level broadcast over the RSI matrix.
+
+        Args:
+            windows (sequence of int): The window sizes for calculating the RSI.
+            levels (sequence of float): The RSI oversold levels; the overbought levels are 100 - level.
+
+        Returns:
+            tuple: Boolean entries and exits frames with columns (window, level, asset).
+        """
+
+        price_data = self.price_data.to_frame() if isinstance(self.price_data, pd.Series) else self.price_data
+        rsi = vbt.RSI.run(price_data, window=list(windows)).rsi.to_numpy()
+        (n_bars, n_assets) = price_data.shape
+        (n_windows, n_levels) = (len(windows), len(levels))
+
+        entries = np.empty((n_bars, n_windows, n_levels, n_assets), dtype=np.bool_)
+        exits = np.empty_like(entries)
+        for (i, level) in enumerate(levels):
+            lower = np.broadcast_to(np.float64(level), rsi.shape)
+            upper = np.broadcast_to(np.float64(100 - level), rsi.shape)
+            entries[:, :, i, :] = crossed_above_nb(lower, rsi).reshape(n_bars, n_windows, n_assets)
+            exits[:, :, i, :] = crossed_above_nb(rsi, upper).reshape(n_bars, n_windows, n_assets)
+
+        columns = pd.MultiIndex.from_product(
+            [list(windows), list(levels), list(price_data.columns)],
+            names=["window", "level", "asset"]
+        )
+        return (
+            pd.DataFrame(entries.reshape(n_bars, -1), index=price_data.index, columns=columns),
+            pd.DataFrame(exits.reshape(n_bars, -1), index=price_data.index, columns=columns)
+        )
+
+    def streaming(self, window: int = 15, level: int = 30) -> StreamingRSI:
+        """Return the streaming RSI strategy, warmed up on price_data.
+
+        Feed each new bar to its update() to get the entries and exits that _MRStrategy would give
+        on the extended history, in constant time per bar.
+        """
+        price_data = self.price_data.to_frame() if isinstance(self.price_data, pd.Series) else self.price_data
+        strategy = StreamingRSI(price_data.shape[1], window, level)
+        strategy.update(price_data.to_numpy())
+        return strategy
+
+    def MeanReversionBasedLongOnly(self, window: int = 15, level: int = 30, init_cash: float = 100000,
+                                   overwrite: bool = False, **kwargs):
         """Return vbt portfolio object after applying MR strategy on price_data.
 
         Long only strategy. When the rsi indicator has cross into oversold, enters positions with
-        available cash, and vice versa if overbought. If portfolio is already created, returns the same portfolio
-        unless overwrite is True. Assumes total available cash is shared among all assets.
+        available cash, and vice versa if overbought. If portfolio is already created with the same parameters,
+        returns the same portfolio unless overwrite is True. Assumes total available cash is shared among all assets.
 
         Args:
+            window (int): The window size for calculating the RSI. Defaults to 15.
+            level (int): The RSI oversold level; the overbought level is 100 - level. Defaults to 30.
             init_cash (float): Initial cash to be used for the portfolio. Defaults to 100000.
             overwrite (bool): If True, overwrite the existing portfolio even if it exists. Defaults to False.
+            **kwargs: Additional keyword arguments to be passed to the Portfolio.
 
         Returns:
             Portfolio: The portfolio object after applying the MR strategy.
         """
 
-        if self.portfolio is None or overwrite:
-            [entries, exits] = self._MRStrategy()
-            self.portfolio = Portfolio.from_signals(
-                self.price_data,
-                entries,
-                exits, 
-                init_cash=init_cash,
-                cash_sharing=True
-            )
-        return self.portfolio
\ No newline at end of file
+        def build():
+            [entries, exits] = self._MRStrategy(window, level)
+            with span("mean_reversion.from_signals"):
+                return Portfolio.from_signals(
+                    self.price_data,
+                    entries,
+                    exits, 
+                    init_cash=init_cash,
+                    cash_sharing=True,
+                    **kwargs
+                )
+        params = dict(window=window, level=level, init_cash=init_cash, **kwargs)
+        return self._run_portfolio("MeanReversionBasedLongOnly", params, overwrite, build)
+
+    def sweep(self, windows: Sequence[int], levels: Sequence[float], init_cash: float = 100000,
+              metrics: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+        """Return a table of metrics for every (window, level, asset) combination of the RSI strategy.
+
+        The signals of all combinations come from _MRGridStrategy, and all combinations are simulated
+        as independent columns of a single long only portfolio, each with init_cash.
+        Because assets do not share cash here, each row matches MeanReversionBasedLongOnly run on that
+        asset alone. With a result_cache, only the (window, level) combinations not already simulated
+        on the same data and kwargs are simulated.
+
+        Rows are ordered by window, then level, then asset, so a metric can be reshaped into a
+        (window x level x asset) matrix with `table[metric].to_numpy().reshape(len(windows), len(levels), -1)`.
+
+        Args:
+            windows (sequence of int): The window sizes for calculating the RSI.
+            levels (sequence of float): The RSI oversold levels; the overbought levels are 100 - level.
+            init_cash (float): Initial cash of each column. Defaults to 100000.
+            metrics (list of str, optional): Keys of PORTFOLIO_METRICS to compute. Defaults to all of them.
+            **kwargs: Additional keyword arguments to be passed to the Portfolio.
+
+        Returns:
+            pd.DataFrame: The metrics, indexed by (window, level, asset).
+        """
+
+        price_data = self.price_data.to_frame() if isinstance(self.price_data, pd.Series) else self.price_data
+        grid = [(window, level) for window in windows for level in levels]
+
+        def simulate(positions):
+            combinations = [grid[i] for i in positions]
+            if len(combinations) < len(grid):
+                # The grid of the missing windows and levels, in sweep order, less the cached combinations.
+                sub_windows = [window for window in windows if any(window == w for (w, _) in combinations)]
+                sub_levels = [level for level in levels if any(level == l for (_, l) in combinations)]
+                with span("mean_reversion.indicators"):
+                    (entries, exits) = self._MRGridStrategy(sub_windows, sub_levels)
+                selected = entries.columns.droplevel("asset").isin(combinations)
+                (entries, exits) = (entries.loc[:, selected], exits.loc[:, selected])
+            else:
+                with span("mean_reversion.indicators"):
+                    (entries, exits) = self._MRGridStrategy(windows, levels)
+            with span("mean_reversion.from_signals"):
+                return Portfolio.from_signals(
+                    price_data.rename_axis(columns="asset"),
+                    entries,
+                    exits,
+                    init_cash=init_cash,
+                    **kwargs
+                )
+
+        params = [dict(window=window, level=level, init_cash=init_cash, **kwargs) for (window, level) in grid]
+        table = self._cached_sweep("MeanReversionSweep", params, simulate, metrics)
+        table.index = pd.MultiIndex.from_tuples(
+            [(window, level, asset) for (window, level) in grid for asset in price_data.columns],
+            names=["window", "level", "asset"]
+        )
+        return table
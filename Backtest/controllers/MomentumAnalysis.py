@@ -1,19 +1,28 @@
 import vectorbt as vbt
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
 from vectorbt.portfolio import Portfolio
+from Backtest.Instrumentation import span
 from Backtest.controllers.Analysis import BaseAnalysis
+from Backtest.controllers.Streaming import StreamingMACrossover
+from Backtest.models.ResultCache import ResultCache
 
 
 class MomentumAnalysis(BaseAnalysis):
     """Class to perform momentum analysis on price_data."""
 
-    def __init__(self, price_data):
+    def __init__(self, price_data, result_cache: Optional[ResultCache] = None):
         """Initialize the MomentumAnalysis class.
 
         Args:
             price_data (Any): The price data on which the analysis is to be performed.
+            result_cache (ResultCache, optional): A disk cache of the metrics of every simulated
+                parameter set, reused by sweep. Defaults to None.
         """
         self.price_data = price_data
         self.portfolio = None
+        self.result_cache = result_cache
 
     def _MAStrategy(self, short_window: int=15, long_window: int=50):
         """Return vbt entries and exits after applying MA strategy on price_data.
@@ -31,21 +40,35 @@ class MomentumAnalysis(BaseAnalysis):
                 - exits: A boolean array indicating where the short-term MA crosses below the long-term MA.
         """
 
-        fast_ma = vbt.MA.run(self.price_data, short_window, short_name='fast')
-        slow_ma = vbt.MA.run(self.price_data, long_window, short_name='slow')
-        entries = fast_ma.ma_crossed_above(slow_ma)
-        exits = fast_ma.ma_crossed_below(slow_ma)
+        with span("momentum.indicators"):
+            fast_ma = vbt.MA.run(self.price_data, short_window, short_name='fast')
+            slow_ma = vbt.MA.run(self.price_data, long_window, short_name='slow')
+            entries = fast_ma.ma_crossed_above(slow_ma)
+            exits = fast_ma.ma_crossed_below(slow_ma)
         return (entries, exits)
 
+    def streaming(self, short_window: int=15, long_window: int=50) -> StreamingMACrossover:
+        """Return the streaming MA strategy, warmed up on price_data.
+
+        Feed each new bar to its update() to get the entries and exits that _MAStrategy would give
+        on the extended history, in constant time per bar.
+        """
+        price_data = self.price_data.to_frame() if isinstance(self.price_data, pd.Series) else self.price_data
+        strategy = StreamingMACrossover(price_data.shape[1], short_window, long_window)
+        strategy.update(price_data.to_numpy())
+        return strategy
+
     def MomentumBasedLongOnly(self, short_window: int=15, long_window: int=50, 
                               init_cash: float = 100000, overwrite: bool = False, **kwargs):
         """Return vbt portfolio object after applying MA strategy on price_data.
 
         Long only strategy. When the fast moving average is above the slow moving average,
-        enters long position. If portfolio is already created, returns the same portfolio
-        unless overwrite is True. Assumes total available cash is shared among all assets.
+        enters long position. If portfolio is already created with the same parameters, returns
+        the same portfolio unless overwrite is True. Assumes total available cash is shared among all assets.
 
         Args:
+            short_window (int): The window size for the short-term moving average. Defaults to 15.
+            long_window (int): The window size for the long-term moving average. Defaults to 50.
             init_cash (float): Initial cash to be used for the portfolio. Defaults to 100000.
             overwrite (bool): If True, overwrite the existing portfolio even if it exists. Defaults to False.
 
@@ -53,25 +76,27 @@ class MomentumAnalysis(BaseAnalysis):
             Portfolio: The portfolio object after applying the MA strategy.
         """
 
-        if self.portfolio is None or overwrite:
+        def build():
             (entries, exits) = self._MAStrategy(short_window, long_window)
-            self.portfolio = Portfolio.from_signals(
-                self.price_data,
-                entries,
-                exits, 
-                init_cash=init_cash,
-                cash_sharing=True,
-                **kwargs
-            )
-        return self.portfolio
+            with span("momentum.from_signals"):
+                return Portfolio.from_signals(
+                    self.price_data,
+                    entries,
+                    exits, 
+                    init_cash=init_cash,
+                    cash_sharing=True,
+                    **kwargs
+                )
+        params = dict(short_window=short_window, long_window=long_window, init_cash=init_cash, **kwargs)
+        return self._run_portfolio("MomentumBasedLongOnly", params, overwrite, build)
     
     def MomentumBasedLongShort(self, short_window: int=10, long_window: int=50,
                                init_cash: float = 100000, overwrite: bool = False, **kwargs):
         """Return vbt portfolio object after applying MA strategy on price_data.
 
          Long short strategy. When the fast moving average is above the slow moving average,
-        enters long position and closes shorts, and vice versa. If portfolio is already created,
-        returns the same portfolio unless overwrite is True. Assumes total available cash
+        enters long position and closes shorts, and vice versa. If portfolio is already created with
+        the same parameters, returns the same portfolio unless overwrite is True. Assumes total available cash
         is shared among all assets.
 
         Args:
@@ -85,17 +110,67 @@ class MomentumAnalysis(BaseAnalysis):
             Portfolio: The portfolio object after applying the MA strategy.
         """
 
-        if self.portfolio is None or overwrite:
+        def build():
             (entries, exits) = self._MAStrategy(short_window, long_window)
             (short_entries, short_exits) = (exits, entries)
-            self.portfolio = Portfolio.from_signals(
-                self.price_data,
-                entries,
-                exits, 
-                short_entries,
-                short_exits,
-                init_cash=init_cash,
-                cash_sharing=True,
-                **kwargs
-            )
-        return self.portfolio
\ No newline at end of file
+            with span("momentum.from_signals"):
+                return Portfolio.from_signals(
+                    self.price_data,
+                    entries,
+                    exits, 
+                    short_entries,
+                    short_exits,
+                    init_cash=init_cash,
+                    cash_sharing=True,
+                    **kwargs
+                )
+        params = dict(short_window=short_window, long_window=long_window, init_cash=init_cash, **kwargs)
+        return self._run_portfolio("MomentumBasedLongShort", params, overwrite, build)
+
+    def sweep(self, short_windows: Sequence[int], long_windows: Sequence[int], long_short: bool = True,
+              init_cash: float = 100000, metrics: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+        """Return a table of metrics for every (short_window, long_window) combination of the MA strategy.
+
+        Every moving average is computed once, the crossover signals of all combinations are broadcast
+        into one wide array with a column per combination and asset, and all combinations are simulated
+        in a single Portfolio.from_signals call, grouped per combination with shared cash. Each row matches
+        MomentumBasedLongShort (or MomentumBasedLongOnly if long_short is False) for that combination.
+        With a result_cache, combinations already simulated on the same data and kwargs, by a sweep or
+        a single run, are read from the cache and only the new ones are simulated.
+
+        Args:
+            short_windows (sequence of int): The window sizes for the short-term moving average.
+            long_windows (sequence of int): The window sizes for the long-term moving average.
+            long_short (bool): If True, simulate the long short strategy, otherwise long only. Defaults to True.
+            init_cash (float): Initial cash of each combination. Defaults to 100000.
+            metrics (list of str, optional): Keys of PORTFOLIO_METRICS to compute. Defaults to all of them.
+            **kwargs: Additional keyword arguments to be passed to the Portfolio, e.g. sl_stop.
+
+        Returns:
+            pd.DataFrame: The metrics, indexed by (short_window, long_window).
+        """
+
+        short_grid = np.repeat(short_windows, len(long_windows)).tolist()
+        long_grid = np.tile(long_windows, len(short_windows)).tolist()
+
+        def simulate(positions):
+            (shorts, longs) = ([short_grid[i] for i in positions], [long_grid[i] for i in positions])
+            (entries, exits) = self._MAStrategy(shorts, longs)
+            signals = (entries, exits, exits, entries) if long_short else (entries, exits)
+            columns_per_combination = (entries.shape[1] if entries.ndim == 2 else 1) // len(shorts)
+            with span("momentum.from_signals"):
+                return Portfolio.from_signals(
+                    self.price_data,
+                    *signals,
+                    init_cash=init_cash,
+                    cash_sharing=True,
+                    group_by=np.repeat(np.arange(len(shorts)), columns_per_combination),
+                    **kwargs
+                )
+
+        strategy = "MomentumBasedLongShort" if long_short else "MomentumBasedLongOnly"
+        params = [dict(short_window=short_window, long_window=long_window, init_cash=init_cash, **kwargs)
+                  for (short_window, long_window) in zip(short_grid, long_grid)]
+        table = self._cached_sweep(strategy, params, simulate, metrics)
+        table.index = pd.MultiIndex.from_arrays([short_grid, long_grid], names=["short_window", "long_window"])
+        return table
@@ -3,7 +3,10 @@ from vectorbt.portfolio import Portfolio
 import numpy as np
 import pandas as pd
 from typing import Any, Optional, List, Tuple
-from Backtest.controllers.Analysis import BaseAnalysis
+from Backtest.Instrumentation import span
+from Backtest.controllers.Analysis import PORTFOLIO_METRICS, BaseAnalysis
+from Backtest.controllers.Correlation import IncrementalCorrelation
+from Backtest.models.ResultCache import ResultCache
 
 def divergence_indicator(price_data, level=2):
     """
@@ -18,19 +21,41 @@ def divergence_indicator(price_data, level=2):
         entries (numpy.ndarray): Boolean array indicating the entries where a divergence occurs.
     """
 
-    pair1 = np.array([val[0] for val in price_data])
-    pair2 = np.array([val[1] for val in price_data])
-    
-    percent_change_pair1 = np.diff(pair1) / pair1[:-1] * 100
-    percent_change_pair2 = np.diff(pair2) / pair2[:-1] * 100
-    divergences = np.divide(percent_change_pair1, percent_change_pair2)
-    
+    values = np.asarray(price_data, dtype=float)
+    (entries, exits) = divergence_signals(values, [(0, 1)], level=level)
+    return (entries[:, 0], exits[:, 0])
+
+def divergence_signals(price_data, pairs, level=2):
+    """
+    Calculates the divergence indicator for many pairs of assets at once.
+
+    Percent changes are computed once for every asset, and the divergences of all pairs are
+    taken as one 2-D array operation. Column k of the result matches
+    divergence_indicator(price_data[:, pairs[k]]).
+
+    Args:
+        price_data (np.ndarray): Array of shape (time, assets) with the prices of every asset.
+        pairs (sequence of tuple): The (column1, column2) positions of each pair.
+        level (int, optional): The level at which to consider a divergence. Default is 2.
+
+    Returns:
+        entries (numpy.ndarray): Boolean array of shape (time - 1, pairs), respective of the first item in each pair.
+        exits (numpy.ndarray): Boolean array of shape (time - 1, pairs).
+    """
+
+    values = np.asarray(price_data, dtype=float)
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+
+    percent_changes = np.diff(values, axis=0) / values[:-1] * 100
+    divergences = np.divide(percent_changes[:, pairs[:, 0]], percent_changes[:, pairs[:, 1]])
+
     entries = divergences < 1/level
     exits = divergences > level
 
     return (entries, exits)
 
-def generate_pairs(price_data, corr_threshold=0.7):
+def generate_pairs(price_data, corr_threshold=0.7, window=None, halflife=None, min_fraction=None,
+                   correlation=None):
     """
     Returns labels of strongly correlated pairs from the price_data.
 
@@ -44,12 +69,43 @@ def generate_pairs(price_data, corr_threshold=0.7):
                                    the price data of an asset over time.
         corr_threshold (float): The correlation threshold above which pairs are
                                 considered strongly correlated. Default is 0.7.
+        window (int, optional): If given, use a rolling correlation over this many bars,
+                                updated incrementally with IncrementalCorrelation.
+        halflife (float, optional): If given, use an exponentially weighted correlation
+                                    with this halflife in bars.
+        min_fraction (float, optional): With window or halflife, return the pairs whose correlation
+                                        stayed above corr_threshold for at least this fraction of
+                                        the bars after the warm-up, instead of only the latest bar.
+        correlation (IncrementalCorrelation, optional): A correlation kept between calls, e.g. by a
+                                        daily re-screen. Only the rows of price_data it has not seen
+                                        yet are fed to it, so price_data must be the same growing
+                                        history each call. Its window and halflife replace the
+                                        arguments, and its threshold, if set, replaces corr_threshold;
+                                        set one at construction to use min_fraction.
 
     Returns:
         list of tuple: A list of tuples, where each tuple contains the labels of
                        two strongly correlated assets.
     """
 
+    if correlation is not None:
+        if correlation.n_assets != price_data.shape[1]:
+            raise ValueError(f"The correlation tracks {correlation.n_assets} assets, price_data has {price_data.shape[1]}.")
+        if correlation.rows_seen > len(price_data):
+            raise ValueError("price_data is shorter than the history the correlation has already seen.")
+        # Only the new rows are differenced and fed; the row before them gives their first return.
+        start = max(correlation.rows_seen - 1, 0)
+        returns = price_data.iloc[start:].pct_change().to_numpy()
+        correlation.update(returns[correlation.rows_seen - start:])
+        threshold = corr_threshold if correlation.corr_threshold is None else None
+        return correlation.pairs(list(price_data.columns), threshold, min_fraction=min_fraction)
+
+    if window is not None or halflife is not None:
+        correlation = IncrementalCorrelation(price_data.shape[1], window=window, halflife=halflife,
+                                             corr_threshold=corr_threshold if min_fraction is not None else None)
+        correlation.update(price_data.pct_change().to_numpy())
+        return correlation.pairs(list(price_data.columns), corr_threshold, min_fraction=min_fraction)
+
     percent_changes = price_data.pct_change().dropna()
     corr_matrix = percent_changes.corr()
     pairs = np.where(corr_matrix > corr_threshold)
@@ -62,30 +118,35 @@ class PairTradeAnalysis(BaseAnalysis):
     portfolio: Optional[Portfolio] = None
     price_data: Optional[List[Any]] = None
     
-    def __init__(self, price_data):
+    def __init__(self, price_data, result_cache: Optional[ResultCache] = None):
         """Initialize the MomentumAnalysis class.
 
         Args:
             price_data (Any): The price data on which the analysis is to be performed.
+            result_cache (ResultCache, optional): A disk cache of the metrics of every simulated
+                pair, reused by scan_pairs. Defaults to None.
         """
         self.price_data = price_data
         self.portfolio = None
+        self.result_cache = result_cache
     
     def PairCorrLongOnly(self, pairs: Tuple, portfolio_cash: float = 100000, overwrite: bool = False):
         """Return vbt portfolio object after applying pair diversion strategy on price_data.
 
         Long only strategy. When the price ratio of two assets is below the lower bound,
-        enters long position. Assumes total available cash is shared among all assets.
+        enters long position. Assumes total available cash is shared among all assets. If portfolio
+        is already created for the same pair, returns the same portfolio unless overwrite is True.
 
         Returns:
             Portfolio: The portfolio object after applying the pair correlation strategy.
         """
 
-        if self.portfolio is None or overwrite:
+        def build():
             (asset1, asset2) = pairs
             pair_price_data = self.price_data[[asset1, asset2]]
             
-            (entries1, exits1) = divergence_indicator(pair_price_data.values)
+            with span("pairs.signals"):
+                (entries1, exits1) = divergence_indicator(pair_price_data.values)
 
             entries = pd.DataFrame({
                 asset1: entries1,
@@ -99,14 +160,69 @@ class PairTradeAnalysis(BaseAnalysis):
 
             pair_price_data = pair_price_data.drop(pair_price_data.index[0])
 
-            self.portfolio = Portfolio.from_signals(
-                pair_price_data,
-                entries,
-                exits,
-                cash_sharing=True,
-                init_cash=portfolio_cash,
-            )
+            with span("pairs.from_signals"):
+                return Portfolio.from_signals(
+                    pair_price_data,
+                    entries,
+                    exits,
+                    cash_sharing=True,
+                    init_cash=portfolio_cash,
+                )
+        params = dict(pair=list(pairs), portfolio_cash=portfolio_cash, level=2)
+        return self._run_portfolio("PairCorrLongOnly", params, overwrite, build)
+
+    def scan_pairs(self, pairs: Optional[List[Tuple]] = None, portfolio_cash: float = 100000, level: float = 2,
+                   metrics: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+        """Return a table of metrics of the PairCorrLongOnly strategy for many pairs at once.
+
+        The divergence signals of all pairs are computed as one 2-D array operation, and every pair is
+        simulated as a column group with its own portfolio_cash in a single portfolio. Each row matches
+        PairCorrLongOnly for that pair. With a result_cache, only the pairs not already simulated on the
+        same data, level and kwargs are simulated.
 
-        return self.portfolio
+        Args:
+            pairs (list of tuple, optional): The (asset1, asset2) labels of each pair. Defaults to
+                generate_pairs(price_data).
+            portfolio_cash (float): Initial cash of each pair. Defaults to 100000.
+            level (float): The level at which to consider a divergence. Defaults to 2.
+            metrics (list of str, optional): Keys of PORTFOLIO_METRICS to compute. Defaults to all of them.
+            **kwargs: Additional keyword arguments to be passed to the Portfolio.
+
+        Returns:
+            pd.DataFrame: The metrics, indexed by (asset1, asset2). Empty if there are no pairs.
+
+        Raises:
+            KeyError: If a pair names an asset that is not a column of price_data.
+        """
 
-    
\ No newline at end of file
+        pairs = generate_pairs(self.price_data) if pairs is None else list(pairs)
+        if not pairs:
+            index = pd.MultiIndex.from_arrays([[], []], names=["asset1", "asset2"])
+            return pd.DataFrame(columns=list(PORTFOLIO_METRICS) if metrics is None else metrics, index=index)
+
+        positions = self.price_data.columns.get_indexer(np.ravel(pairs)).reshape(-1, 2)
+        if (positions == -1).any():
+            unknown = sorted({str(label) for label in np.ravel(pairs)[np.ravel(positions) == -1]})
+            raise KeyError(f"Assets {unknown} are not columns of price_data.")
+        values = self.price_data.to_numpy()
+
+        def simulate(subset):
+            with span("pairs.signals"):
+                (entries, exits) = divergence_signals(values, positions[subset], level=level)
+            leg_entries = np.stack([entries, exits], axis=2).reshape(len(entries), -1)
+            leg_exits = np.stack([exits, entries], axis=2).reshape(len(exits), -1)
+            with span("pairs.from_signals"):
+                return Portfolio.from_signals(
+                    pd.DataFrame(values[1:, positions[subset].ravel()], index=self.price_data.index[1:]),
+                    leg_entries,
+                    leg_exits,
+                    cash_sharing=True,
+                    init_cash=portfolio_cash,
+                    group_by=np.repeat(np.arange(len(subset)), 2),
+                    **kwargs
+                )
+
+        params = [dict(pair=list(pair), portfolio_cash=portfolio_cash, level=level, **kwargs) for pair in pairs]
+        table = self._cached_sweep("PairCorrLongOnly", params, simulate, metrics)
+        table.index = pd.MultiIndex.from_tuples(pairs, names=["asset1", "asset2"])
+        return table
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from vectorbt.portfolio import Portfolio
+from Backtest.controllers.Analysis import PORTFOLIO_METRICS
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.controllers.MeanReversionAnalysis import MeanReversionAnalysis
+
+Split = Tuple[int, int]
+Strategy = Callable[[pd.DataFrame], Tuple[Any, ...]]
+
+def random_splits(n_rows: int, n_splits: int, split_len: int, seed: Optional[int] = None) -> List[Split]:
+    """
+    Return n_splits windows of split_len rows with uniformly random starts.
+
+    Args:
+        n_rows (int): The number of rows of the price data.
+        n_splits (int): The number of windows.
+        split_len (int): The number of rows in each window.
+        seed (int, optional): Seed of the random generator, for reproducible splits.
+
+    Returns:
+        list of tuple: (start, stop) row positions of each window.
+    """
+    if split_len > n_rows:
+        raise ValueError(f"Windows of {split_len} rows do not fit in {n_rows} rows of price data.")
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, n_rows - split_len + 1, size=n_splits)
+    return [(int(start), int(start) + split_len) for start in starts]
+
+def rolling_splits(n_rows: int, split_len: int, step: Optional[int] = None) -> List[Split]:
+    """
+    Return consecutive windows of split_len rows, starting every step rows.
+
+    Args:
+        n_rows (int): The number of rows of the price data.
+        split_len (int): The number of rows in each window.
+        step (int, optional): Rows between window starts. Defaults to split_len (non overlapping windows).
+
+    Returns:
+        list of tuple: (start, stop) row positions of each window.
+    """
+    step = split_len if step is None else step
+    return [(start, start + split_len) for start in range(0, n_rows - split_len + 1, step)]
+
+def expanding_splits(n_rows: int, min_len: int, step: int) -> List[Split]:
+    """
+    Return windows that all start at the first row and grow by step rows, starting at min_len rows.
+
+    Args:
+        n_rows (int): The number of rows of the price data.
+        min_len (int): The number of rows in the first window.
+        step (int): Rows added to each following window.
+
+    Returns:
+        list of tuple: (start, stop) row positions of each window.
+    """
+    return [(0, stop) for stop in range(min_len, n_rows + 1, step)]
+
+def walk_forward_splits(n_rows: int, train_len: int, test_len: int, step: Optional[int] = None) -> List[Tuple[Split, Split]]:
+    """
+    Return rolling (train, test) folds where each test window directly follows its train window.
+
+    Args:
+        n_rows (int): The number of rows of the price data.
+        train_len (int): The number of rows in each train window.
+        test_len (int): The number of rows in each test window.
+        step (int, optional): Rows between fold starts. Defaults to test_len, so test windows tile the history.
+
+    Returns:
+        list of tuple: ((train_start, train_stop), (test_start, test_stop)) row positions of each fold.
+    """
+    step = test_len if step is None else step
+    return [
+        ((start, start + train_len), (start + train_len, start + train_len + test_len))
+        for start in range(0, n_rows - train_len - test_len + 1, step)
+    ]
+
+def explicit_splits(index: pd.Index, splits: Sequence[Any]) -> List[Split]:
+    """
+    Convert windows given as index labels (e.g. a list of DatetimeIndex) to row positions.
+
+    Args:
+        index (pd.Index): The index of the price data.
+        splits (sequence): Each element holds the consecutive index labels of one window.
+
+    Returns:
+        list of tuple: (start, stop) row positions of each window.
+    """
+    positions = []
+    for split in splits:
+        start = index.get_loc(split[0])
+        stop = index.get_loc(split[-1]) + 1
+        if stop - start != len(split):
+            raise ValueError("Explicit splits must be consecutive rows of the price data.")
+        positions.append((start, stop))
+    return positions
+
+def momentum_strategy(short_window: int = 10, long_window: int = 50, long_short: bool = True) -> Strategy:
+    """Return a split strategy producing the signals of MomentumBasedLongShort (or MomentumBasedLongOnly)."""
+    def strategy(price_data):
+        (entries, exits) = MomentumAnalysis(price_data)._MAStrategy(short_window, long_window)
+        return (entries, exits, exits, entries) if long_short else (entries, exits)
+    return strategy
+
+def mean_reversion_strategy(window: int = 15, level: int = 30) -> Strategy:
+    """Return a split strategy producing the signals of MeanReversionBasedLongOnly."""
+    def strategy(price_data):
+        return tuple(MeanReversionAnalysis(price_data)._MRStrategy(window, level))
+    return strategy
+
+class SplitEngine():
+    """
+    Evaluate a strategy over many windows (splits) of the same price data in one simulation.
+
+    Windows of equal length are stacked into a (split x time x asset) array. When the windows start at
+    a regular step (rolling splits) the stack is a strided view of the prices; other layouts are gathered
+    once. The stack is laid out as one wide frame with a column per (split, asset), the strategy computes
+    its signals on it in one pass, and every split is simulated as a column group with shared cash in a
+    single portfolio. This gives the same result as building one analysis per `price_data.reindex(split)`
+    with one simulation instead of one per split.
+
+    The wide frame is a view of the prices only for a single asset or windows one row apart; otherwise
+    laying out the windows side by side copies them once, split x time x asset values in one array.
+    """
+
+    price_data: pd.DataFrame
+    splits: List[Split]
+    freq: Any
+
+    def __init__(self, price_data, splits: Sequence[Split], freq: Any = None):
+        """
+        Args:
+            price_data (pd.DataFrame or pd.Series): The prices, one column per asset.
+            splits (sequence of tuple): (start, stop) row positions of each window, see random_splits,
+                rolling_splits, expanding_splits and explicit_splits.
+            freq (optional): The frequency of the prices, used to annualize metrics. Defaults to the
+                median spacing of the price index.
+        """
+        self.price_data = price_data.to_frame() if isinstance(price_data, pd.Series) else price_data
+        self.splits = [(int(start), int(stop)) for (start, stop) in splits]
+        self.freq = pd.Series(self.price_data.index).diff().median() if freq is None else freq
+
+    def index_splits(self) -> List[pd.Index]:
+        """Return the index labels of each window, e.g. for plot_datetime_splits."""
+        return [self.price_data.index[start:stop] for (start, stop) in self.splits]
+
+    def stack(self, splits: Optional[Sequence[Split]] = None) -> np.ndarray:
+        """
+        Return the prices of equal length windows as a (split x time x asset) array.
+
+        Args:
+            splits (sequence of tuple, optional): The windows to stack. Defaults to all splits.
+
+        Returns:
+            np.ndarray: A read-only strided view if the windows start at a regular step, otherwise a copy.
+        """
+        splits = self.splits if splits is None else splits
+        lengths = {stop - start for (start, stop) in splits}
+        if len(lengths) != 1:
+            raise ValueError("Only windows of equal length can be stacked.")
+        split_len = lengths.pop()
+
+        values = self.price_data.to_numpy()
+        windows = np.lib.stride_tricks.sliding_window_view(values, split_len, axis=0).transpose(0, 2, 1)
+        starts = np.array([start for (start, _) in splits])
+        steps = np.unique(np.diff(starts))
+        if len(starts) > 1 and len(steps) == 1 and steps[0] > 0:
+            return windows[starts[0]::steps[0]][:len(starts)]
+        return windows[starts]
+
+    def evaluate(self, strategy: Strategy, metric: str = "sharpe_ratio", init_cash: float = 100000,
+                 **kwargs) -> np.ndarray:
+        """
+        Return the metric of the strategy on every split.
+
+        Args:
+            strategy (callable): Takes a price frame and returns the signals to pass to
+                Portfolio.from_signals, e.g. momentum_strategy(15, 50).
+            metric (str): A key of PORTFOLIO_METRICS. Defaults to "sharpe_ratio".
+            init_cash (float): Initial cash of each split. Defaults to 100000.
+            **kwargs: Additional keyword arguments to be passed to the Portfolio, e.g. sl_stop.
+
+        Returns:
+            np.ndarray: The metric of each split, in split order. Ready for plot_statistics.
+        """
+        results = np.empty(len(self.splits))
+        by_length = {}
+        for (position, (start, stop)) in enumerate(self.splits):
+            by_length.setdefault(stop - start, []).append(position)
+
+        for positions in by_length.values():
+            stacked = self.stack([self.splits[position] for position in positions])
+            (n_splits, split_len, n_assets) = stacked.shape
+            columns = pd.MultiIndex.from_product(
+                [positions, list(self.price_data.columns)],
+                names=["split", "asset"]
+            )
+            # A view when the (split, asset) axes can share one column stride, otherwise one copy.
+            price_data = pd.DataFrame(
+                stacked.transpose(1, 0, 2).reshape(split_len, n_splits * n_assets),
+                columns=columns
+            )
+            portfolio = Portfolio.from_signals(
+                price_data,
+                *strategy(price_data),
+                init_cash=init_cash,
+                cash_sharing=True,
+                group_by=np.repeat(np.arange(n_splits), n_assets),
+                freq=self.freq,
+                **kwargs
+            )
+            results[positions] = np.asarray(PORTFOLIO_METRICS[metric](portfolio))
+        return results
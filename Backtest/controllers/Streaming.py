@@ -0,0 +1,161 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Any, Tuple
+
+class RollingMean():
+    """
+    Rolling mean of each asset, updated one bar at a time.
+
+    Follows vectorbt's rolling_mean_nb exactly, including its running sums and NaN counts, so each
+    value equals vbt.MA.run over the full history bit for bit. Only the running sums of the last
+    window bars are kept, so memory and time per bar do not grow with the history.
+    """
+
+    n_assets: int
+    window: int
+    count: int
+
+    def __init__(self, n_assets: int, window: int):
+        """
+        Args:
+            n_assets (int): The number of assets.
+            window (int): Number of bars of the rolling window. The mean is NaN until window
+                bars without NaN are in the window.
+        """
+        self.n_assets = n_assets
+        self.window = window
+        self.count = 0
+        self.cumsum = np.zeros(n_assets)
+        self.nancnt = np.zeros(n_assets)
+        self.cumsum_buffer = np.zeros((window, n_assets))
+        self.nancnt_buffer = np.zeros((window, n_assets))
+
+    def update(self, row: np.ndarray) -> np.ndarray:
+        """Add one bar of values (shape (n_assets,)) and return the rolling mean at that bar."""
+        isnan = np.isnan(row)
+        self.nancnt = self.nancnt + isnan
+        self.cumsum = np.where(isnan, self.cumsum, self.cumsum + row)
+        slot = self.count % self.window
+        if self.count < self.window:
+            window_len = self.count + 1 - self.nancnt
+            window_cumsum = self.cumsum
+        else:
+            window_len = self.window - (self.nancnt - self.nancnt_buffer[slot])
+            window_cumsum = self.cumsum - self.cumsum_buffer[slot]
+        self.cumsum_buffer[slot] = self.cumsum
+        self.nancnt_buffer[slot] = self.nancnt
+        self.count += 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(window_len < self.window, np.nan, window_cumsum / window_len)
+
+
+class Crossover():
+    """
+    Where a first series crosses above a second, updated one bar at a time.
+
+    Follows vectorbt's crossed_above_nb (with wait=0): a bar is a crossover if the first series
+    is above the second and was below it since the last NaN of either series.
+    """
+
+    def __init__(self, n_assets: int):
+        self.was_below = np.zeros(n_assets, dtype=np.bool_)
+        self.crossed_ago = np.full(n_assets, -1, dtype=np.int64)
+
+    def update(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """Add one bar of both series and return whether the first crossed above the second."""
+        isnan = np.isnan(first) | np.isnan(second)
+        above = ~isnan & (first > second)
+        below = ~isnan & (first < second)
+        crossed = above & self.was_below & (self.crossed_ago == -1)
+        self.crossed_ago = np.where(above, self.crossed_ago + self.was_below, -1)
+        self.was_below = (self.was_below & ~isnan) | below
+        return crossed
+
+
+class StreamingStrategy(ABC):
+    """Base of the strategies that emit entries and exits one bar at a time."""
+
+    n_assets: int
+
+    @abstractmethod
+    def _update_row(self, row: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Add one bar of prices (shape (n_assets,)) and return its entries and exits."""
+
+    def update(self, prices: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Add one bar (shape (n_assets,)) or a batch of bars (shape (bars, n_assets)) of prices.
+
+        Returns:
+            tuple: Boolean entries and exits, of the same shape as prices.
+        """
+        values = np.asarray(prices, dtype=float)
+        rows = values.reshape(-1, self.n_assets)
+        entries = np.empty(rows.shape, dtype=np.bool_)
+        exits = np.empty(rows.shape, dtype=np.bool_)
+        for (i, row) in enumerate(rows):
+            (entries[i], exits[i]) = self._update_row(row)
+        return (entries.reshape(values.shape), exits.reshape(values.shape))
+
+
+class StreamingMACrossover(StreamingStrategy):
+    """
+    Streaming counterpart of MomentumAnalysis._MAStrategy.
+
+    Keeps the rolling means of the short and long windows and emits an entry where the short
+    moving average crosses above the long one and an exit where it crosses below, identical to
+    the batch signals over the same history.
+    """
+
+    def __init__(self, n_assets: int, short_window: int = 15, long_window: int = 50):
+        """
+        Args:
+            n_assets (int): The number of assets.
+            short_window (int): The window size for the short-term moving average. Defaults to 15.
+            long_window (int): The window size for the long-term moving average. Defaults to 50.
+        """
+        self.n_assets = n_assets
+        self.fast_ma = RollingMean(n_assets, short_window)
+        self.slow_ma = RollingMean(n_assets, long_window)
+        self.crossed_above = Crossover(n_assets)
+        self.crossed_below = Crossover(n_assets)
+
+    def _update_row(self, row: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        fast = self.fast_ma.update(row)
+        slow = self.slow_ma.update(row)
+        return (self.crossed_above.update(fast, slow), self.crossed_below.update(slow, fast))
+
+
+class StreamingRSI(StreamingStrategy):
+    """
+    Streaming counterpart of MeanReversionAnalysis._MRStrategy.
+
+    Keeps the previous price and the rolling means of gains and losses, and emits an entry where
+    the RSI crosses below level and an exit where it crosses above 100 - level, identical to the
+    batch signals over the same history.
+    """
+
+    def __init__(self, n_assets: int, window: int = 15, level: float = 30):
+        """
+        Args:
+            n_assets (int): The number of assets.
+            window (int): The window size for calculating the RSI. Defaults to 15.
+            level (float): The RSI oversold level; the overbought level is 100 - level. Defaults to 30.
+        """
+        self.n_assets = n_assets
+        self.lower = np.full(n_assets, level, dtype=float)
+        self.upper = np.full(n_assets, 100 - level, dtype=float)
+        self.previous = np.full(n_assets, np.nan)
+        self.roll_up = RollingMean(n_assets, window)
+        self.roll_down = RollingMean(n_assets, window)
+        self.crossed_below = Crossover(n_assets)
+        self.crossed_above = Crossover(n_assets)
+
+    def _update_row(self, row: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        delta = row - self.previous
+        self.previous = row
+        up = np.where(delta < 0, 0, delta)
+        down = np.abs(np.where(delta > 0, 0, delta))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = self.roll_up.update(up) / self.roll_down.update(down)
+            rsi = 100 - 100 / (1 + rs)
+        return (self.crossed_below.update(self.lower, rsi), self.crossed_above.update(rsi, self.upper))
@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from vectorbt.portfolio import Portfolio
+from Backtest.controllers.Analysis import PORTFOLIO_METRICS
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.controllers.MeanReversionAnalysis import MeanReversionAnalysis
+from Backtest.controllers.SplitEngine import walk_forward_splits
+from Backtest.models.EvolutionaryModel import EvolutionaryPortfolioFamily, blend_signals
+
+def _scalar(value: Any) -> float:
+    """Return the metric of a portfolio with a single column or group."""
+    values = np.asarray(value, dtype=float).ravel()
+    if len(values) != 1:
+        raise ValueError(f"Expected the metric of a single column or group, got {len(values)} values.")
+    return float(values[0])
+
+class GridWalkForward():
+    """
+    Base class for walk-forward strategies that pick one parameter set out of a grid.
+
+    The signals of every parameter set are computed once over the full history in prepare, and each
+    fold only slices rows out of them, so indicators are never recomputed per fold and carry their
+    warm-up from the bars before the fold.
+    """
+
+    params: pd.MultiIndex
+    signals: Tuple[np.ndarray, ...]
+
+    def prepare(self, price_data: pd.DataFrame):
+        """Child classes should set params and signals (one column per parameter set and asset)."""
+        raise NotImplementedError
+
+    def _portfolio(self, price_data: pd.DataFrame, rows: slice, candidates: np.ndarray, init_cash: float,
+                   freq: Any, **kwargs) -> Portfolio:
+        n_assets = price_data.shape[1]
+        positions = (candidates[:, None] * n_assets + np.arange(n_assets)).ravel()
+        index = price_data.index[rows]
+        columns = pd.MultiIndex.from_product([candidates, price_data.columns], names=["candidate", "asset"])
+        signals = [pd.DataFrame(signal[rows][:, positions], index=index, columns=columns) for signal in self.signals]
+        return Portfolio.from_signals(
+            price_data.iloc[rows].rename_axis(columns="asset"),
+            *signals,
+            init_cash=init_cash,
+            cash_sharing=True,
+            group_by=np.repeat(np.arange(len(candidates)), n_assets),
+            freq=freq,
+            **kwargs
+        )
+
+    def optimize(self, price_data: pd.DataFrame, rows: slice, metric: str, init_cash: float, freq: Any,
+                 **kwargs) -> Tuple[int, float]:
+        """Return the best parameter set on rows, and its metric. All parameter sets run in one simulation."""
+        portfolio = self._portfolio(price_data, rows, np.arange(len(self.params)), init_cash, freq, **kwargs)
+        values = np.asarray(PORTFOLIO_METRICS[metric](portfolio), dtype=float).ravel()
+        best = int(np.argmax(np.where(np.isfinite(values), values, -np.inf)))
+        return best, values[best]
+
+    def score(self, price_data: pd.DataFrame, rows: slice, candidate: int, metric: str, init_cash: float,
+              freq: Any, **kwargs) -> Tuple[float, pd.Series]:
+        """Return the metric and returns of one parameter set on rows."""
+        portfolio = self._portfolio(price_data, rows, np.array([candidate]), init_cash, freq, **kwargs)
+        returns = pd.Series(np.asarray(portfolio.returns()).ravel(), index=price_data.index[rows])
+        return _scalar(PORTFOLIO_METRICS[metric](portfolio)), returns
+
+    def describe(self, candidate: int) -> Dict[str, Any]:
+        """Return the parameters of a parameter set by name."""
+        return dict(zip(self.params.names, self.params[candidate]))
+
+class MomentumWalkForward(GridWalkForward):
+    """Walk-forward selection of the MomentumAnalysis (short_window, long_window) grid."""
+
+    def __init__(self, short_windows: Sequence[int], long_windows: Sequence[int], long_short: bool = True):
+        self.short_windows = list(short_windows)
+        self.long_windows = list(long_windows)
+        self.long_short = long_short
+
+    def prepare(self, price_data: pd.DataFrame):
+        short_grid = np.repeat(self.short_windows, len(self.long_windows)).tolist()
+        long_grid = np.tile(self.long_windows, len(self.short_windows)).tolist()
+        (entries, exits) = MomentumAnalysis(price_data)._MAStrategy(short_grid, long_grid)
+        (entries, exits) = (entries.to_numpy(), exits.to_numpy())
+        self.params = pd.MultiIndex.from_arrays([short_grid, long_grid], names=["short_window", "long_window"])
+        self.signals = (entries, exits, exits, entries) if self.long_short else (entries, exits)
+
+class MeanReversionWalkForward(GridWalkForward):
+    """Walk-forward selection of the MeanReversionAnalysis (window, level) grid."""
+
+    def __init__(self, windows: Sequence[int], levels: Sequence[float]):
+        self.windows = list(windows)
+        self.levels = list(levels)
+
+    def prepare(self, price_data: pd.DataFrame):
+        (entries, exits) = MeanReversionAnalysis(price_data)._MRGridStrategy(self.windows, self.levels)
+        self.params = pd.MultiIndex.from_product([self.windows, self.levels], names=["window", "level"])
+        self.signals = (entries.to_numpy(), exits.to_numpy())
+
+class EvolutionaryWalkForward():
+    """
+    Walk-forward optimization of an EvolutionaryPortfolio weight vector.
+
+    The entry and exit signals to blend are computed once by the caller over the full history. Each
+    fold evolves a family on the train rows of the signals and blends the test rows with the winning
+    weights. With several assets, the assets of a portfolio are simulated as one group, as the
+    family does, so every fold has one metric and one returns series.
+    """
+
+    def __init__(self, weights, entries: List[Any], exits: List[Any], entry_threshold: float = 0.5,
+                 exit_threshold: float = 0.5, num_portfolios: int = 10, **simulation_kwargs):
+        """
+        Args:
+            weights: The initial weights of each signal.
+            entries (list): Entry signals over the full history.
+            exits (list): Exit signals over the full history.
+            entry_threshold (float): The threshold for the blended entry signal. Defaults to 0.5.
+            exit_threshold (float): The threshold for the blended exit signal. Defaults to 0.5.
+            num_portfolios (int): The size of the family evolved on each fold. Defaults to 10.
+            **simulation_kwargs: Additional keyword arguments to be passed to run_simulation, e.g. n_steps.
+        """
+        self.weights = weights
+        self.entries = [np.asarray(entry) for entry in entries]
+        self.exits = [np.asarray(exit) for exit in exits]
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.num_portfolios = num_portfolios
+        self.simulation_kwargs = simulation_kwargs
+
+    def prepare(self, price_data: pd.DataFrame):
+        pass
+
+    def _data(self, price_data: pd.DataFrame, rows: slice):
+        data = price_data.iloc[rows]
+        return data.iloc[:, 0] if data.shape[1] == 1 else data
+
+    def optimize(self, price_data: pd.DataFrame, rows: slice, metric: str, init_cash: float, freq: Any,
+                 **kwargs) -> Tuple[np.ndarray, float]:
+        """Evolve a family on rows and return the best weights, and the metric of its portfolio."""
+        family = EvolutionaryPortfolioFamily(
+            self._data(price_data, rows),
+            self.weights,
+            [entry[rows] for entry in self.entries],
+            [exit[rows] for exit in self.exits],
+            num_portfolios=self.num_portfolios,
+            entry_threshold=self.entry_threshold,
+            exit_threshold=self.exit_threshold,
+            init_cash=init_cash,
+            freq=freq,
+            **kwargs
+        )
+        family.run_simulation(**self.simulation_kwargs)
+        best = family.fetch_best_portfolio()
+        return np.asarray(best.weights), _scalar(PORTFOLIO_METRICS[metric](best.portfolio))
+
+    def score(self, price_data: pd.DataFrame, rows: slice, weights: np.ndarray, metric: str, init_cash: float,
+              freq: Any, **kwargs) -> Tuple[float, pd.Series]:
+        """Return the metric and returns of the blended signals with weights on rows."""
+        (entries, exits) = blend_signals(
+            [entry[rows] for entry in self.entries],
+            [exit[rows] for exit in self.exits],
+            weights,
+            entry_threshold=self.entry_threshold,
+            exit_threshold=self.exit_threshold
+        )
+        data = self._data(price_data, rows)
+        if data.ndim > 1:
+            kwargs = {**kwargs, "group_by": True}
+        portfolio = Portfolio.from_signals(
+            data, entries=entries, exits=exits, init_cash=init_cash, freq=freq, **kwargs
+        )
+        returns = pd.Series(np.asarray(portfolio.returns()).ravel(), index=price_data.index[rows])
+        return _scalar(PORTFOLIO_METRICS[metric](portfolio)), returns
+
+    def describe(self, weights: np.ndarray) -> Dict[str, Any]:
+        return {"weights": weights}
+
+class WalkForwardResult():
+    """The fold level results and the stitched out of sample returns of a walk-forward run."""
+
+    folds: pd.DataFrame
+    oos_returns: pd.Series
+    fold_splits: List[Tuple[pd.Index, pd.Index]]
+    init_cash: float
+
+    def __init__(self, folds: pd.DataFrame, oos_returns: pd.Series,
+                 fold_splits: List[Tuple[pd.Index, pd.Index]], init_cash: float):
+        self.folds = folds
+        self.oos_returns = oos_returns
+        self.fold_splits = fold_splits
+        self.init_cash = init_cash
+
+    @property
+    def oos_equity(self) -> pd.Series:
+        """The out of sample equity curve, compounding each test window's returns from init_cash."""
+        return self.init_cash * (1 + self.oos_returns).cumprod()
+
+def walk_forward(price_data, strategy, train_len: int, test_len: int, step: Optional[int] = None,
+                 metric: str = "sharpe_ratio", init_cash: float = 100000, freq: Any = None,
+                 **kwargs) -> WalkForwardResult:
+    """
+    Optimize a strategy on rolling train windows and score the chosen parameters on the following test windows.
+
+    Args:
+        price_data (pd.DataFrame or pd.Series): The prices, one column per asset.
+        strategy: A MomentumWalkForward, MeanReversionWalkForward or EvolutionaryWalkForward.
+        train_len (int): The number of rows in each train window.
+        test_len (int): The number of rows in each test window.
+        step (int, optional): Rows between fold starts. Defaults to test_len. Where test windows
+            overlap, the stitched returns keep the earlier fold.
+        metric (str): The key of PORTFOLIO_METRICS to optimize and report. Defaults to "sharpe_ratio".
+        init_cash (float): Initial cash of each portfolio. Defaults to 100000.
+        freq (optional): The frequency of the prices. Defaults to the median spacing of the price index.
+        **kwargs: Additional keyword arguments to be passed to the Portfolio, e.g. sl_stop.
+
+    Returns:
+        WalkForwardResult: The fold table, the stitched out of sample returns and equity, and the
+            (train, test) index of each fold for plot_datetime_splits.
+    """
+    price_data = price_data.to_frame() if isinstance(price_data, pd.Series) else price_data
+    freq = pd.Series(price_data.index).diff().median() if freq is None else freq
+    strategy.prepare(price_data)
+
+    rows = []
+    test_returns = []
+    fold_splits = []
+    for (fold, ((train_start, train_stop), (test_start, test_stop))) in enumerate(
+            walk_forward_splits(len(price_data), train_len, test_len, step)):
+        train = slice(train_start, train_stop)
+        test = slice(test_start, test_stop)
+        (best, train_metric) = strategy.optimize(price_data, train, metric, init_cash, freq, **kwargs)
+        (test_metric, returns) = strategy.score(price_data, test, best, metric, init_cash, freq, **kwargs)
+
+        rows.append({
+            "fold": fold,
+            "train_start": price_data.index[train_start],
+            "train_end": price_data.index[train_stop - 1],
+            "test_start": price_data.index[test_start],
+            "test_end": price_data.index[test_stop - 1],
+            **strategy.describe(best),
+            f"train_{metric}": train_metric,
+            f"test_{metric}": test_metric,
+        })
+        test_returns.append(returns)
+        fold_splits.append((price_data.index[train], price_data.index[test]))
+
+    oos_returns = pd.concat(test_returns) if test_returns else pd.Series(dtype=float)
+    oos_returns = oos_returns[~oos_returns.index.duplicated(keep="first")]
+    return WalkForwardResult(pd.DataFrame(rows).set_index("fold"), oos_returns, fold_splits, init_cash)
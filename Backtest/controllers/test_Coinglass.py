@@ -0,0 +1,90 @@
+import email.utils
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pandas as pd
+import pytest
+
+from Backtest.controllers import Coinglass
+from Backtest.models.CoinGlassData import retry_after_delay
+
+CANNED_OI = {
+    "BTC": [{"t": 1704067200000, "h": "100.5"}, {"t": 1704153600000, "h": "101.5"}],
+    "ETH": [{"t": 1704067200000, "h": "50.0"}, {"t": 1704153600000, "h": "51.0"}],
+    "XRP": [],
+}
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Replays canned open interest JSON, rate limiting the first request for ETH."""
+
+    requests = []
+
+    def do_GET(self):
+        symbol = parse_qs(urlparse(self.path).query)["symbol"][0]
+        ReplayHandler.requests.append(symbol)
+        if symbol == "ETH" and ReplayHandler.requests.count("ETH") == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if symbol not in CANNED_OI:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({"code": "0", "data": CANNED_OI[symbol]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def coinglass_server(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(Coinglass, "oi_data_file", tmp_path)
+    ReplayHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_fetch_oi_many(coinglass_server, tmp_path):
+    results = Coinglass.fetch_oi_many(["BTC", "ETH"], base_url=coinglass_server, backoff=0)
+
+    assert sorted(ReplayHandler.requests) == ["BTC", "ETH", "ETH"]
+    assert list(results["ETH"].data["h"]) == [50.0, 51.0]
+    assert results["ETH"].data["h"].dtype == float
+    cached = pd.read_csv(tmp_path / "data/coin_glass_BTC_oi.csv", index_col=0, parse_dates=True)
+    assert list(cached["h"]) == [100.5, 101.5]
+
+    # Cached coins are served from disk on the next call.
+    Coinglass.fetch_oi_many(["BTC", "ETH"], base_url=coinglass_server, backoff=0)
+    assert len(ReplayHandler.requests) == 3
+
+def test_fetch_oi_many_caches_before_raising(coinglass_server, tmp_path):
+    with pytest.raises(httpx.HTTPStatusError):
+        Coinglass.fetch_oi_many(["DOGE", "BTC"], base_url=coinglass_server, backoff=0)
+
+    assert (tmp_path / "data/coin_glass_BTC_oi.csv").exists()
+
+def test_fetch_oi_many_skips_empty_coins(coinglass_server, tmp_path):
+    results = Coinglass.fetch_oi_many(["XRP", "BTC"], base_url=coinglass_server, backoff=0)
+
+    assert len(results["XRP"].data) == 0
+    assert not (tmp_path / "data/coin_glass_XRP_oi.csv").exists()
+    assert (tmp_path / "data/coin_glass_BTC_oi.csv").exists()
+
+def test_retry_after_delay():
+    assert retry_after_delay(None, 2.0) == 2.0
+    assert retry_after_delay("3", 2.0) == 3.0
+    assert retry_after_delay("soon", 2.0) == 2.0
+    assert retry_after_delay(email.utils.formatdate(time.time() - 60, usegmt=True), 2.0) == 0.0
+    assert 25 < retry_after_delay(email.utils.formatdate(time.time() + 30, usegmt=True), 2.0) <= 30
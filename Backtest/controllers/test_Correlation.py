@@ -0,0 +1,73 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from Backtest.controllers.Correlation import IncrementalCorrelation
+from Backtest.controllers.PairTradeAnalysis import generate_pairs
+
+def make_returns(n_bars=300, seed=5):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.03, size=(n_bars, 1))
+    returns = common + rng.normal(0, 0.005, size=(n_bars, 4))
+    returns[:, 3] = rng.normal(0, 0.02, size=n_bars)
+    return pd.DataFrame(returns, columns=["BTC", "ETH", "SOL", "GOLD"])
+
+def test_full_sample_matches_pandas():
+    returns = make_returns()
+    correlation = IncrementalCorrelation(4)
+
+    for row in returns.to_numpy():
+        correlation.update(row)
+
+    np.testing.assert_allclose(correlation.corr(), returns.corr().to_numpy())
+
+def test_rolling_matches_pandas():
+    returns = make_returns()
+    correlation = IncrementalCorrelation(4, window=50)
+
+    correlation.update(returns.to_numpy())
+
+    np.testing.assert_allclose(correlation.corr(), returns.iloc[-50:].corr().to_numpy())
+
+def test_corr_is_nan_before_warm_up():
+    correlation = IncrementalCorrelation(3)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert np.isnan(correlation.corr()).all()
+        correlation.update([0.01, 0.02, -0.01])
+        assert np.isnan(correlation.corr()).all()
+
+def test_price_levels_keep_precision():
+    # Large levels with small moves cancel catastrophically in raw sums of outer products.
+    prices = 1e6 + 100 * (1 + make_returns(n_bars=2000)).cumprod()
+    correlation = IncrementalCorrelation(4, window=500)
+
+    correlation.update(prices.to_numpy())
+
+    np.testing.assert_allclose(correlation.corr(), prices.iloc[-500:].corr().to_numpy(), atol=1e-9)
+
+def test_generate_pairs_modes():
+    prices = 100 * (1 + make_returns()).cumprod()
+
+    assert generate_pairs(prices) == [("BTC", "ETH"), ("BTC", "SOL"), ("ETH", "SOL")]
+    assert generate_pairs(prices, window=60) == generate_pairs(prices.iloc[-61:])
+    assert generate_pairs(prices, window=60, min_fraction=0.9) == [("BTC", "ETH"), ("BTC", "SOL"), ("ETH", "SOL")]
+    assert generate_pairs(prices, halflife=20, min_fraction=0.9) == [("BTC", "ETH"), ("BTC", "SOL"), ("ETH", "SOL")]
+    assert generate_pairs(prices, window=60, corr_threshold=0.99, min_fraction=0.1) == []
+
+def test_generate_pairs_reuses_correlation():
+    prices = 100 * (1 + make_returns()).cumprod()
+    correlation = IncrementalCorrelation(4, window=60, corr_threshold=0.7)
+
+    first = generate_pairs(prices.iloc[:200], correlation=correlation)
+    assert correlation.rows_seen == 200
+    assert first == generate_pairs(prices.iloc[:200], window=60)
+
+    # A later screen only feeds the new bars.
+    latest = generate_pairs(prices, correlation=correlation)
+    assert correlation.rows_seen == len(prices)
+    assert latest == generate_pairs(prices, window=60)
+    np.testing.assert_allclose(correlation.corr(), prices.pct_change().iloc[-60:].corr().to_numpy())
+    assert generate_pairs(prices, correlation=correlation, min_fraction=0.9) == \
+        generate_pairs(prices, window=60, min_fraction=0.9)
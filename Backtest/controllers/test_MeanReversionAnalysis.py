@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from Backtest.controllers.MeanReversionAnalysis import MeanReversionAnalysis
+
+def make_prices(n_bars=300, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, 2))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH"])
+
+def test_sweep_matches_single_portfolios():
+    prices = make_prices()
+
+    table = MeanReversionAnalysis(prices).sweep([10, 15], [25, 30, 35])
+
+    assert table.shape[0] == 2 * 3 * 2
+    assert table.index.names == ["window", "level", "asset"]
+    for (window, level, asset), row in table.iterrows():
+        portfolio = MeanReversionAnalysis(prices[[asset]]).MeanReversionBasedLongOnly(window, level)
+        np.testing.assert_allclose(row["sharpe_ratio"], portfolio.sharpe_ratio())
+        assert row["trade_count"] == portfolio.trades.count()
+
+    matrix = table["total_return"].to_numpy().reshape(2, 3, 2)
+    np.testing.assert_allclose(matrix[1, 2, 0], table.loc[(15, 35, "BTC"), "total_return"])
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+
+def make_prices(n_bars=300, seed=7):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, 2))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH"])
+
+def test_sweep_matches_single_portfolios():
+    prices = make_prices()
+    analysis = MomentumAnalysis(prices)
+
+    table = analysis.sweep([5, 10], [20, 30, 40], sl_stop=0.05)
+
+    assert list(table.index) == [(5, 20), (5, 30), (5, 40), (10, 20), (10, 30), (10, 40)]
+    for (short_window, long_window), row in table.iterrows():
+        portfolio = MomentumAnalysis(prices).MomentumBasedLongShort(short_window, long_window, sl_stop=0.05)
+        np.testing.assert_allclose(row["sharpe_ratio"], portfolio.sharpe_ratio())
+        np.testing.assert_allclose(row["total_return"], portfolio.total_return())
+        assert row["trade_count"] == portfolio.trades.count()
+
+def test_sweep_long_only():
+    prices = make_prices()
+
+    table = MomentumAnalysis(prices).sweep([5], [20], long_short=False, metrics=["sharpe_ratio"])
+
+    portfolio = MomentumAnalysis(prices).MomentumBasedLongOnly(5, 20)
+    assert list(table.columns) == ["sharpe_ratio"]
+    np.testing.assert_allclose(table.loc[(5, 20), "sharpe_ratio"], portfolio.sharpe_ratio())
+
+def test_portfolio_follows_parameters():
+    analysis = MomentumAnalysis(make_prices())
+
+    first = analysis.MomentumBasedLongOnly(15, 50)
+    assert analysis.MomentumBasedLongOnly(15, 50) is first
+    second = analysis.MomentumBasedLongOnly(20, 60)
+    assert second is not first
+    np.testing.assert_allclose(second.sharpe_ratio(), MomentumAnalysis(make_prices()).MomentumBasedLongOnly(20, 60).sharpe_ratio())
+
+def test_sweep_simulates_only_new_parameters(tmp_path):
+    from Backtest.models.ResultCache import ResultCache
+
+    prices = make_prices()
+    expected = MomentumAnalysis(prices).sweep([5, 10], [20, 30, 40], sl_stop=0.05)
+
+    cache = ResultCache(tmp_path)
+    MomentumAnalysis(prices, result_cache=cache).sweep([5], [20, 30], sl_stop=0.05)
+    MomentumAnalysis(prices, result_cache=cache).MomentumBasedLongShort(10, 40, sl_stop=0.05)
+    assert len(cache) == 3
+
+    table = MomentumAnalysis(prices, result_cache=cache).sweep([5, 10], [20, 30, 40], sl_stop=0.05)
+    assert cache.hits == 3 and len(cache) == 6
+    pd.testing.assert_frame_equal(table, expected.astype(float))
+
+    MomentumAnalysis(prices, result_cache=cache).sweep([5], [20], sl_stop=0.1)
+    assert len(cache) == 7
+
+def test_sweep_stores_returns_of_a_single_new_parameter_set(tmp_path):
+    from Backtest.models.ResultCache import ResultCache
+
+    prices = make_prices().iloc[:, 0]
+    cache = ResultCache(tmp_path, store_returns=True)
+    MomentumAnalysis(prices, result_cache=cache).sweep([5], [20, 30])
+    MomentumAnalysis(prices, result_cache=cache).sweep([5], [20, 30, 40])
+    assert len(cache) == 3
+
+    key = ResultCache.key(MomentumAnalysis(prices).fingerprint(), "MomentumBasedLongShort",
+                          {"short_window": 5, "long_window": 40, "init_cash": 100000})
+    (_, returns) = cache.get(key)
+    expected = MomentumAnalysis(prices).MomentumBasedLongShort(5, 40).returns()
+    np.testing.assert_allclose(returns.iloc[:, 0], expected)
+
+def test_to_record_keeps_metrics_and_releases_portfolio():
+    from Backtest.controllers.Analysis import MetricsRecord, records_frame
+
+    prices = make_prices()
+    analysis = MomentumAnalysis(prices)
+    portfolio = analysis.MomentumBasedLongShort(10, 40, sl_stop=0.05)
+    record = analysis.to_record(equity_points=25)
+
+    assert analysis.portfolio is None
+    assert not hasattr(record, "__dict__")
+    np.testing.assert_allclose(record.sharpe_ratio, portfolio.sharpe_ratio())
+    np.testing.assert_allclose(record.max_drawdown, portfolio.max_drawdown())
+    np.testing.assert_allclose(record.exposure, portfolio.position_coverage())
+    assert record.trade_count == portfolio.trades.count()
+    assert len(record.equity) == 25 and record.equity.dtype == np.float32
+    assert record.equity.index[-1] == prices.index[-1]
+
+    table = analysis.sweep([10], [40], sl_stop=0.05)
+    pd.testing.assert_frame_equal(records_frame([record], index=table.index), table.astype(float))
+    assert MetricsRecord.from_portfolio(portfolio).equity is None
@@ -1,7 +1,15 @@
 import numpy as np
 import pandas as pd
+import pytest
 
-from Backtest.controllers.PairTradeAnalysis import divergence_indicator, generate_pairs
+from Backtest.controllers.PairTradeAnalysis import (PairTradeAnalysis, divergence_indicator,
+                                                    divergence_signals, generate_pairs)
+
+def make_prices(n_bars=200, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, 1)) + rng.normal(0, 0.01, size=(n_bars, 3))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH", "SOL"])
 
 def test_divergence_indicator():
     price_data = [(100, 105), (102, 107), (101, 106), (103, 108)]
@@ -22,4 +30,39 @@ def test_generate_pairs():
     pairs = generate_pairs(price_data)
 
     expected_pairs = [('AAPL', 'MSFT'), ('AAPL', 'GOOG'), ('MSFT', 'GOOG')]
-    assert pairs == expected_pairs
\ No newline at end of file
+    assert pairs == expected_pairs
+
+def test_divergence_signals():
+    prices = make_prices().values
+    pairs = [(0, 1), (0, 2), (2, 1)]
+
+    entries, exits = divergence_signals(prices, pairs)
+
+    assert entries.shape == (len(prices) - 1, 3)
+    for k, pair in enumerate(pairs):
+        pair_entries, pair_exits = divergence_indicator(prices[:, pair])
+        np.testing.assert_array_equal(entries[:, k], pair_entries)
+        np.testing.assert_array_equal(exits[:, k], pair_exits)
+
+def test_scan_pairs():
+    prices = make_prices()
+    pairs = [('BTC', 'ETH'), ('ETH', 'SOL')]
+
+    table = PairTradeAnalysis(prices).scan_pairs(pairs)
+
+    assert list(table.index) == pairs
+    for pair, row in table.iterrows():
+        portfolio = PairTradeAnalysis(prices).PairCorrLongOnly(pair)
+        np.testing.assert_allclose(row["sharpe_ratio"], portfolio.sharpe_ratio())
+        assert row["trade_count"] == portfolio.trades.count()
+
+def test_scan_pairs_unknown_asset():
+    with pytest.raises(KeyError):
+        PairTradeAnalysis(make_prices()).scan_pairs([("BTC", "DOGE")])
+
+def test_scan_pairs_without_pairs():
+    table = PairTradeAnalysis(make_prices()).scan_pairs([], metrics=["sharpe_ratio"])
+
+    assert len(table) == 0
+    assert list(table.columns) == ["sharpe_ratio"]
+    assert table.index.names == ["asset1", "asset2"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.controllers.SplitEngine import (SplitEngine, explicit_splits, momentum_strategy,
+                                              random_splits, rolling_splits)
+
+def make_prices(n_bars=400, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, 2))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH"])
+
+def test_random_splits_are_seeded():
+    assert random_splits(400, 5, 100, seed=1) == random_splits(400, 5, 100, seed=1)
+    assert all(stop - start == 100 for (start, stop) in random_splits(400, 5, 100, seed=1))
+
+def test_random_splits_cover_every_start():
+    assert {start for (start, _) in random_splits(12, 500, 10, seed=0)} == {0, 1, 2}
+    assert random_splits(10, 3, 10, seed=0) == [(0, 10)] * 3
+    with pytest.raises(ValueError):
+        random_splits(10, 3, 11)
+
+def test_rolling_stack_is_a_view():
+    prices = make_prices()
+    engine = SplitEngine(prices, rolling_splits(len(prices), 100, step=50))
+
+    stacked = engine.stack()
+
+    assert stacked.shape == (7, 100, 2)
+    assert np.shares_memory(stacked, prices.values)
+    np.testing.assert_array_equal(stacked[2], prices.values[100:200])
+
+def test_evaluate_matches_single_analyses():
+    prices = make_prices()
+    engine = SplitEngine(prices, random_splits(len(prices), 4, 150, seed=2))
+
+    sharpes = engine.evaluate(momentum_strategy(10, 40), sl_stop=0.05)
+
+    expected = [
+        MomentumAnalysis(prices.reindex(split)).MomentumBasedLongShort(10, 40, sl_stop=0.05).sharpe_ratio()
+        for split in engine.index_splits()
+    ]
+    np.testing.assert_allclose(sharpes, expected)
+    assert explicit_splits(prices.index, engine.index_splits()) == engine.splits
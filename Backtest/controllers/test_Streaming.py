@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backtest.controllers.MeanReversionAnalysis import MeanReversionAnalysis
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.controllers.Streaming import StreamingMACrossover, StreamingRSI, StreamingStrategy
+
+def make_prices(n_bars=2000, seed=11):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="h")
+    returns = rng.normal(0, 0.01, size=(n_bars, 3))
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH", "SOL"])
+    prices.iloc[700:720, 2] = np.nan
+    prices.iloc[:30, 1] = np.nan
+    return prices
+
+def replay(strategy, prices, batch_sizes=(1, 7, 1, 64)):
+    """Feed prices bar by bar and in small batches, and stack the emitted signals."""
+    (entries, exits, start, k) = ([], [], 0, 0)
+    values = prices.to_numpy()
+    while start < len(values):
+        size = batch_sizes[k % len(batch_sizes)]
+        if size == 1:
+            (entry, exit) = strategy.update(values[start])
+            (entry, exit) = (entry[None], exit[None])
+        else:
+            (entry, exit) = strategy.update(values[start:start + size])
+        entries.append(entry)
+        exits.append(exit)
+        (start, k) = (start + size, k + 1)
+    return (np.concatenate(entries), np.concatenate(exits))
+
+def test_ma_crossover_matches_batch():
+    prices = make_prices()
+    for (short_window, long_window) in [(5, 20), (15, 50)]:
+        (entries, exits) = MomentumAnalysis(prices)._MAStrategy(short_window, long_window)
+        (stream_entries, stream_exits) = replay(StreamingMACrossover(3, short_window, long_window), prices)
+        assert entries.to_numpy().any()
+        np.testing.assert_array_equal(stream_entries, entries.to_numpy())
+        np.testing.assert_array_equal(stream_exits, exits.to_numpy())
+
+def test_rsi_matches_batch():
+    prices = make_prices()
+    for (window, level) in [(10, 30), (15, 25)]:
+        (entries, exits) = MeanReversionAnalysis(prices)._MRStrategy(window, level)
+        (stream_entries, stream_exits) = replay(StreamingRSI(3, window, level), prices)
+        assert entries.to_numpy().any()
+        np.testing.assert_array_equal(stream_entries, entries.to_numpy())
+        np.testing.assert_array_equal(stream_exits, exits.to_numpy())
+
+def test_state_does_not_grow():
+    strategy = StreamingMACrossover(3, 5, 20)
+    strategy.update(make_prices(100).to_numpy())
+    buffers = strategy.slow_ma.cumsum_buffer.shape
+    strategy.update(make_prices(1000).to_numpy())
+    assert strategy.slow_ma.cumsum_buffer.shape == buffers == (20, 3)
+
+def test_warmed_up_stream_continues_history():
+    prices = make_prices()
+    stream = MomentumAnalysis(prices.iloc[:1500]).streaming(5, 20)
+    (entries, exits) = MomentumAnalysis(prices)._MAStrategy(5, 20)
+    for i in range(1500, 1600):
+        (entry, exit) = stream.update(prices.iloc[i].to_numpy())
+        np.testing.assert_array_equal(entry, entries.iloc[i].to_numpy())
+        np.testing.assert_array_equal(exit, exits.iloc[i].to_numpy())
+
+def test_incomplete_strategy_fails_on_construction():
+    class Incomplete(StreamingStrategy):
+        def __init__(self, n_assets):
+            self.n_assets = n_assets
+
+    with pytest.raises(TypeError):
+        Incomplete(3)
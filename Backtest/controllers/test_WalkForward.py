@@ -0,0 +1,71 @@
+import matplotlib
+import numpy as np
+import pandas as pd
+from vectorbt.portfolio import Portfolio
+
+from Backtest.controllers.Analysis import plot_datetime_splits
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.controllers.WalkForward import (EvolutionaryWalkForward, MeanReversionWalkForward,
+                                              MomentumWalkForward, walk_forward)
+
+matplotlib.use("Agg")
+
+def make_prices(n_bars=500, seed=3, assets=("BTC", "ETH")):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, len(assets)))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=list(assets))
+
+def make_signals(prices, n_signals=3, seed=5):
+    rng = np.random.default_rng(seed)
+    shape = prices.shape if prices.shape[1] > 1 else (len(prices),)
+    entries = [rng.random(shape) > 0.9 for _ in range(n_signals)]
+    exits = [rng.random(shape) > 0.9 for _ in range(n_signals)]
+    return entries, exits
+
+def test_momentum_walk_forward():
+    prices = make_prices()
+
+    result = walk_forward(prices, MomentumWalkForward([5, 10], [20, 40]), train_len=200, test_len=100)
+
+    assert len(result.folds) == 3
+    assert len(result.oos_returns) == 300
+    assert result.oos_returns.index.is_unique
+    np.testing.assert_allclose(result.oos_equity.iloc[-1], 100000 * (1 + result.oos_returns).prod())
+
+    # The test score uses the indicators computed over the full history, sliced to the test rows.
+    fold = result.folds.iloc[1]
+    (entries, exits) = MomentumAnalysis(prices)._MAStrategy(int(fold["short_window"]), int(fold["long_window"]))
+    test = slice(300, 400)
+    portfolio = Portfolio.from_signals(
+        prices.iloc[test], entries.iloc[test], exits.iloc[test], exits.iloc[test], entries.iloc[test],
+        init_cash=100000, cash_sharing=True
+    )
+    np.testing.assert_allclose(fold["test_sharpe_ratio"], portfolio.sharpe_ratio())
+
+    plot_datetime_splits(result.fold_splits)
+
+def test_mean_reversion_walk_forward():
+    prices = make_prices()
+
+    result = walk_forward(prices, MeanReversionWalkForward([10, 20], [25, 30]), train_len=200, test_len=100)
+
+    assert len(result.folds) == 3
+    assert len(result.oos_returns) == 300
+    assert set(result.folds["window"]) <= {10, 20} and set(result.folds["level"]) <= {25, 30}
+    assert np.isfinite(result.folds["train_sharpe_ratio"]).all()
+
+def test_evolutionary_walk_forward():
+    for assets in (("BTC",), ("BTC", "ETH", "SOL")):
+        prices = make_prices(assets=assets)
+        (entries, exits) = make_signals(prices)
+        strategy = EvolutionaryWalkForward(np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=3,
+                                           n_steps=2, generation_size=2)
+
+        result = walk_forward(prices, strategy, train_len=100, test_len=50, step=150)
+
+        assert len(result.folds) == 3
+        assert len(result.oos_returns) == 150
+        assert result.oos_returns.index.is_unique
+        for weights in result.folds["weights"]:
+            assert weights.shape == (3,)
@@ -1,30 +1,97 @@
-import requests
+import asyncio
+import email.utils
 import os
+import time
 import pandas as pd
+from functools import lru_cache
 from Backtest.models.LocalDataStorage import LocalDataStore
-from dotenv import load_dotenv
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Optional, Any
 
-load_dotenv()
-api_key = os.getenv('COINGLASS_API_KEY')
+if TYPE_CHECKING:
+    # The HTTP clients are imported on the first request.
+    import httpx
+
+@lru_cache(maxsize=None)
+def _load_dotenv() -> bool:
+    from dotenv import load_dotenv
+    return load_dotenv()
+
+def get_api_key() -> Optional[str]:
+    """Return the CoinGlass API key from the environment, reading .env on the first call."""
+    _load_dotenv()
+    return os.getenv('COINGLASS_API_KEY')
+
+COINGLASS_API_URL = "https://open-api-v3.coinglass.com/api"
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def retry_after_delay(retry_after: Optional[str], default: float) -> float:
+    """
+    Return the seconds to wait given a Retry-After header, in seconds or as an HTTP date.
+
+    Falls back to default when the header is missing or cannot be parsed.
+    """
+    if retry_after is None:
+        return default
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
+
+async def get_with_backoff(client: "httpx.AsyncClient", url: str, max_retries: int = 5,
+                           backoff: float = 1.0, **kwargs) -> "httpx.Response":
+    """
+    Send a GET request with a pooled client, retrying rate limited and server error responses.
+
+    Waits for the Retry-After header of a rate limited response when present, in seconds or as
+    an HTTP date, and otherwise backs off exponentially (backoff, 2 * backoff, 4 * backoff, ...).
+
+    Args:
+        client (httpx.AsyncClient): The client whose connection pool is reused.
+        url (str): The url to request, relative to the client's base url.
+        max_retries (int, optional): Number of retries before giving up. Defaults to 5.
+        backoff (float, optional): Initial wait in seconds between retries. Defaults to 1.0.
+        **kwargs: Additional keyword arguments to be passed to client.get, e.g. params and headers.
+
+    Returns:
+        httpx.Response: The successful response.
+
+    Raises:
+        httpx.HTTPStatusError: If the request still fails after max_retries retries.
+    """
+    for attempt in range(max_retries + 1):
+        response = await client.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+            break
+        delay = retry_after_delay(response.headers.get("Retry-After"), backoff * 2 ** attempt)
+        await asyncio.sleep(delay)
+    response.raise_for_status()
+    return response
 
 class CoinGlassFearGreedIndex(LocalDataStore):
-    def __init__(self, file_path: str):
-        super().__init__(file_path)
+    def __init__(self, file_path: str, format: Optional[str] = None):
+        super().__init__(file_path, format)
 
     def process_response(self, json_data: dict) -> pd.DataFrame:
-        """Process the JSON response from the CoinGlass Fear and Greed API."""
-        if json_data["data"]:
-            data = pd.DataFrame(json_data["data"])
-            data["dates"] = pd.to_datetime(data["dates"], unit="ms")
-            data.set_index(data["dates"], inplace=True)
-            data = data[["values"]]
-            return data
+        """Process the JSON response from the CoinGlass Fear and Greed API. No data gives an empty frame."""
+        if not json_data["data"]:
+            return pd.DataFrame({"values": []}, index=pd.DatetimeIndex([], name="dates"))
+        data = pd.DataFrame(json_data["data"])
+        data["dates"] = pd.to_datetime(data["dates"], unit="ms")
+        data.set_index(data["dates"], inplace=True)
+        data = data[["values"]]
+        return data
 
     def fetch(self, debug=False) -> pd.DataFrame:
-        url = "https://open-api-v3.coinglass.com/api/index/fear-greed-history"
+        import requests
+
+        url = COINGLASS_API_URL + "/index/fear-greed-history"
         with requests.Session() as session:
-            response = session.get(url, headers={"CG-API-KEY": api_key})
+            response = session.get(url, headers={"CG-API-KEY": get_api_key()})
             if response.status_code == 200:
                 if debug:
                     print(response.json())
@@ -36,19 +103,30 @@ class CoinGlassOI(LocalDataStore):
     """Class for fetching and storing CoinGlass Open Interest data."""
 
     coin: str
+    endpoint = "/futures/openInterest/ohlc-aggregated-history"
 
-    def __init__(self, file_path: str, coin: str):
-        super().__init__(file_path)
+    def __init__(self, file_path: str, coin: str, format: Optional[str] = None):
+        super().__init__(file_path, format)
         self.coin = coin
 
     def process_response(self, json_data: dict) -> pd.DataFrame:
-        """Process the JSON response from the CoinGlass API."""
-        if json_data["data"]:
-            data = pd.DataFrame(json_data["data"])
-            data["t"] = pd.to_datetime(data["t"], unit="ms")
-            data.set_index(data["t"], inplace=True)
-            data = data[["h"]]
-            return data
+        """Process the JSON response from the CoinGlass API. No data gives an empty frame."""
+        if not json_data["data"]:
+            return pd.DataFrame({"h": []}, index=pd.DatetimeIndex([], name="t"))
+        data = pd.DataFrame(json_data["data"])
+        data["t"] = pd.to_datetime(data["t"], unit="ms")
+        data.set_index(data["t"], inplace=True)
+        # The API sends the values as strings; cast them to match the dtype read from the cache.
+        data = data[["h"]].astype(float)
+        return data
+
+    def request_params(self, days=1000, debug=False) -> dict:
+        """Return the query parameters for fetching days of daily open interest."""
+        return {
+            "symbol": self.coin,
+            "interval": "1d",
+            "limit": 10 if debug else days,
+        }
 
     def fetch(self, days=1000, debug=False) -> pd.DataFrame:
         """
@@ -62,18 +140,49 @@ class CoinGlassOI(LocalDataStore):
             pd.DataFrame: DataFrame containing the fetched historical data.
         """
 
-        url = "https://open-api-v3.coinglass.com/api/futures/openInterest/ohlc-aggregated-history"
+        import requests
 
-        params = {
-            "symbol": self.coin,
-            "interval": "1d",
-            "limit": 10 if debug else days,
-        }
+        url = COINGLASS_API_URL + self.endpoint
 
         with requests.Session() as session:
-            response = session.get(url, params=params, headers={"CG-API-KEY": api_key})
+            response = session.get(url, params=self.request_params(days, debug), headers={"CG-API-KEY": get_api_key()})
             if response.status_code == 200:
                 if debug:
                     print(response.json())
                 df = self.process_response(response.json())
-                return df
\ No newline at end of file
+                return df
+
+    async def fetch_async(self, client: "httpx.AsyncClient", days=1000, max_retries=5, backoff=1.0) -> pd.DataFrame:
+        """
+        Fetches historical open interest data with a shared async client.
+
+        Args:
+            client (httpx.AsyncClient): The pooled client, with its base url set to the CoinGlass API.
+            days (int, optional): Number of days of historical data to fetch. Defaults to 1000.
+            max_retries (int, optional): Number of retries of rate limited requests. Defaults to 5.
+            backoff (float, optional): Initial wait in seconds between retries. Defaults to 1.0.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the fetched historical data.
+        """
+        response = await get_with_backoff(
+            client,
+            self.endpoint,
+            max_retries=max_retries,
+            backoff=backoff,
+            params=self.request_params(days),
+            headers={"CG-API-KEY": get_api_key() or ""}
+        )
+        return self.process_response(response.json())
+
+    def fetch_since(self, start, days=1000, debug=False) -> pd.DataFrame:
+        """
+        Fetches the daily open interest data from start onwards, including the bar at start.
+
+        Args:
+            start (pd.Timestamp): The last timestamp already stored.
+            days (int, optional): The maximum number of days to fetch. Defaults to 1000.
+            debug (bool, optional): If True, fetches a limited number of data for debugging purposes. Defaults to False.
+        """
+        missing_days = (pd.Timestamp.now(tz=start.tz) - start).days + 1
+        return self.fetch(days=max(1, min(days, missing_days)), debug=debug)
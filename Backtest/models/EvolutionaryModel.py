@@ -1,8 +1,18 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any, Optional, List, Callable
 from vectorbt.portfolio import Portfolio
 import numpy as np
+import pandas as pd
 from math import isfinite
-import copy
+from Backtest.Instrumentation import count, span
+from Backtest.models.FastFitness import FAST_METRICS, fast_fitness
+from Backtest.models.GenerationLog import GenerationLog
+from Backtest.models.ResultCache import ResultCache, data_fingerprint
+from Backtest.models.SignalStack import SignalStack
 
 def compute_sharpe_ratio_fitness(portfolio: Portfolio) -> float:
     """
@@ -11,9 +21,14 @@ def compute_sharpe_ratio_fitness(portfolio: Portfolio) -> float:
     Returns:
         float: The fitness value, which is the sharpe ratio of the portfolio.
                 If the sharpe ratio is not finite, -1 is returned.
+                For a portfolio simulating a population as columns (or groups),
+                an array with the fitness of each individual is returned.
     """
     fitness = portfolio.sharpe_ratio()
-    return fitness if isfinite(fitness) else -1
+    if np.ndim(fitness) == 0:
+        return fitness if isfinite(fitness) else -1
+    fitness = np.asarray(fitness, dtype=float)
+    return np.where(np.isfinite(fitness), fitness, -1)
 
 def blend_signals(entries, exits, weights, entry_threshold=0.5, exit_threshold=0.5, debug=False):
     """Take list of vectorbt entries and exits, and blend them into a single signal.
@@ -23,8 +38,8 @@ def blend_signals(entries, exits, weights, entry_threshold=0.5, exit_threshold=0
     for the exit.
     
     Args:
-        entries (list of np.ndarray): List of entry signals (boolean arrays).
-        exits (list of np.ndarray): List of exit signals (boolean arrays).
+        entries (list of np.ndarray or SignalStack): List of entry signals (boolean arrays).
+        exits (list of np.ndarray or SignalStack): List of exit signals (boolean arrays).
         weights (list of float): List of weights for each signal.
         entry_threshold (float): Threshold for the blended entry signal. Defaults to 0.5.
         exit_threshold (float): Threshold for the blended exit signal. Defaults to 0.5.
@@ -39,6 +54,8 @@ def blend_signals(entries, exits, weights, entry_threshold=0.5, exit_threshold=0
         print(entries)
         print(exits)
         print(weights)
+    if isinstance(entries, SignalStack) and isinstance(exits, SignalStack):
+        return entries.blend(weights, entry_threshold), exits.blend(weights, exit_threshold)
     weighted_entries = np.average(entries, axis=0, weights=weights)
     weighted_exits = np.average(exits, axis=0, weights=weights)
     
@@ -47,12 +64,39 @@ def blend_signals(entries, exits, weights, entry_threshold=0.5, exit_threshold=0
     
     return blended_entries, blended_exits
 
-def generate_weights(weights=None, weight_length=0, mutation_rate=0.01, debug=False):
+def stack_signals(signals, packed=False):
+    """Stack a list of signals once into a compact SignalStack (uint8, or bit-packed if packed)."""
+    return SignalStack(signals, packed=packed)
+
+def blend_population(entry_stack, exit_stack, weights, entry_threshold=0.5, exit_threshold=0.5):
+    """Blend stacked signals for a whole population at once.
+
+    Row i of the result equals blend_signals(entries, exits, weights[i]).
+
+    Args:
+        entry_stack (SignalStack): Entry signals from stack_signals.
+        exit_stack (SignalStack): Exit signals from stack_signals.
+        weights (np.ndarray): Weights of each individual, shape (population, signals).
+        entry_threshold (float or np.ndarray): Threshold for the blended entry signal, or one
+            threshold per individual. Defaults to 0.5.
+        exit_threshold (float or np.ndarray): Threshold for the blended exit signal, or one
+            threshold per individual. Defaults to 0.5.
+
+    Returns:
+        tuple: Blended entry and exit signals as boolean arrays of shape (population, bars[, assets]).
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    return entry_stack.blend(weights, entry_threshold), exit_stack.blend(weights, exit_threshold)
+
+def generate_weights(weights=None, weight_length=0, mutation_rate=0.01, debug=False, rng=None):
     """Mutates weight array vector by adding random noise to weight array elements and normalizing.
     
     Args:
         weights (np.ndarray or None): Initial weights vector. If None, a random vector is generated.
+            A 2-D array is treated as a population with one weights vector per row.
         mutation_rate (float): Rate at which weights are mutated. Defaults to 0.1.
+        rng (np.random.Generator, optional): The random stream to draw the noise from. Defaults to
+            the global np.random state.
     
     Returns:
         np.ndarray: Mutated and normalized weights vector.
@@ -62,14 +106,14 @@ def generate_weights(weights=None, weight_length=0, mutation_rate=0.01, debug=Fa
         weights /= weight_length
         return weights
 
-    noise = np.random.normal(0, mutation_rate, size=weights.shape)
+    noise = (np.random if rng is None else rng).normal(0, mutation_rate, size=weights.shape)
     mutated_weights = weights + noise
 
 
     mutated_weights = np.clip(mutated_weights, 0.01, None)
 
 
-    normalized_weights = mutated_weights / np.sum(mutated_weights)
+    normalized_weights = mutated_weights / np.sum(mutated_weights, axis=-1, keepdims=True)
 
     if debug:
         print("Normalized Weights: ", normalized_weights)
@@ -79,23 +123,22 @@ def generate_weights(weights=None, weight_length=0, mutation_rate=0.01, debug=Fa
 class EvolutionaryPortfolio:
     """A vectorbt portfolio object that stores information and methods for evolving the portfolio.
     Assumes the entries and exits are standard signal strategies with weights and appropriate indecies.
+
+    The data, signals, thresholds and portfolio kwargs live in a PopulationContext that is shared,
+    not copied, by clones and by the members of a family. An individual only owns its weights and
+    its lazily computed blended signals, portfolio and fitness.
     """
 
-    portfolio: Optional[Any] = None
-    data: Any
+    context: "PopulationContext"
     weights: List[float]
-    entries: List[Any]
-    exits: List[Any]
-    weighted_entries: List[Any]
-    weighted_exits: List[Any]
-    entry_threshold: float
-    exit_threshold: float
-    init_cash: float
-    fitness_criteria: Callable[[Any], float]
-    portfolio_kwargs: dict
+    _weighted_entries: Optional[Any] = None
+    _weighted_exits: Optional[Any] = None
+    _portfolio: Optional[Any] = None
+    _fitness: Optional[float] = None
+    _thresholds: Optional[tuple] = None
     
     def __init__(self, data, weights, entries, exits, entry_threshold=0.5, exit_threshold=0.5,
-                 fitness_criteria=compute_sharpe_ratio_fitness, **portfolio_kwargs):
+                 fitness_criteria=compute_sharpe_ratio_fitness, context=None, **portfolio_kwargs):
         """
         Initializes an instance of the EvolutionaryModel class.
 
@@ -108,32 +151,104 @@ class EvolutionaryPortfolio:
         - exit_threshold: The threshold for considering an exit signal.
         - init_cash: The initial cash for the portfolio.
         - fitness_criteria: The fitness criteria used for evaluating the model.
+        - context: A PopulationContext to share instead of building one from the arguments above.
 
         Returns:
         None
         """
-        self.data = data
+        if context is None:
+            context = PopulationContext(data, entries, exits, entry_threshold, exit_threshold,
+                                        fitness_criteria, portfolio_kwargs)
+        self.context = context
         self.weights = weights
-        self.entries = entries
-        self.exits = exits
-        self.entry_threshold = entry_threshold
-        self.exit_threshold = exit_threshold
-        self.fitness_criteria = fitness_criteria
-        self.portfolio_kwargs = portfolio_kwargs
+        self._weighted_entries = None
+        self._weighted_exits = None
+        self._portfolio = None
+        self._fitness = None
+
+    @classmethod
+    def from_context(cls, context, weights, entry_threshold=None, exit_threshold=None) -> "EvolutionaryPortfolio":
+        """Create an individual with weights over a shared PopulationContext.
+
+        entry_threshold and exit_threshold override the thresholds of the context, for individuals
+        that evolved their own thresholds.
+        """
+        individual = cls(None, weights, None, None, context=context)
+        if entry_threshold is not None or exit_threshold is not None:
+            individual._thresholds = (
+                context.entry_threshold if entry_threshold is None else float(entry_threshold),
+                context.exit_threshold if exit_threshold is None else float(exit_threshold),
+            )
+        return individual
+
+    @property
+    def data(self):
+        return self.context.data
+
+    @property
+    def entries(self):
+        return self.context.entries
+
+    @property
+    def exits(self):
+        return self.context.exits
+
+    @property
+    def entry_threshold(self) -> float:
+        return self.context.entry_threshold if self._thresholds is None else self._thresholds[0]
+
+    @property
+    def exit_threshold(self) -> float:
+        return self.context.exit_threshold if self._thresholds is None else self._thresholds[1]
+
+    @property
+    def fitness_criteria(self) -> Callable[[Any], float]:
+        return self.context.fitness_criteria
+
+    @property
+    def portfolio_kwargs(self) -> dict:
+        return self.context.portfolio_kwargs
+
+    def _blend(self):
+        with span("evolution.blend"):
+            self._weighted_entries, self._weighted_exits = blend_signals(
+                self.context.entry_stack,
+                self.context.exit_stack,
+                self.weights,
+                entry_threshold=self.entry_threshold,
+                exit_threshold=self.exit_threshold
+            )
+
+    @property
+    def weighted_entries(self):
+        if self._weighted_entries is None:
+            self._blend()
+        return self._weighted_entries
+
+    @property
+    def weighted_exits(self):
+        if self._weighted_exits is None:
+            self._blend()
+        return self._weighted_exits
 
-        self.weighted_entries, self.weighted_exits = blend_signals(
-            self.entries,
-            self.exits,
-            weights,
-            entry_threshold=self.entry_threshold,
-            exit_threshold=self.exit_threshold
-        )
-        self.portfolio = Portfolio.from_signals(
-            self.data,
-            entries=self.weighted_entries,
-            exits=self.weighted_exits,
-            **portfolio_kwargs
-        )
+    @property
+    def portfolio(self) -> Portfolio:
+        """The portfolio of the blended signals, simulated on first access."""
+        if self._portfolio is None:
+            (entries, exits) = (self.weighted_entries, self.weighted_exits)
+            portfolio_kwargs = dict(self.portfolio_kwargs)
+            if np.ndim(self.data) > 1 and np.shape(self.data)[1] > 1:
+                # One group over the assets, as PopulationContext.simulate does for every individual.
+                portfolio_kwargs["group_by"] = True
+            with span("evolution.from_signals"):
+                self._portfolio = Portfolio.from_signals(
+                    self.data,
+                    entries=entries,
+                    exits=exits,
+                    **portfolio_kwargs
+                )
+            count("portfolios_built")
+        return self._portfolio
 
     def evolve_portfolio(self, mutation_rate=0.01, debug=False):
         """
@@ -144,34 +259,23 @@ class EvolutionaryPortfolio:
         Returns:
             None
         """
-        new_weights = generate_weights(self.weights, mutation_rate)
-        weighted_entries, weighted_exits = blend_signals(
-            self.entries,
-            self.exits,
-            new_weights,
-            entry_threshold=self.entry_threshold,
-            exit_threshold=self.exit_threshold
-        )
-        
-        portfolio = Portfolio.from_signals(
-            self.data,
-            entries=weighted_entries,
-            exits=weighted_exits, 
-            **self.portfolio_kwargs
-        )
+        candidate = EvolutionaryPortfolio.from_context(self.context,
+                                                       generate_weights(self.weights, mutation_rate=mutation_rate),
+                                                       self.entry_threshold, self.exit_threshold)
 
         old_fitness = self.fitness()
-        new_fitness = self.fitness_criteria(portfolio)
+        new_fitness = candidate.fitness()
 
         if debug:
             print("Old Fitness: ", old_fitness)
             print("New Fitness: ", new_fitness)
 
         if (new_fitness >= old_fitness):
-            self.weights = new_weights
-            self.weighted_entries = weighted_entries
-            self.weighted_exits = weighted_exits
-            self.portfolio = portfolio
+            self.weights = candidate.weights
+            self._weighted_entries = candidate._weighted_entries
+            self._weighted_exits = candidate._weighted_exits
+            self._portfolio = candidate._portfolio
+            self._fitness = new_fitness
     
     def fitness(self):
         """
@@ -180,55 +284,703 @@ class EvolutionaryPortfolio:
         Returns:
             float: The fitness value, which is the sharpe ratio of the portfolio.
                    If the sharpe ratio is not finite, -1 is returned.
+                   Computed once per portfolio.
         """
-        return self.fitness_criteria(self.portfolio)
+        if self._fitness is None:
+            portfolio = self.portfolio
+            with span("evolution.fitness"):
+                self._fitness = self.fitness_criteria(portfolio)
+        return self._fitness
     
     def clone(self):
-        """Create a deep copy of the current portfolio."""
-        return copy.deepcopy(self)
+        """Create a copy of the current portfolio that shares its context.
+
+        Only the weights are copied. The blended signals, portfolio and fitness are never modified
+        in place, so the clone shares them until it evolves.
+        """
+        clone = EvolutionaryPortfolio.from_context(self.context, np.array(self.weights, copy=True),
+                                                   self.entry_threshold, self.exit_threshold)
+        clone._weighted_entries = self._weighted_entries
+        clone._weighted_exits = self._weighted_exits
+        clone._portfolio = self._portfolio
+        clone._fitness = self._fitness
+        return clone
+
+class FitnessCache:
+    """LRU cache of fitness values keyed on a hash of thresholded entry and exit signals.
+
+    Small weight mutations often blend to exactly the same signals, so a family looks up each
+    candidate here before simulating it. The cache is bounded both by its number of entries and by
+    the bytes held by its keys and values; the least recently used entries are evicted first.
+    """
+
+    ENTRY_BYTES = 8
+
+    def __init__(self, max_entries=100000, max_bytes=64 * 2**20):
+        """
+        Parameters:
+        - max_entries: The maximum number of cached fitness values.
+        - max_bytes: The maximum size of the cached keys and values.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.values = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(entries, exits, fingerprint=b"") -> bytes:
+        """Hash boolean entry and exit signals, and a fingerprint of the simulation inputs."""
+        digest = hashlib.blake2b(fingerprint, digest_size=16)
+        digest.update(np.packbits(entries))
+        digest.update(np.packbits(exits))
+        return digest.digest()
+
+    def get(self, key):
+        """Return the cached fitness for key, or None, counting the hit or miss."""
+        if key in self.values:
+            self.values.move_to_end(key)
+            self.hits += 1
+            return self.values[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, fitness):
+        if key in self.values:
+            self.values.move_to_end(key)
+            return
+        self.values[key] = fitness
+        self.nbytes += len(key) + self.ENTRY_BYTES
+        while self.values and (len(self.values) > self.max_entries or self.nbytes > self.max_bytes):
+            (evicted, _) = self.values.popitem(last=False)
+            self.nbytes -= len(evicted) + self.ENTRY_BYTES
+
+    def clear(self):
+        self.values.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.values)
+
+def release_portfolio(portfolio):
+    """Drop the method caches of a vectorbt portfolio that is no longer needed.
+
+    A Portfolio references itself through its indexing functions, so it is only freed by the cycle
+    collector, which may run several generations later. Its cached methods hold the largest arrays
+    (returns, value, cash, ...); dropping them frees those arrays at once.
+    """
+    for name in [name for name in vars(portfolio) if name.startswith("__cached_")]:
+        delattr(portfolio, name)
+
+def _code_digest(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+def function_key(function) -> Optional[str]:
+    """Return a name identifying a fitness function in fitness cache keys, or None.
+
+    Module level functions are named by module and qualified name. Lambdas and closures have no
+    stable name (every lambda is "<lambda>"), so they are keyed on their name, a hash of their
+    bytecode and constants, and the values of their closure cells and defaults. None is returned
+    for callables that cannot be keyed this way, e.g. callable objects or closures over values
+    ResultCache.key cannot encode; their fitnesses must not go into a shared cache.
+    """
+    module = getattr(function, "__module__", None)
+    qualname = getattr(function, "__qualname__", None)
+    code = getattr(function, "__code__", None)
+    if module is not None and qualname is not None and "<" not in qualname:
+        return f"{module}.{qualname}"
+    if module is None or qualname is None or code is None:
+        return None
+    try:
+        values = {
+            "cells": [cell.cell_contents for cell in function.__closure__ or ()],
+            "defaults": list(function.__defaults__ or ()),
+            "kwdefaults": function.__kwdefaults__ or {},
+        }
+        values_key = ResultCache.key("", "closure", values)
+    except (TypeError, ValueError):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    _code_digest(code, digest)
+    return f"{module}.{qualname}:{digest.hexdigest()}:{values_key}"
+
+class PopulationContext:
+    """The inputs shared by every individual of a family, and the simulation of a weights matrix.
+
+    A context is built once and is immutable: individuals, clones and workers all reference the
+    same data, signals and settings. With a process executor it is sent to each worker once, by
+    the pool initializer, so tasks only carry the rows of weights to evaluate.
+    """
+
+    FAST_KWARGS = ("init_cash", "freq")
+    _CACHED = ("_fingerprint", "_entry_stack", "_exit_stack")
+
+    def __init__(self, data, entries, exits, entry_threshold=0.5, exit_threshold=0.5,
+                 fitness_criteria=compute_sharpe_ratio_fitness, portfolio_kwargs=None, fast_metric=None,
+                 packed_signals=False, fitness_key=None):
+        """
+        Parameters:
+        - data: The data used for backtesting.
+        - entries: The entry signals.
+        - exits: The exit signals.
+        - entry_threshold: The threshold for considering an entry signal.
+        - exit_threshold: The threshold for considering an exit signal.
+        - fitness_criteria: The fitness criteria used for evaluating a portfolio.
+        - portfolio_kwargs: Keyword arguments passed to Portfolio.from_signals.
+        - fast_metric: A key of FAST_METRICS to evaluate weights with the FastFitness kernel instead.
+        - packed_signals: Store the signal stacks with one bit per bar instead of one byte.
+        - fitness_key: A name for fitness_criteria in fitness cache keys. Defaults to function_key(fitness_criteria),
+          which is None for criteria that cannot be keyed.
+        """
+        if fast_metric is not None:
+            if fast_metric not in FAST_METRICS:
+                raise ValueError(f"Unknown fast metric '{fast_metric}'. Expected one of {list(FAST_METRICS)}.")
+            if np.ndim(data) > 1 and np.shape(data)[1] > 1:
+                raise ValueError("The fast fitness kernel only supports single asset data.")
+            unsupported = set(portfolio_kwargs or {}) - set(self.FAST_KWARGS)
+            if unsupported:
+                raise ValueError(f"The fast fitness kernel does not support {sorted(unsupported)}.")
+        self.data = data
+        self.entries = entries
+        self.exits = exits
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.fitness_criteria = fitness_criteria
+        self.portfolio_kwargs = dict(portfolio_kwargs or {})
+        self.fast_metric = fast_metric
+        self.packed_signals = packed_signals
+        self.fitness_key = function_key(fitness_criteria) if fitness_key is None else fitness_key
+        self._fingerprint = None
+        self._entry_stack = None
+        self._exit_stack = None
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False) and name not in self._CACHED:
+            raise AttributeError("PopulationContext is immutable.")
+        object.__setattr__(self, name, value)
+
+    @property
+    def entry_stack(self) -> SignalStack:
+        """The entry signals as a read-only SignalStack, built once on first use."""
+        if self._entry_stack is None:
+            self._entry_stack = stack_signals(self.entries, self.packed_signals)
+        return self._entry_stack
+
+    @property
+    def exit_stack(self) -> SignalStack:
+        """The exit signals as a read-only SignalStack, built once on first use."""
+        if self._exit_stack is None:
+            self._exit_stack = stack_signals(self.exits, self.packed_signals)
+        return self._exit_stack
+
+    @property
+    def fingerprint(self) -> bytes:
+        """A hash of the data, portfolio kwargs and fitness function, used in fitness cache keys.
+
+        Array and Series valued portfolio kwargs are hashed on every value, like ResultCache keys.
+        Without a fitness_key the fitness function is identified by the id of the function object,
+        which is only unique while it is alive, so such fingerprints suit a private cache only.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            data = self.data if isinstance(self.data, (pd.Series, pd.DataFrame)) else pd.DataFrame(np.asarray(self.data))
+            digest.update(data_fingerprint(data).encode())
+            digest.update(ResultCache.key("", "portfolio_kwargs", self.portfolio_kwargs).encode())
+            fitness_key = f"id:{id(self.fitness_criteria)}" if self.fitness_key is None else self.fitness_key
+            digest.update(fitness_key.encode())
+            digest.update(repr(self.fast_metric).encode())
+            self._fingerprint = digest.digest()
+        return self._fingerprint
+
+    def thresholds(self, population) -> np.ndarray:
+        """Return the (population x 2) entry and exit thresholds of the context."""
+        return np.tile([self.entry_threshold, self.exit_threshold], (population, 1)).astype(np.float64)
+
+    def blend(self, weights, thresholds=None):
+        """Blend a weights matrix, with the context thresholds or one (entry, exit) row per individual."""
+        with span("evolution.blend"):
+            if thresholds is None:
+                return blend_population(self.entry_stack, self.exit_stack, weights, self.entry_threshold, self.exit_threshold)
+            return blend_population(self.entry_stack, self.exit_stack, weights, thresholds[:, 0], thresholds[:, 1])
+
+    def simulate(self, weights, thresholds=None, signals=None):
+        """Simulate every row of a weights matrix as one column (or column group) of a single portfolio.
+
+        signals optionally holds the (entries, exits) already blended from weights and thresholds.
+        """
+        population = len(weights)
+        (entries, exits) = self.blend(weights, thresholds) if signals is None else signals
+        close = self.data if isinstance(self.data, (pd.Series, pd.DataFrame)) else pd.DataFrame(np.asarray(self.data))
+        n_bars = close.shape[0]
+        portfolio_kwargs = dict(self.portfolio_kwargs)
+
+        if close.ndim == 1 or close.shape[1] == 1:
+            entries = entries.reshape(population, n_bars).T
+            exits = exits.reshape(population, n_bars).T
+            if close.ndim == 2:
+                close = close.iloc[:, 0]
+        else:
+            n_assets = close.shape[1]
+            columns = pd.MultiIndex.from_product([np.arange(population), close.columns], names=["individual", "asset"])
+            entries = pd.DataFrame(entries.reshape(population, n_bars, n_assets).transpose(1, 0, 2).reshape(n_bars, -1),
+                                   index=close.index, columns=columns)
+            exits = pd.DataFrame(exits.reshape(population, n_bars, n_assets).transpose(1, 0, 2).reshape(n_bars, -1),
+                                 index=close.index, columns=columns)
+            close = close.rename_axis(columns="asset")
+            portfolio_kwargs["group_by"] = np.repeat(np.arange(population), n_assets)
+
+        if not any("stop" in name for name in portfolio_kwargs):
+            # Without stops, orders are only placed on bars with a signal, at most one per bar, so
+            # the order records need not be preallocated with a slot for every bar of every column.
+            n_signals = int(np.count_nonzero(entries)) + int(np.count_nonzero(exits))
+            portfolio_kwargs.setdefault("max_orders", max(1, n_signals))
+        count("portfolios_built", population)
+        with span("evolution.from_signals"):
+            return Portfolio.from_signals(close, entries=entries, exits=exits, **portfolio_kwargs)
+
+    def evaluate(self, weights, thresholds=None, signals=None) -> np.ndarray:
+        """Return the fitness of every row of a weights matrix as an array. See simulate for signals."""
+        if self.fast_metric is not None:
+            return self.evaluate_fast(weights, thresholds, signals)
+        portfolio = self.simulate(weights, thresholds, signals)
+        with span("evolution.fitness"):
+            fitnesses = self.fitness_criteria(portfolio)
+        fitnesses = np.asarray(fitnesses, dtype=np.float64).reshape(len(weights))
+        release_portfolio(portfolio)
+        return fitnesses
+
+    def evaluate_fast(self, weights, thresholds=None, signals=None) -> np.ndarray:
+        """Return the fast_metric of every row of a weights matrix, simulated by the FastFitness kernel."""
+        (entries, exits) = self.blend(weights, thresholds) if signals is None else signals
+        close = self.data if isinstance(self.data, (pd.Series, pd.DataFrame)) else pd.Series(np.ravel(self.data))
+        close = close.iloc[:, 0] if isinstance(close, pd.DataFrame) else close
+        population = len(weights)
+        with span("evolution.fast_fitness"):
+            (_, fitnesses) = fast_fitness(close, entries.reshape(population, -1).T, exits.reshape(population, -1).T,
+                                          metric=self.fast_metric,
+                                          init_cash=self.portfolio_kwargs.get("init_cash", 100.),
+                                          freq=self.portfolio_kwargs.get("freq"))
+        return np.where(np.isfinite(fitnesses), fitnesses, -1)
+
+_worker_context: Optional[PopulationContext] = None
+
+def _init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+def _evaluate_in_worker(task):
+    return _worker_context.evaluate(*task)
+
+THRESHOLD_BOUNDS = (0.05, 0.95)
+
+class SearchStrategy:
+    """The search operators that evolve an EvolutionaryPortfolioFamily.
+
+    step is called once per step of run_simulation and end_generation after every generation_size
+    steps. Strategies update the weights, thresholds and fitnesses of the family in place and only
+    score candidates through family.evaluate, so caching and executors apply to every strategy.
+    """
+
+    def step(self, family, mutation_rate):
+        raise NotImplementedError
+
+    def end_generation(self, family):
+        pass
+
+    def get_state(self) -> dict:
+        """Return the JSON serializable state of the strategy, stored in checkpoints."""
+        return {}
+
+    def set_state(self, state: dict):
+        pass
+
+class HillClimbing(SearchStrategy):
+    """(1+1) hill climbing of every individual, then winner-take-all at the end of each generation.
+
+    Every individual mutates its weights with Gaussian noise of scale mutation_rate and keeps the
+    candidate if it is at least as fit. This is the original search of the family.
+    """
+
+    def step(self, family, mutation_rate):
+        candidates = np.stack([
+            generate_weights(weights, mutation_rate=mutation_rate, rng=rng)
+            for (weights, rng) in zip(family.weights, family.rngs)
+        ])
+        fitnesses = family.evaluate(candidates, family.thresholds)
+        improved = fitnesses >= family.fitnesses
+        family.weights[improved] = candidates[improved]
+        family.fitnesses[improved] = fitnesses[improved]
+
+    def end_generation(self, family):
+        family.optimize_genes()
+
+class GeneticSearch(SearchStrategy):
+    """Generational search with tournament selection, uniform crossover, elitism and an adaptive step size.
+
+    Each step breeds one child per individual: two parents are picked by tournaments, their weights
+    (and thresholds) are mixed gene by gene with probability crossover_rate, and the child is
+    mutated. The elitism best individuals survive unchanged and the best children fill the rest of
+    the population, so the best fitness never decreases.
+
+    With adaptive_sigma the mutation scale starts at the mutation_rate of the first step and then
+    follows the 1/5 success rule, the step size control of (1+1)-ES that CMA-ES generalizes: it
+    grows while more than target_success of the children beat their first parent and shrinks
+    otherwise. With evolve_thresholds every individual also carries its own entry and exit
+    thresholds, mutated with threshold_sigma and kept within THRESHOLD_BOUNDS.
+    """
+
+    def __init__(self, tournament_size=3, crossover_rate=0.7, elitism=1, adaptive_sigma=True,
+                 target_success=0.2, evolve_thresholds=False, threshold_sigma=0.02):
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.elitism = elitism
+        self.adaptive_sigma = adaptive_sigma
+        self.target_success = target_success
+        self.evolve_thresholds = evolve_thresholds
+        self.threshold_sigma = threshold_sigma
+        self.sigma = None
+
+    def _tournament(self, rng, fitnesses) -> np.ndarray:
+        population = len(fitnesses)
+        contenders = rng.integers(0, population, size=(population, self.tournament_size))
+        return contenders[np.arange(population), np.argmax(fitnesses[contenders], axis=1)]
+
+    def step(self, family, mutation_rate):
+        rng = family.rng
+        population = len(family.weights)
+        if self.sigma is None or not self.adaptive_sigma:
+            self.sigma = float(mutation_rate)
+
+        first = self._tournament(rng, family.fitnesses)
+        second = self._tournament(rng, family.fitnesses)
+        crossover = rng.random(population) < self.crossover_rate
+        genes = rng.random((population, family.weights.shape[1] + 2)) < 0.5
+        genes[~crossover] = True
+        weights = np.where(genes[:, :-2], family.weights[first], family.weights[second])
+        thresholds = np.where(genes[:, -2:], family.thresholds[first], family.thresholds[second])
+
+        children = np.stack([
+            generate_weights(row, mutation_rate=self.sigma, rng=individual_rng)
+            for (row, individual_rng) in zip(weights, family.rngs)
+        ])
+        if self.evolve_thresholds:
+            noise = np.stack([individual_rng.normal(0, self.threshold_sigma, 2) for individual_rng in family.rngs])
+            thresholds = np.clip(thresholds + noise, *THRESHOLD_BOUNDS)
+        fitnesses = family.evaluate(children, thresholds)
+
+        if self.adaptive_sigma:
+            success = np.mean(fitnesses > family.fitnesses[first])
+            self.sigma = float(np.clip(self.sigma * np.exp((success - self.target_success) / (1 - self.target_success)),
+                                       1e-4, 1.0))
+
+        elites = np.argsort(-family.fitnesses, kind="stable")[:self.elitism]
+        survivors = np.argsort(-fitnesses, kind="stable")[:population - len(elites)]
+        family.weights = np.concatenate([family.weights[elites], children[survivors]])
+        family.thresholds = np.concatenate([family.thresholds[elites], thresholds[survivors]])
+        family.fitnesses = np.concatenate([family.fitnesses[elites], fitnesses[survivors]])
+
+    def get_state(self) -> dict:
+        return {"sigma": self.sigma}
+
+    def set_state(self, state: dict):
+        self.sigma = state.get("sigma")
+
+EXECUTORS = ("serial", "thread", "process")
 
 class EvolutionaryPortfolioFamily:
-    """Store a family of portfolios and methods related to evolving the family."""
+    """Store a family of portfolios and methods related to evolving the family.
+
+    The family is held as a (population x signals) weights matrix with one fitness per row. Each
+    generation blends the signals of the whole population with one matrix product over the stacked
+    signals and simulates every individual as a column (or column group, for multi-asset data) of a
+    single vectorbt portfolio, so fitness is computed as one array. The incumbent fitnesses are kept,
+    so they are never re-simulated. Full EvolutionaryPortfolio objects are only built on request,
+    e.g. for the best individual.
+
+    With the thread or process executor the population is split into one chunk of rows per worker
+    and the chunks are simulated in parallel. Every individual mutates with its own random stream,
+    spawned from seed, so a seeded run gives the same result for any executor and worker count.
+    Call close() (or use the family as a context manager) to shut the workers down.
+
+    Fitness values are memoized in a FitnessCache keyed on the blended signals, so only the
+    candidates whose signals have not been seen before are simulated. cache_hits and cache_misses
+    count the lookups.
+    """
     initial_weights: List[float]
     data: Any
     entries: List[Any]
     exits: List[Any]
-    evolutionary_portfolios: Optional[List[EvolutionaryPortfolio]] = None
+    weights: np.ndarray
+    fitnesses: np.ndarray
+    context: PopulationContext
 
     def __init__(self, data, weights, entries, exits, num_portfolios=10,
-                 entry_threshold=0.5, exit_threshold=0.5, **portfolio_kwargs):
+                 entry_threshold=0.5, exit_threshold=0.5, fitness_criteria=compute_sharpe_ratio_fitness,
+                 executor="serial", n_workers=None, seed=None, cache=True, fast_metric=None, strategy=None,
+                 packed_signals=False, fitness_key=None, **portfolio_kwargs):
+        """
+        Parameters:
+        - data: The data used for backtesting.
+        - weights: The initial weights of every individual.
+        - entries: The entry signals.
+        - exits: The exit signals.
+        - num_portfolios: The size of the population.
+        - entry_threshold: The threshold for considering an entry signal.
+        - exit_threshold: The threshold for considering an exit signal.
+        - fitness_criteria: Takes a portfolio simulating the population and returns the fitness of
+          each individual as an array, like compute_sharpe_ratio_fitness. Must be picklable for the
+          process executor.
+        - executor: One of "serial", "thread" or "process". Default is "serial".
+        - n_workers: The number of workers of the thread or process executor. Default is the CPU count.
+        - seed: Seed of the random streams of the individuals, for reproducible runs.
+        - cache: True for a new FitnessCache, a FitnessCache to share (e.g. between families on the
+          same data), or False to simulate every candidate. A shared cache is not used when
+          fitness_criteria has no fitness_key.
+        - fast_metric: One of "sharpe_ratio", "sortino_ratio" or "calmar_ratio" to score candidates
+          with the FastFitness kernel instead of fitness_criteria. Only for single asset data with
+          no portfolio kwargs other than init_cash and freq. The full Portfolio is then only built
+          by fetch_best_portfolio. Default is None.
+        - strategy: The SearchStrategy evolving the family. Default is HillClimbing().
+        - packed_signals: Store the signal stacks with one bit per bar instead of one byte. Default is False.
+        - fitness_key: A name for fitness_criteria in fitness cache keys, so families sharing a cache
+          with equivalent criteria share fitnesses. Defaults to function_key(fitness_criteria): the
+          module and name of a module level function, or a hash of the code and closure of a lambda.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Expected one of {list(EXECUTORS)}.")
         self.data = data
         self.initial_weights = weights
         self.entries = entries
         self.exits = exits
         self.entry_threshold = entry_threshold
         self.exit_threshold = exit_threshold
-        self.evolutionary_portfolios = [
-            EvolutionaryPortfolio(data, weights, entries, exits,
-                                  entry_threshold=self.entry_threshold,
-                                  exit_threshold=self.exit_threshold,
-                                  **portfolio_kwargs) 
-            for _ in range(num_portfolios)
-        ]
+        self.fitness_criteria = fitness_criteria
+        self.portfolio_kwargs = portfolio_kwargs
+        self.executor = executor
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._pool = None
+        # An empty FitnessCache is falsy, so test for the flags explicitly.
+        self.cache = FitnessCache() if cache is True else (None if cache is False or cache is None else cache)
+
+        self.context = PopulationContext(data, entries, exits, entry_threshold, exit_threshold,
+                                         fitness_criteria, portfolio_kwargs, fast_metric, packed_signals, fitness_key)
+        if self.context.fitness_key is None and cache is not True:
+            # Criteria without a stable key could be confused with other criteria in a shared cache.
+            self.cache = None
+        self.strategy = HillClimbing() if strategy is None else strategy
+        self.evaluations = 0
+        streams = np.random.SeedSequence(seed).spawn(num_portfolios + 1)
+        self.rngs = [np.random.default_rng(stream) for stream in streams[:num_portfolios]]
+        self.rng = np.random.default_rng(streams[-1])
+        self.weights = np.tile(np.asarray(weights, dtype=np.float64), (num_portfolios, 1))
+        self.thresholds = self.context.thresholds(num_portfolios)
+        self.fitnesses = self.evaluate(self.weights, self.thresholds)
+
+    @property
+    def entry_stack(self) -> SignalStack:
+        return self.context.entry_stack
+
+    @property
+    def exit_stack(self) -> SignalStack:
+        return self.context.exit_stack
+
+    @property
+    def cache_hits(self) -> int:
+        return 0 if self.cache is None else self.cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        return 0 if self.cache is None else self.cache.misses
+
+    @property
+    def evolutionary_portfolios(self) -> List[EvolutionaryPortfolio]:
+        """Build a full EvolutionaryPortfolio for every individual of the family."""
+        return [self.build_portfolio(weights, thresholds) for (weights, thresholds) in zip(self.weights, self.thresholds)]
+
+    def build_portfolio(self, weights, thresholds=None) -> EvolutionaryPortfolio:
+        """Build a full EvolutionaryPortfolio for a weights vector, and optionally its (entry, exit) thresholds."""
+        if thresholds is None:
+            return EvolutionaryPortfolio.from_context(self.context, weights)
+        return EvolutionaryPortfolio.from_context(self.context, weights, *thresholds)
+
+    def simulate(self, weights, thresholds=None):
+        """Simulate every row of a weights matrix as one column (or column group) of a single portfolio."""
+        return self.context.simulate(weights, thresholds)
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.executor == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.n_workers)
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                                 initargs=(self.context,))
+        return self._pool
+
+    def evaluate(self, weights, thresholds=None) -> np.ndarray:
+        """Return the fitness of every row of a weights matrix as an array.
+
+        thresholds optionally holds the (entry, exit) thresholds of every row. Rows whose blended
+        signals are cached are not simulated, and rows that blend to the same signals are simulated
+        once. evaluations counts the rows simulated.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        thresholds = self.context.thresholds(len(weights)) if thresholds is None else np.asarray(thresholds, dtype=np.float64)
+        if self.cache is None:
+            return self._simulate_fitness(weights, thresholds)
+
+        (entries, exits) = self.context.blend(weights, thresholds)
+        fingerprint = self.context.fingerprint
+        keys = [FitnessCache.key(entry, exit, fingerprint) for (entry, exit) in zip(entries, exits)]
+        fitnesses = np.empty(len(weights))
+        pending = {}
+        for (row, key) in enumerate(keys):
+            fitness = self.cache.get(key)
+            if fitness is None:
+                pending.setdefault(key, []).append(row)
+            else:
+                fitnesses[row] = fitness
+        misses = sum(len(positions) for positions in pending.values())
+        count("fitness_cache.hits", len(keys) - misses)
+        count("fitness_cache.misses", misses)
+
+        if pending:
+            rows = [positions[0] for positions in pending.values()]
+            signals = (entries[rows], exits[rows])
+            for ((key, positions), fitness) in zip(pending.items(),
+                                                   self._simulate_fitness(weights[rows], thresholds[rows], signals)):
+                fitnesses[positions] = fitness
+                self.cache.put(key, float(fitness))
+        return fitnesses
+
+    def _simulate_fitness(self, weights, thresholds, signals=None) -> np.ndarray:
+        self.evaluations += len(weights)
+        if self.executor == "serial" or self.n_workers == 1 or len(weights) == 1:
+            return self.context.evaluate(weights, thresholds, signals)
+
+        n_chunks = min(self.n_workers, len(weights))
+        chunks = [rows for rows in np.array_split(np.arange(len(weights)), n_chunks) if len(rows)]
+        pool = self._get_pool()
+        if self.executor == "thread":
+            # Threads share memory, so they reuse the signals blended for the cache keys.
+            results = pool.map(lambda rows: self.context.evaluate(
+                weights[rows], thresholds[rows], None if signals is None else (signals[0][rows], signals[1][rows])
+            ), chunks)
+        else:
+            # Worker tasks only carry weights and thresholds; each worker blends its own chunk.
+            results = pool.map(_evaluate_in_worker, [(weights[rows], thresholds[rows]) for rows in chunks])
+        return np.concatenate(list(results))
+
+    def close(self):
+        """Shut down the workers of the thread or process executor."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def evolve_family(self, mutation_rate=0.01):
-        """Evolve the family of portfolios."""
-        for portfolio in self.evolutionary_portfolios:
-            portfolio.evolve_portfolio(mutation_rate)
+        """Evolve the family of portfolios by one step of its search strategy.
+
+        Every individual mutates with its own random stream and the candidates are evaluated at
+        once. With the default HillClimbing strategy each candidate replaces its parent if its
+        fitness is at least as good.
+        """
+        self.strategy.step(self, mutation_rate)
 
     def optimize_genes(self):
-        """Clone the best portfolio currently in the family and replace all other portfolios with it."""
+        """Copy the best individual currently in the family over all other individuals."""
+
+        best_index = self.best_index()
+        self.weights[:] = self.weights[best_index]
+        self.thresholds[:] = self.thresholds[best_index]
+        self.fitnesses[:] = self.fitnesses[best_index]
 
-        best_portfolio = self.fetch_best_portfolio()
-        self.evolutionary_portfolios = [best_portfolio.clone() for _ in range(len(self.evolutionary_portfolios))]
+    def best_index(self) -> int:
+        """Return the row of the individual with the highest fitness."""
+        return int(np.argmax(self.fitnesses))
 
     def fetch_best_portfolio(self):
         """Fetch the portfolio with the highest fitness."""
-        fitnesses = [portfolio.fitness() for portfolio in self.evolutionary_portfolios]
-        best_index = np.argmax(fitnesses)
-        return self.evolutionary_portfolios[best_index]
+        best_index = self.best_index()
+        return self.build_portfolio(self.weights[best_index].copy(), self.thresholds[best_index])
     
-    def run_simulation(self, n_steps=20, generation_size=10, temperature=1, delta=1, results_log=None, debug=False):
+    def save_checkpoint(self, path, step=0, generation_counter=0, temperature=1, generations=0,
+                        best_fitness=None, stale_generations=0):
+        """
+        Write the population and the state of the run to a NumPy archive.
+
+        The archive holds the weights, thresholds and fitnesses, the state of every random stream
+        and of the search strategy, the temperature, the step and generation counters and the early
+        stopping state. It is written to a temporary file which
+        then replaces path, so an interrupted write never leaves a truncated checkpoint behind.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(
+                file,
+                weights=self.weights,
+                thresholds=self.thresholds,
+                fitnesses=self.fitnesses,
+                rng_states=np.array(json.dumps([rng.bit_generator.state for rng in self.rngs])),
+                rng_state=np.array(json.dumps(self.rng.bit_generator.state)),
+                strategy_state=np.array(json.dumps(self.strategy.get_state())),
+                temperature=np.array(float(temperature)),
+                step=np.array(int(step)),
+                generation_counter=np.array(int(generation_counter)),
+                generations=np.array(int(generations)),
+                best_fitness=np.array(np.max(self.fitnesses) if best_fitness is None else float(best_fitness)),
+                stale_generations=np.array(int(stale_generations)),
+            )
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path) -> dict:
+        """
+        Restore the population from a checkpoint written by save_checkpoint.
+
+        Returns:
+            dict: The step, generation_counter, temperature, generations, best_fitness and
+                stale_generations to continue the run from. Checkpoints written before the last three
+                were stored count generations from the checkpoint and start early stopping afresh.
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            if archive["weights"].shape != self.weights.shape:
+                raise ValueError(f"Checkpoint population {archive['weights'].shape} does not match "
+                                 f"the family {self.weights.shape}.")
+            self.weights = archive["weights"].copy()
+            self.fitnesses = archive["fitnesses"].copy()
+            if "thresholds" in archive:
+                self.thresholds = archive["thresholds"].copy()
+            for (rng, state) in zip(self.rngs, json.loads(str(archive["rng_states"]))):
+                rng.bit_generator.state = state
+            if "rng_state" in archive:
+                self.rng.bit_generator.state = json.loads(str(archive["rng_state"]))
+            if "strategy_state" in archive:
+                self.strategy.set_state(json.loads(str(archive["strategy_state"])))
+            return {
+                "step": int(archive["step"]),
+                "generation_counter": int(archive["generation_counter"]),
+                "temperature": float(archive["temperature"]),
+                "generations": int(archive["generations"]) if "generations" in archive else 0,
+                "best_fitness": (float(archive["best_fitness"]) if "best_fitness" in archive
+                                 else float(np.max(self.fitnesses))),
+                "stale_generations": int(archive["stale_generations"]) if "stale_generations" in archive else 0,
+            }
+
+    def run_simulation(self, n_steps=20, generation_size=10, temperature=1, delta=1, results_log=None, debug=False,
+                       checkpoint_path=None, checkpoint_every=1, resume_from=None, generation_log=None,
+                       patience=None, min_delta=0.0):
         """
         Run a simulation of the family of portfolios.
 
@@ -239,26 +991,77 @@ class EvolutionaryPortfolioFamily:
         - delta (int): Temperature decay factor. Default is 1.
         - results_log (file): File object to write simulation results to. Default is None.
         - debug (bool): Flag to enable debug mode. Default is False.
+        - checkpoint_path (str or Path): Where to write checkpoints with save_checkpoint. Default is None.
+        - checkpoint_every (int): Generations between checkpoints. A checkpoint is also written
+          when the run ends. Default is 1.
+        - resume_from (str or Path): A checkpoint to continue from. Its step and generation counters,
+          temperature and early stopping state replace the arguments above, and the run continues
+          until n_steps. Default is None.
+        - generation_log (GenerationLog): Receives the fitness distribution of every step, and is
+          flushed when the run ends. With checkpoint_path, records are only flushed with each
+          checkpoint, and resuming removes the records logged after the checkpoint, so the log
+          matches the checkpointed run. Default is None.
+        - patience (int): Stop early at the end of a generation when the best fitness has not improved
+          by more than min_delta for this many generations. Default is None (run all n_steps).
+        - min_delta (float): The smallest improvement of the best fitness that resets patience. Default is 0.
+
+        Returns:
+            int: The number of steps run, including steps before a resumed checkpoint.
         """
         step = 0
         generation_counter = 0
+        generations = 0
+        best_fitness = np.max(self.fitnesses)
+        stale_generations = 0
+
+        if resume_from is not None:
+            state = self.load_checkpoint(resume_from)
+            (step, generation_counter, temperature) = (state["step"], state["generation_counter"], state["temperature"])
+            (generations, best_fitness, stale_generations) = (
+                state["generations"], state["best_fitness"], state["stale_generations"]
+            )
+            if generation_log is not None:
+                generation_log.truncate(step)
 
         while step < n_steps:
             self.evolve_family(mutation_rate=temperature)
             step += 1
             generation_counter += 1
+            if generation_log is not None:
+                generation_log.write(GenerationLog.record(step, temperature, self.fitnesses, self.weights),
+                                     flush=checkpoint_path is None)
             if generation_counter == generation_size:
                 temperature *= delta
-                self.optimize_genes()
+                self.strategy.end_generation(self)
                 generation_counter = 0
+                generations += 1
+                if np.max(self.fitnesses) > best_fitness + min_delta:
+                    best_fitness = np.max(self.fitnesses)
+                    stale_generations = 0
+                else:
+                    stale_generations += 1
                 if results_log:
-                    best_portfolio = self.fetch_best_portfolio()
-                    sharpe = best_portfolio.fitness()
-                    weights = best_portfolio.weights
+                    best_index = self.best_index()
+                    sharpe = self.fitnesses[best_index]
+                    weights = self.weights[best_index]
                     weights_str = ",".join(map(str, weights))
                     csv_row = f"{step},{sharpe},{weights_str}\n"
                     if debug: 
                         print(csv_row)
                     with results_log.open(mode='a') as file:
                         file.write(csv_row)
-                        pass
\ No newline at end of file
+                        pass
+                if checkpoint_path is not None and generations % checkpoint_every == 0:
+                    if generation_log is not None:
+                        generation_log.flush()
+                    self.save_checkpoint(checkpoint_path, step, generation_counter, temperature, generations,
+                                         best_fitness, stale_generations)
+                if patience is not None and stale_generations >= patience:
+                    break
+
+        if generation_log is not None:
+            generation_log.flush()
+        if checkpoint_path is not None:
+            self.save_checkpoint(checkpoint_path, step, generation_counter, temperature, generations,
+                                 best_fitness, stale_generations)
+        return step
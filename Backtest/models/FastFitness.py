@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Tuple
+from numba import njit
+from vectorbt import settings
+from vectorbt.utils.math_ import add_nb, is_close_nb, is_close_or_less_nb, is_less_nb
+from vectorbt.returns.nb import get_return_nb, sharpe_ratio_1d_nb, sortino_ratio_1d_nb, calmar_ratio_1d_nb
+
+# Orders smaller than this are rejected, as with the default min_size of Portfolio.from_signals.
+MIN_SIZE = 1e-8
+
+FAST_METRICS = {"sharpe_ratio": 0, "sortino_ratio": 1, "calmar_ratio": 2}
+
+
+@njit(cache=True)
+def _buy_nb(cash, position, debt, free_cash, size, price):
+    if cash == 0:
+        return cash, position, debt, free_cash
+    if is_close_or_less_nb(size * price, cash):
+        final_size = size
+        req_cash = size * price
+    else:
+        final_size = cash / price
+        req_cash = cash
+    if is_less_nb(final_size, MIN_SIZE):
+        return cash, position, debt, free_cash
+
+    new_cash = add_nb(cash, -req_cash)
+    new_position = add_nb(position, final_size)
+    if position < 0:
+        short_size = final_size if new_position < 0 else abs(position)
+        debt_diff = short_size * (debt / abs(position))
+        debt = add_nb(debt, -debt_diff)
+        free_cash = add_nb(free_cash + 2 * debt_diff, -req_cash)
+    else:
+        free_cash = add_nb(free_cash, -req_cash)
+    return new_cash, new_position, debt, free_cash
+
+
+@njit(cache=True)
+def _sell_nb(cash, position, debt, free_cash, size, price):
+    if is_close_nb(size, 0) or is_less_nb(size, MIN_SIZE):
+        return cash, position, debt, free_cash
+
+    acq_cash = size * price
+    new_cash = cash + acq_cash
+    new_position = add_nb(position, -size)
+    if new_position < 0:
+        short_size = size if position < 0 else abs(new_position)
+        short_value = short_size * price
+        debt = debt + short_value
+        free_cash = add_nb(free_cash, add_nb(acq_cash, -2 * short_value))
+    else:
+        free_cash = free_cash + acq_cash
+    return new_cash, new_position, debt, free_cash
+
+
+@njit(cache=True)
+def _short_size_nb(position, free_cash, price):
+    # Size of a sell that closes any long position and shorts with all the free cash.
+    long_size = max(position, 0.)
+    total_free_cash = add_nb(free_cash, long_size * price)
+    if total_free_cash <= 0:
+        return long_size
+    return add_nb(long_size, total_free_cash / price)
+
+
+@njit(cache=True)
+def simulate_returns_nb(close, long_entries, long_exits, short_entries, short_exits, init_cash):
+    """
+    Simulate signal strategies column by column and return the returns of each column.
+
+    Follows the defaults of Portfolio.from_signals: orders at the close with all available cash,
+    no fees, no accumulation, conflicting signals on the same bar are ignored, and an opposite
+    entry reverses the position.
+    """
+    (n_bars, n_columns) = long_entries.shape
+    returns = np.empty((n_bars, n_columns), dtype=np.float64)
+    for col in range(n_columns):
+        close_col = col if close.shape[1] > 1 else 0
+        cash = init_cash
+        free_cash = init_cash
+        position = 0.
+        debt = 0.
+        last_price = np.nan
+        prev_value = init_cash
+        for i in range(n_bars):
+            price = close[i, close_col]
+            if np.isfinite(price) and price > 0:
+                last_price = price
+                le = long_entries[i, col]
+                lx = long_exits[i, col]
+                se = short_entries[i, col]
+                sx = short_exits[i, col]
+                if le or se:
+                    if le and lx:
+                        le = False
+                        lx = False
+                    if se and sx:
+                        se = False
+                        sx = False
+                    if le and se:
+                        le = False
+                        se = False
+
+                if position > 0:
+                    if se:
+                        size = _short_size_nb(position, free_cash, price)
+                        cash, position, debt, free_cash = _sell_nb(cash, position, debt, free_cash, size, price)
+                    elif lx:
+                        cash, position, debt, free_cash = _sell_nb(cash, position, debt, free_cash, position, price)
+                elif position < 0:
+                    if le:
+                        cash, position, debt, free_cash = _buy_nb(cash, position, debt, free_cash, np.inf, price)
+                    elif sx:
+                        cash, position, debt, free_cash = _buy_nb(cash, position, debt, free_cash, -position, price)
+                else:
+                    if le:
+                        cash, position, debt, free_cash = _buy_nb(cash, position, debt, free_cash, np.inf, price)
+                    elif se:
+                        size = _short_size_nb(position, free_cash, price)
+                        cash, position, debt, free_cash = _sell_nb(cash, position, debt, free_cash, size, price)
+
+            value = cash if position == 0 else cash + position * last_price
+            returns[i, col] = get_return_nb(prev_value, value)
+            prev_value = value
+    return returns
+
+
+@njit(cache=True)
+def returns_metric_nb(returns, ann_factor, metric):
+    """Return Sharpe (0), Sortino (1) or Calmar (2) ratio of each column of returns."""
+    out = np.empty(returns.shape[1], dtype=np.float64)
+    for col in range(returns.shape[1]):
+        if metric == 0:
+            out[col] = sharpe_ratio_1d_nb(returns[:, col], ann_factor, 0., 1)
+        elif metric == 1:
+            out[col] = sortino_ratio_1d_nb(returns[:, col], ann_factor, 0.)
+        else:
+            out[col] = calmar_ratio_1d_nb(returns[:, col], ann_factor)
+    return out
+
+
+def annualization_factor(freq: Any) -> float:
+    """Return the number of bars of frequency freq in the year frequency of vectorbt's settings."""
+    return pd.Timedelta(settings.returns["year_freq"]) / pd.Timedelta(freq)
+
+
+def _as_2d(values: Any, dtype) -> np.ndarray:
+    values = np.asarray(values, dtype=dtype)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def fast_fitness(close, entries, exits, short_entries=None, short_exits=None, init_cash: float = 100.,
+                 freq: Any = None, metric: str = "sharpe_ratio") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate signal strategies without building a Portfolio, and return their returns and a metric.
+
+    Gives the same returns as Portfolio.from_signals(close, entries, exits, short_entries=...,
+    short_exits=..., init_cash=init_cash, freq=freq) with no other arguments, in a fraction of
+    the time, since no order, trade or log records are built. Use it to rank many candidates and
+    build the full Portfolio only for the ones worth inspecting.
+
+    Args:
+        close (array-like): Prices, (bars,) or (bars, columns). A single price column is shared by
+            every signal column.
+        entries (array-like): Long entry signals, (bars,) or (bars, columns).
+        exits (array-like): Long exit signals, same shape as entries.
+        short_entries (array-like, optional): Short entry signals. Defaults to no shorts.
+        short_exits (array-like, optional): Short exit signals. Defaults to no shorts.
+        init_cash (float): Initial cash of each column. Defaults to 100.
+        freq (optional): The frequency of the bars. Defaults to the median spacing of the close
+            index, so it is required when close has no DatetimeIndex (e.g. a plain array).
+        metric (str): One of FAST_METRICS. Defaults to "sharpe_ratio".
+
+    Returns:
+        tuple: The (bars, columns) returns and the metric of each column as arrays.
+    """
+    if metric not in FAST_METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Expected one of {list(FAST_METRICS)}.")
+    if freq is None:
+        if not isinstance(getattr(close, "index", None), pd.DatetimeIndex):
+            raise ValueError("freq is required when close has no DatetimeIndex.")
+        freq = pd.Series(close.index).diff().median()
+
+    long_entries = _as_2d(entries, np.bool_)
+    long_exits = _as_2d(exits, np.bool_)
+    no_signals = np.zeros_like(long_entries)
+    short_entries = no_signals if short_entries is None else _as_2d(short_entries, np.bool_)
+    short_exits = no_signals if short_exits is None else _as_2d(short_exits, np.bool_)
+
+    returns = simulate_returns_nb(_as_2d(close, np.float64), long_entries, long_exits, short_entries,
+                                  short_exits, float(init_cash))
+    return returns, returns_metric_nb(returns, annualization_factor(freq), FAST_METRICS[metric])
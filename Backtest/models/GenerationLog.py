@@ -0,0 +1,162 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+
+class GenerationLog():
+    """
+    Buffered, structured log of an evolutionary run with one record per step.
+
+    Records are held in memory and written every buffer_size records and on close, as JSON lines
+    (.jsonl, .json) or as a Parquet dataset (.parquet, .pq, requires pyarrow): a directory with one
+    part file per flush, read as one table by read_generation_log or pd.read_parquet. Each record holds the
+    full fitness distribution of the population, so runs can be compared after the fact without
+    re-simulating. Opening an existing log appends to it, e.g. when a run is resumed from a
+    checkpoint.
+
+    Every flush leaves complete files, so a log can be read, and appended to, after the process is
+    killed: JSON lines are appended, and each Parquet part is written to a temporary file that is
+    then renamed. A flush only writes the new records.
+    """
+
+    path: str
+    format: str
+    buffer_size: int
+    records: List[Dict[str, Any]]
+
+    def __init__(self, path, buffer_size: int = 100, format: Optional[str] = None):
+        """
+        Args:
+            path (str or Path): The file to write.
+            buffer_size (int): The number of records held before writing. Defaults to 100.
+            format (str, optional): "jsonl" or "parquet". Defaults to the format of the extension.
+        """
+        self.path = str(path)
+        if format is None:
+            extension = os.path.splitext(self.path)[1].lower()
+            format = "parquet" if extension in (".parquet", ".pq") else "jsonl"
+        if format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown log format '{format}'. Expected 'jsonl' or 'parquet'.")
+        self.format = format
+        self.buffer_size = buffer_size
+        self.records = []
+
+    def write(self, record: Dict[str, Any], flush: bool = True):
+        """
+        Add a record, writing the buffer once it holds buffer_size records.
+
+        Args:
+            record (dict): The record, e.g. from GenerationLog.record.
+            flush (bool): If False, keep the record buffered until the next explicit flush, e.g. the
+                next checkpoint of a run. Defaults to True.
+        """
+        self.records.append(record)
+        if flush and len(self.records) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records."""
+        if not self.records:
+            return
+        if self.format == "jsonl":
+            with open(self.path, "a") as file:
+                file.writelines(json.dumps(record) + "\n" for record in self.records)
+        else:
+            self._write_parquet(pd.DataFrame(self.records))
+        self.records = []
+
+    def _part_paths(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith("part-") and name.endswith(".parquet"))
+
+    def _write_part(self, table, part_path: str):
+        import pyarrow.parquet as pq
+
+        # Dataset readers skip files starting with ".", so a temporary file left by a crash is never read.
+        temp_path = os.path.join(self.path, f".{os.path.basename(part_path)}.tmp")
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, part_path)
+
+    def _write_parquet(self, df: pd.DataFrame):
+        import pyarrow as pa
+
+        os.makedirs(self.path, exist_ok=True)
+        parts = self._part_paths()
+        number = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 0
+        self._write_part(pa.Table.from_pandas(df, preserve_index=False),
+                         os.path.join(self.path, f"part-{number:06d}.parquet"))
+
+    def truncate(self, step: int):
+        """
+        Remove the records after step, written or buffered.
+
+        A run resuming from a checkpoint calls this with the checkpoint step, so steps that were
+        logged after the checkpoint and are run again are not logged twice.
+        """
+        self.records = [record for record in self.records if record["step"] <= step]
+        if not os.path.exists(self.path):
+            return
+        if self.format == "parquet":
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+
+            for part_path in self._part_paths():
+                table = pq.read_table(part_path)
+                kept = table.filter(pc.less_equal(table["step"], step))
+                if kept.num_rows == 0:
+                    os.remove(part_path)
+                elif kept.num_rows < table.num_rows:
+                    self._write_part(kept, part_path)
+            return
+
+        kept = []
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    if json.loads(line)["step"] <= step:
+                        kept.append(line if line.endswith("\n") else line + "\n")
+                except ValueError:
+                    # A line cut short by a crash while appending.
+                    continue
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            file.writelines(kept)
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        """Write the buffered records."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def record(step: int, temperature: float, fitnesses: np.ndarray, weights: np.ndarray) -> Dict[str, Any]:
+        """Build the record of one step from the population fitnesses and weights."""
+        best_index = int(np.argmax(fitnesses))
+        return {
+            "step": int(step),
+            "temperature": float(temperature),
+            "best_fitness": float(fitnesses[best_index]),
+            "mean_fitness": float(np.mean(fitnesses)),
+            "std_fitness": float(np.std(fitnesses)),
+            "fitnesses": [float(fitness) for fitness in fitnesses],
+            "best_weights": [float(weight) for weight in weights[best_index]],
+        }
+
+
+def read_generation_log(path) -> pd.DataFrame:
+    """Read a GenerationLog written as JSON lines or Parquet into a frame indexed by step."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_json(path, lines=True)
+    return df.set_index("step")
@@ -1,36 +1,314 @@
 import os
+import glob
+import numpy as np
 import pandas as pd
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
+from Backtest.Instrumentation import count, span
+
+
+def typed_frame(data: Any) -> pd.DataFrame:
+    """
+    Return a copy of data as a DataFrame with float64 value columns and string column labels.
+
+    Series are converted to single column frames named after the series. Columns that can be
+    interpreted as numbers are cast to float64 so that binary formats store a consistent type.
+
+    Args:
+        data (pd.DataFrame or pd.Series): The data to normalize.
+
+    Returns:
+        pd.DataFrame: The normalized data.
+    """
+    df = data.to_frame() if isinstance(data, pd.Series) else data.copy()
+    df.columns = [str(column) for column in df.columns]
+    for column in df.columns:
+        try:
+            df[column] = pd.to_numeric(df[column]).astype("float64")
+        except (TypeError, ValueError):
+            pass
+    return df
+
+
+class StorageBackend():
+    """Reads and writes a pandas DataFrame to a single file in a specific format."""
+
+    name: str
+    extensions: tuple = ()
+
+    def read(self, file_path) -> pd.DataFrame:
+        """Read the DataFrame stored at file_path."""
+        raise NotImplementedError
+
+    def write(self, df: pd.DataFrame, file_path) -> None:
+        """Write df to file_path, replacing any existing file."""
+        raise NotImplementedError
+
+    def append(self, df: pd.DataFrame, file_path) -> None:
+        """
+        Append the rows of df to the data stored at file_path.
+
+        Formats that cannot be extended in place are rewritten to a temporary file which then
+        replaces the original, so an interrupted append never leaves a truncated store behind.
+        """
+        combined = pd.concat([self.read(file_path), typed_frame(df)])
+        temp_path = f"{file_path}.tmp"
+        self.write(combined, temp_path)
+        os.replace(temp_path, file_path)
+
+
+class CSVBackend(StorageBackend):
+    """Plain text storage, with the index stored as the first column."""
+
+    name = "csv"
+    extensions = (".csv",)
+
+    def read(self, file_path) -> pd.DataFrame:
+        return pd.read_csv(file_path, index_col=0, parse_dates=True)
+
+    def write(self, df: pd.DataFrame, file_path) -> None:
+        df.to_csv(file_path)
+
+    def append(self, df: pd.DataFrame, file_path) -> None:
+        columns = pd.read_csv(file_path, index_col=0, nrows=0).columns
+        df = df.to_frame() if isinstance(df, pd.Series) else df
+        df[columns].to_csv(file_path, mode="a", header=False)
+
+
+class ParquetBackend(StorageBackend):
+    """Columnar Parquet storage. Requires pyarrow."""
+
+    name = "parquet"
+    extensions = (".parquet", ".pq")
+
+    def read(self, file_path) -> pd.DataFrame:
+        return pd.read_parquet(file_path)
+
+    def write(self, df: pd.DataFrame, file_path) -> None:
+        typed_frame(df).to_parquet(file_path)
+
+
+class FeatherBackend(StorageBackend):
+    """Arrow IPC (Feather) storage. Requires pyarrow.
+
+    Feather does not store an index, so the index is written as the first column
+    and restored on read.
+    """
+
+    name = "feather"
+    extensions = (".feather", ".arrow")
+
+    def read(self, file_path) -> pd.DataFrame:
+        df = pd.read_feather(file_path)
+        df = df.set_index(df.columns[0])
+        if df.index.name == "index":
+            df.index.name = None
+        return df
+
+    def write(self, df: pd.DataFrame, file_path) -> None:
+        typed_frame(df).reset_index().to_feather(file_path)
+
+
+class NPYBackend(StorageBackend):
+    """NumPy archive storage for frames with a DatetimeIndex and numeric columns.
+
+    Values are stored as one contiguous float64 array next to a datetime64 index, so loading
+    does no parsing at all. Timezone aware indexes are stored in UTC and converted back on read.
+    """
+
+    name = "npy"
+    extensions = (".npz", ".npy")
+
+    def read(self, file_path) -> pd.DataFrame:
+        with np.load(file_path, allow_pickle=False) as archive:
+            index = pd.DatetimeIndex(archive["index"], name=str(archive["index_name"]) or None)
+            tz = str(archive["tz"])
+            if tz:
+                index = index.tz_localize("UTC").tz_convert(tz)
+            return pd.DataFrame(archive["values"], index=index, columns=list(archive["columns"]))
+
+    def write(self, df: pd.DataFrame, file_path) -> None:
+        df = typed_frame(df)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("NPY storage requires a DatetimeIndex.")
+        if not all(dtype == np.float64 for dtype in df.dtypes):
+            raise ValueError("NPY storage requires numeric columns.")
+
+        index = df.index
+        tz = "" if index.tz is None else str(index.tz)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+
+        # Write through a file handle so numpy does not append its own extension.
+        with open(file_path, "wb") as file:
+            np.savez(
+                file,
+                index=index.to_numpy(),
+                index_name=np.array(df.index.name or ""),
+                tz=np.array(tz),
+                columns=np.array(df.columns, dtype=str),
+                values=np.ascontiguousarray(df.to_numpy(dtype="float64")),
+            )
+
+
+STORAGE_BACKENDS: Dict[str, StorageBackend] = {
+    backend.name: backend
+    for backend in (CSVBackend(), ParquetBackend(), FeatherBackend(), NPYBackend())
+}
+
+
+def get_backend(file_path, format: Optional[str] = None) -> StorageBackend:
+    """
+    Return the storage backend for a file.
+
+    Args:
+        file_path (str or Path): The file the backend will read and write.
+        format (str, optional): One of the keys of STORAGE_BACKENDS. If None, the format
+            is chosen from the file extension, falling back to CSV for unknown extensions.
+
+    Returns:
+        StorageBackend: The backend to use for the file.
+    """
+    if format is not None:
+        if format not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage format '{format}'. Expected one of {list(STORAGE_BACKENDS)}.")
+        return STORAGE_BACKENDS[format]
+
+    extension = os.path.splitext(str(file_path))[1].lower()
+    for backend in STORAGE_BACKENDS.values():
+        if extension in backend.extensions:
+            return backend
+    return STORAGE_BACKENDS["csv"]
+
+
+def migrate_csv_store(directory, format: str = "parquet", remove_csv: bool = False) -> List[str]:
+    """
+    Convert every CSV cache in a directory to a binary storage format.
+
+    Each file `name.csv` is written next to the original as `name<extension>` where the
+    extension is the first one registered for the format.
+
+    Args:
+        directory (str or Path): The directory holding the CSV caches, e.g. `data/`.
+        format (str): The target storage format. Defaults to "parquet".
+        remove_csv (bool): If True, delete the CSV files after conversion. Defaults to False.
+
+    Returns:
+        list of str: The paths of the converted files.
+    """
+    source = STORAGE_BACKENDS["csv"]
+    target = get_backend(None, format=format)
+    converted = []
+    for csv_path in sorted(glob.glob(os.path.join(str(directory), "*.csv"))):
+        target_path = os.path.splitext(csv_path)[0] + target.extensions[0]
+        target.write(source.read(csv_path), target_path)
+        if remove_csv:
+            os.remove(csv_path)
+        converted.append(target_path)
+    return converted
+
 
 class LocalDataStore():
     """
     Takes a named file path and store data in it. Assumes data is a pandas DataFrame with index as the first column.
+
+    The storage format is chosen from the file extension (.csv, .parquet, .feather, .npz) or can be
+    forced with the format argument.
     """
 
     file_path: str
+    backend: StorageBackend
     data: Optional[pd.DataFrame] = None
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, format: Optional[str] = None):
         self.file_path = file_path
+        self.backend = get_backend(file_path, format)
 
     def fetch(self) -> pd.DataFrame:
         """Child classes should implement this method to fetch data from a source."""
         pass
 
-    def load(self, *args, **kwargs) -> pd.DataFrame:
+    def fetch_since(self, start: pd.Timestamp, *args, **kwargs) -> pd.DataFrame:
+        """
+        Fetch the data from start onwards. Used by refresh to download only the missing tail.
+
+        Child classes should override this when their source can be queried by date. The default
+        fetches the full history, and refresh discards the rows that are already stored.
+
+        Args:
+            start (pd.Timestamp): The last timestamp already stored.
+            *args, **kwargs: Arguments to be passed to the fetch method.
+        """
+        return self.fetch(*args, **kwargs)
+
+    def read(self) -> pd.DataFrame:
+        """Read the stored data from file_path."""
+        with span("storage.read"):
+            df = self.backend.read(self.file_path)
+        count("rows_loaded", len(df))
+        return df
+
+    def write(self, df: pd.DataFrame):
+        """Write data to file_path."""
+        with span("storage.write"):
+            self.backend.write(df, self.file_path)
+
+    def refresh(self, *args, **kwargs) -> pd.DataFrame:
+        """
+        Fetch the rows newer than the last stored timestamp and append them to the file.
+
+        The bar at the last stored timestamp is fetched again by most sources; it is dropped so
+        the stored history is never duplicated or rewritten. If nothing is stored yet, or the
+        stored frame is empty, the full history is fetched and written instead.
+
+        Parameters:
+            *args, **kwargs: Arguments to be passed to the fetch_since method.
+        Returns:
+            pd.DataFrame: The stored data including the appended rows.
+        """
+        if not os.path.exists(self.file_path):
+            return self.load(*args, **kwargs)
+
+        df = self.read()
+        if len(df) == 0:
+            with span("storage.fetch"):
+                df = self.fetch(*args, **kwargs)
+            self.write(df)
+            self.data = df
+            return df
+
+        last_timestamp = df.index[-1]
+        with span("storage.fetch"):
+            tail = self.fetch_since(last_timestamp, *args, **kwargs)
+        if tail is not None:
+            tail = tail[tail.index > last_timestamp]
+            tail = tail[~tail.index.duplicated(keep="last")]
+            if len(tail) > 0:
+                with span("storage.write"):
+                    self.backend.append(tail, self.file_path)
+                df = pd.concat([df, tail])
+
+        self.data = df
+        return df
+
+    def load(self, *args, update: bool = False, **kwargs) -> pd.DataFrame:
         """
         Load the data from a file or fetch it if the file does not exist.
         Parameters:
             debug (bool): Flag indicating whether to enable debug mode. Defaults to False.
+            update (bool): If True and the file exists, append any newer data with refresh. Defaults to False.
             **kwargs: Additional keyword arguments to be passed to the fetch method.
         Returns:
             pd.DataFrame: The loaded or fetched data as a pandas DataFrame.
         """
+        if update and os.path.exists(self.file_path):
+            return self.refresh(*args, **kwargs)
+
         if os.path.exists(self.file_path):
-            df = pd.read_csv(self.file_path, index_col=0, parse_dates=True)
+            df = self.read()
         else:
-            df = self.fetch(*args, **kwargs)
-            df.to_csv(self.file_path)
-        
+            with span("storage.fetch"):
+                df = self.fetch(*args, **kwargs)
+            self.write(df)
+
         self.data = df
-        return df
\ No newline at end of file
+        return df
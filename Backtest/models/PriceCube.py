@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Any, Dict, List
+from Backtest.models.LocalDataStorage import LocalDataStore
+
+
+class PriceCube():
+    """
+    A time x asset price matrix stored once on disk and opened read-only with np.memmap.
+
+    The values are a contiguous, C ordered float64 file at `<path>.f64`, and the timestamps,
+    asset labels and shape live in a sidecar archive at `<path>.index.npz`. Frames returned by
+    frame() are views over the memory map, so every process that opens the same cube shares the
+    same pages of the OS file cache instead of holding its own copy of the prices.
+
+    A PriceCube pickles as its path only, so sending one to worker processes is free; each
+    worker maps the file again on first access.
+    """
+
+    path: str
+    _values: Optional[np.memmap] = None
+    _index: Optional[pd.DatetimeIndex] = None
+    _columns: Optional[pd.Index] = None
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._values = None
+        self._index = None
+        self._columns = None
+
+    @property
+    def values_path(self) -> str:
+        return self.path + ".f64"
+
+    @property
+    def index_path(self) -> str:
+        return self.path + ".index.npz"
+
+    @classmethod
+    def write(cls, prices: pd.DataFrame, path: str) -> "PriceCube":
+        """
+        Write a wide price frame (rows are timestamps, columns are assets) as a cube.
+
+        Args:
+            prices (pd.DataFrame): The prices to store. Must have a DatetimeIndex.
+            path (str or Path): The base path of the cube files.
+
+        Returns:
+            PriceCube: The cube opened over the written files.
+        """
+        if not isinstance(prices.index, pd.DatetimeIndex):
+            raise ValueError("PriceCube requires a DatetimeIndex.")
+
+        cube = cls(path)
+        values = np.ascontiguousarray(prices.to_numpy(dtype="float64"))
+        values.tofile(cube.values_path)
+
+        index = prices.index
+        tz = "" if index.tz is None else str(index.tz)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+
+        with open(cube.index_path, "wb") as file:
+            np.savez(
+                file,
+                index=index.to_numpy(),
+                tz=np.array(tz),
+                columns=np.array([str(column) for column in prices.columns]),
+                shape=np.array(values.shape),
+            )
+        return cube
+
+    @classmethod
+    def from_stores(cls, stores: Dict[str, LocalDataStore], path: str, load_kwargs: Optional[Dict[str, Any]] = None,
+                    store_kwargs: Optional[Dict[str, Dict[str, Any]]] = None) -> "PriceCube":
+        """
+        Write the close prices of several single asset stores as one aligned cube.
+
+        Stores that have not been loaded yet are loaded with load_kwargs, updated with the
+        store_kwargs of their label. Assets are aligned on the union of their timestamps, with NaN
+        before an asset's first price.
+
+        Args:
+            stores (dict): Mapping of asset label to a loaded or loadable LocalDataStore, e.g. VBTYFData.
+            path (str or Path): The base path of the cube files.
+            load_kwargs (dict, optional): Keyword arguments passed to the load of every store.
+            store_kwargs (dict, optional): Mapping of asset label to keyword arguments passed to the
+                load of that store only, e.g. {"BTC": {"days": 365}}.
+
+        Returns:
+            PriceCube: The cube opened over the written files.
+        """
+        load_kwargs = {} if load_kwargs is None else load_kwargs
+        store_kwargs = {} if store_kwargs is None else store_kwargs
+        unknown = set(store_kwargs) - set(stores)
+        if unknown:
+            raise KeyError(f"store_kwargs for assets without a store: {sorted(unknown)}")
+        prices = {
+            label: store.data if store.data is not None else store.load(**{**load_kwargs, **store_kwargs.get(label, {})})
+            for label, store in stores.items()
+        }
+        return cls.write(pd.concat(prices, axis=1), path)
+
+    def _open(self):
+        with np.load(self.index_path, allow_pickle=False) as archive:
+            index = pd.DatetimeIndex(archive["index"])
+            tz = str(archive["tz"])
+            if tz:
+                index = index.tz_localize("UTC").tz_convert(tz)
+            self._index = index
+            self._columns = pd.Index(archive["columns"].tolist())
+            shape = tuple(archive["shape"])
+        self._values = np.memmap(self.values_path, dtype="float64", mode="r", shape=shape)
+
+    @property
+    def values(self) -> np.memmap:
+        """The read-only (time x asset) memory map."""
+        if self._values is None:
+            self._open()
+        return self._values
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        if self._index is None:
+            self._open()
+        return self._index
+
+    @property
+    def columns(self) -> pd.Index:
+        if self._columns is None:
+            self._open()
+        return self._columns
+
+    def frame(self, start: Any = None, end: Any = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Return a DataFrame over a range of the cube without copying the prices.
+
+        Args:
+            start (optional): The first timestamp to include. Defaults to the start of the cube.
+            end (optional): The last timestamp to include. Defaults to the end of the cube.
+            columns (list of str, optional): The assets to include. A selection of adjacent assets
+                in storage order is a view; any other selection is copied. An empty selection gives
+                a frame with the rows and no columns.
+
+        Returns:
+            pd.DataFrame: The read-only prices.
+        """
+        index = self.index
+        rows = index.slice_indexer(start, end)
+
+        if columns is None:
+            return pd.DataFrame(self.values[rows], index=index[rows], columns=self.columns, copy=False)
+
+        positions = self.columns.get_indexer(columns)
+        if (positions < 0).any():
+            missing = [column for column, position in zip(columns, positions) if position < 0]
+            raise KeyError(f"Assets not in cube: {missing}")
+        if len(positions) == 0:
+            values = self.values[rows, :0]
+        elif np.all(np.diff(positions) == 1):
+            values = self.values[rows, positions[0]:positions[-1] + 1]
+        else:
+            values = self.values[rows][:, positions]
+        return pd.DataFrame(values, index=index[rows], columns=self.columns[positions], copy=False)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["path"])
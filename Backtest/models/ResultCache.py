@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import datetime
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+
+def data_fingerprint(price_data: Any) -> str:
+    """
+    Return a hash of the values, index and columns of price data.
+
+    Args:
+        price_data (pd.DataFrame or pd.Series): The prices.
+
+    Returns:
+        str: A hex digest that changes whenever any price, timestamp or label changes.
+    """
+    df = price_data.to_frame() if isinstance(price_data, pd.Series) else pd.DataFrame(price_data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.to_numpy(dtype="float64")).tobytes())
+    digest.update(np.asarray(df.index.astype("int64") if isinstance(df.index, pd.DatetimeIndex) else df.index.astype(str)).tobytes())
+    digest.update(repr(str(getattr(df.index, "tz", None))).encode())
+    digest.update(json.dumps([str(column) for column in df.columns]).encode())
+    return digest.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the parameter values json cannot, raising TypeError for values without an exact encoding."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        # The repr of long pandas objects is truncated, so hash every value and label instead.
+        return {type(value).__name__: data_fingerprint(value)}
+    if isinstance(value, pd.Index):
+        return {"Index": value.to_numpy().tolist(), "tz": str(getattr(value, "tz", None))}
+    if isinstance(value, (datetime.date, datetime.timedelta, pd.Timedelta, pd.DateOffset)):
+        return repr(value)
+    raise TypeError(f"Cannot build a result cache key from a parameter of type {type(value).__name__}.")
+
+
+class ResultCache():
+    """
+    Disk-backed cache of strategy results, shared by analyses and sessions.
+
+    Each entry holds the metrics table rows of one parameter set (for example one row per group,
+    or one row per asset) and, if store_returns is True, the matching returns columns. Entries are
+    keyed on a fingerprint of the price data, the strategy name and every parameter, so changing
+    the data or any keyword argument never returns a stale result. Each entry is an npz file in
+    directory; when the files exceed max_bytes the least recently used ones are removed.
+    """
+
+    directory: str
+    max_bytes: int
+    store_returns: bool
+    hits: int
+    misses: int
+
+    def __init__(self, directory, max_bytes: int = 256 * 2**20, store_returns: bool = False):
+        """
+        Args:
+            directory (str or Path): The directory holding the cache files. Created if missing.
+            max_bytes (int): The maximum total size of the cache files. Defaults to 256 MB.
+            store_returns (bool): If True, also store the returns of each parameter set. Defaults to False.
+        """
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.store_returns = store_returns
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint: str, strategy: str, params: Dict[str, Any]) -> str:
+        """
+        Return the key of a parameter set of a strategy on the data with the given fingerprint.
+
+        Array and pandas parameters are keyed on all of their values.
+
+        Raises:
+            TypeError: If a parameter is not a json value, a NumPy or pandas object, a date or a duration.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(fingerprint.encode())
+        digest.update(strategy.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=_json_default).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Optional[pd.DataFrame]]]:
+        """
+        Return the cached (metrics, returns) of key, or None. returns is None unless it was stored.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                metrics = pd.DataFrame(archive["metrics"], columns=archive["metric_names"].tolist())
+                returns = None
+                if "returns" in archive:
+                    index = pd.DatetimeIndex(archive["returns_index"])
+                    tz = str(archive["returns_tz"])
+                    if tz:
+                        index = index.tz_localize("UTC").tz_convert(tz)
+                    returns = pd.DataFrame(archive["returns"], index=index)
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return metrics, returns
+
+    def put(self, key: str, metrics: pd.DataFrame, returns: Optional[Any] = None):
+        """Store the metrics rows, and the returns columns if store_returns is True, then evict."""
+        arrays = {
+            "metric_names": np.array([str(column) for column in metrics.columns]),
+            "metrics": np.asarray(metrics.to_numpy(dtype="float64")),
+        }
+        if self.store_returns and returns is not None and isinstance(returns.index, pd.DatetimeIndex):
+            returns = returns.to_frame() if isinstance(returns, pd.Series) else returns
+            index = returns.index
+            arrays["returns_tz"] = np.array("" if index.tz is None else str(index.tz))
+            if index.tz is not None:
+                index = index.tz_convert("UTC").tz_localize(None)
+            arrays["returns_index"] = index.to_numpy()
+            arrays["returns"] = np.ascontiguousarray(returns.to_numpy(dtype="float64"))
+
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+        self._touch(path)
+        self.evict()
+
+    @staticmethod
+    def _touch(path: str):
+        # File timestamps use a coarse clock, so set the precise time to keep the LRU order.
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def evict(self):
+        """Remove the least recently used files until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, path) in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".npz"))
+
+    def __len__(self) -> int:
+        return sum(1 for entry in os.scandir(self.directory) if entry.name.endswith(".npz"))
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                os.remove(entry.path)
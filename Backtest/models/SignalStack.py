@@ -0,0 +1,106 @@
+import numpy as np
+from typing import Any, Optional, Sequence
+
+
+class SignalStack():
+    """
+    A (signals x bars x assets) stack of boolean signals, stored once as uint8 or bit-packed.
+
+    Blending a list of boolean arrays with np.average promotes the whole stack to float64 on every
+    call. A SignalStack stores one byte per signal and bar (or one bit, with packed=True) and
+    blends chunk_bars bars at a time, so the float64 temporaries never exceed one chunk whatever
+    the length of the history. Multi-asset signal frames keep their assets axis and blend to the
+    same (bars, assets) shape.
+    """
+
+    data: np.ndarray
+    shape: tuple
+    packed: bool
+    chunk_bars: int
+
+    def __init__(self, signals: Sequence[Any], packed: bool = False, chunk_bars: int = 1024):
+        """
+        Args:
+            signals (sequence): Boolean signals of equal shape, (bars,) or (bars, assets), e.g. the
+                entries of EvolutionaryPortfolio. Pandas objects are accepted.
+            packed (bool): If True, store 8 bars per byte. Defaults to False (one byte per bar).
+            chunk_bars (int): The number of bars blended at a time. Defaults to 1024.
+        """
+        self.shape = np.shape(signals[0])
+        n_bars = self.shape[0]
+        stack = np.empty((len(signals), n_bars, int(np.prod(self.shape[1:], dtype=int))), dtype=np.bool_)
+        for (position, signal) in enumerate(signals):
+            if np.shape(signal) != self.shape:
+                raise ValueError(f"Signal {position} has shape {np.shape(signal)}, expected {self.shape}.")
+            stack[position] = np.asarray(signal, dtype=np.bool_).reshape(n_bars, -1)
+        self.packed = packed
+        self.chunk_bars = chunk_bars if not packed else max(8, chunk_bars - chunk_bars % 8)
+        self.data = np.packbits(stack, axis=1) if packed else stack.view(np.uint8)
+        self.data.setflags(write=False)
+
+    @property
+    def n_signals(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def n_bars(self) -> int:
+        return self.shape[0]
+
+    @property
+    def n_assets(self) -> int:
+        return self.data.shape[2]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def __len__(self) -> int:
+        return self.n_signals
+
+    def chunk(self, start: int, stop: int) -> np.ndarray:
+        """Return bars start to stop of every signal as a (signals x bars x assets) uint8 array."""
+        if not self.packed:
+            return self.data[:, start:stop]
+        unpacked = np.unpackbits(self.data[:, start // 8:(stop + 7) // 8], axis=1)
+        offset = start - start // 8 * 8
+        return unpacked[:, offset:offset + stop - start]
+
+    def unpack(self) -> np.ndarray:
+        """Return the full stack as a (signals x bars x assets) boolean array."""
+        return self.chunk(0, self.n_bars).astype(np.bool_)
+
+    def blend(self, weights, threshold: Any = 0.5, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return where the weighted average of the signals is above threshold.
+
+        Args:
+            weights (array-like): The weight of each signal, (signals,), or a (population x signals)
+                matrix to blend every row at once.
+            threshold (float or array-like): The threshold, or one threshold per row of weights.
+            out (np.ndarray, optional): A preallocated boolean buffer for the result.
+
+        Returns:
+            np.ndarray: Boolean signals of the stacked shape, with a leading population axis if
+                weights is a matrix.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        single = weights.ndim == 1
+        weights = np.atleast_2d(weights)
+        population = len(weights)
+        thresholds = np.asarray(threshold, dtype=np.float64).reshape(-1, 1)
+        scale = weights.sum(axis=1, keepdims=True)
+        if out is None:
+            out = np.empty((population, self.n_bars, self.n_assets), dtype=np.bool_)
+        result = out.reshape(population, self.n_bars, self.n_assets)
+
+        buffer = np.empty((population, self.chunk_bars * self.n_assets))
+        for start in range(0, self.n_bars, self.chunk_bars):
+            stop = min(start + self.chunk_bars, self.n_bars)
+            block = self.chunk(start, stop).reshape(self.n_signals, -1).astype(np.float64)
+            weighted = buffer[:, :block.shape[1]]
+            np.matmul(weights, block, out=weighted)
+            weighted /= scale
+            result[:, start:stop] = (weighted > thresholds).reshape(population, stop - start, self.n_assets)
+
+        shape = ((population,) if not single else ()) + self.shape
+        return out.reshape(shape)
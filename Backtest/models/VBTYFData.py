@@ -1,7 +1,37 @@
-import os
 import pandas as pd
+from typing import Optional, Dict
 from Backtest.models.LocalDataStorage import LocalDataStore
 import vectorbt as vbt
+import yfinance as yf
+
+MISSING_POLICIES = ("nan", "drop", "ffill")
+
+def align_panel(prices: pd.DataFrame, missing: str = "nan") -> pd.DataFrame:
+    """
+    Align a wide close price frame (rows are timestamps, columns are assets) with a missing data policy.
+
+    Rows where no asset has a price are always dropped, and prices are never filled before an
+    asset's first price, so assets that start later (e.g. SOL) keep leading NaN under "nan" and "ffill".
+
+    Args:
+        prices (pd.DataFrame): The wide close prices.
+        missing (str): One of:
+            - "nan": keep every timestamp, with NaN where an asset has no price. Matches an outer pd.concat.
+            - "drop": keep only the timestamps where every asset has a price.
+            - "ffill": keep every timestamp, forward filling gaps after an asset's first price.
+
+    Returns:
+        pd.DataFrame: The aligned prices, sorted by timestamp.
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing policy '{missing}'. Expected one of {MISSING_POLICIES}.")
+
+    prices = prices.sort_index().dropna(how="all")
+    if missing == "drop":
+        prices = prices.dropna(how="any")
+    elif missing == "ffill":
+        prices = prices.ffill()
+    return prices
 
         
 class VBTYFData(LocalDataStore):
@@ -9,29 +39,75 @@ class VBTYFData(LocalDataStore):
 
     file_path: str
 
-    def __init__(self, file_path: str):
-        super().__init__(file_path)
-
-    def load(self, *args, **kwargs) -> pd.DataFrame:
-        """
-        Load the data from a file or fetch it if the file does not exist.
-        Parameters:
-            **kwargs: Additional keyword arguments to be passed to the fetch method.
-        Returns:
-            pd.DataFrame: The loaded or fetched data as a pandas DataFrame.
-        """
-        if os.path.exists(self.file_path):
-            df = pd.read_csv(self.file_path, index_col=0, parse_dates=True)
-            df = df["Close"]
-        else:
-            df = self.fetch(*args, **kwargs)
-            df.to_csv(self.file_path)
-        
-        self.data = df
-        return df
+    def __init__(self, file_path: str, format: Optional[str] = None):
+        super().__init__(file_path, format)
 
+    def read(self) -> pd.Series:
+        """Read the stored data and return the close prices."""
+        return super().read()["Close"]
 
     def fetch(self, ticker, debug=False, **kwargs) -> pd.DataFrame:
         """Fetch close data using the yahoo finance API for ticker."""
         df = vbt.YFData.download(ticker, **kwargs).get("Close")
-        return df
\ No newline at end of file
+        return df
+
+    def fetch_since(self, start, ticker, debug=False, **kwargs) -> pd.DataFrame:
+        """Fetch close data for ticker from start onwards."""
+        kwargs["start"] = start
+        return self.fetch(ticker, debug=debug, **kwargs)
+
+
+class VBTYFPanelData(LocalDataStore):
+    """
+    LocalDataStore for the close prices of many Yahoo Finance tickers, downloaded in one batched
+    request and stored as a single aligned panel with one column per asset label.
+    """
+
+    file_path: str
+    tickers: Dict[str, str]
+    missing: str
+
+    def __init__(self, file_path: str, tickers: Dict[str, str], missing: str = "nan", format: Optional[str] = None):
+        """
+        Args:
+            file_path (str): The file to store the panel in.
+            tickers (dict): Mapping of asset label to Yahoo Finance ticker, e.g. {"BTC": "BTC-USD"}.
+                The panel columns are the labels, in this order.
+            missing (str): The alignment policy for assets with missing prices, see align_panel. Defaults to "nan".
+            format (str, optional): The storage format, see LocalDataStore.
+        """
+        super().__init__(file_path, format)
+        self.tickers = dict(tickers)
+        self.missing = missing
+
+    def read(self) -> pd.DataFrame:
+        """Read the stored panel, with columns in label order."""
+        return align_panel(super().read()[list(self.tickers)], self.missing)
+
+    def download(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        """Download the close prices of every ticker in one threaded yfinance request."""
+        data = yf.download(
+            list(self.tickers.values()),
+            start=None if start is None else pd.Timestamp(start),
+            end=None if end is None else pd.Timestamp(end),
+            group_by="column",
+            auto_adjust=True,
+            ignore_tz=False,
+            progress=False,
+            **kwargs
+        )
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(list(self.tickers.values())[0])
+        return close
+
+    def fetch(self, debug=False, **kwargs) -> pd.DataFrame:
+        """Fetch the aligned close prices of every ticker, with columns named by label."""
+        labels = {ticker: label for label, ticker in self.tickers.items()}
+        prices = self.download(**kwargs).rename(columns=labels)
+        return align_panel(prices[list(self.tickers)], self.missing)
+
+    def fetch_since(self, start, debug=False, **kwargs) -> pd.DataFrame:
+        """Fetch the aligned close prices of every ticker from start onwards."""
+        kwargs["start"] = start
+        return self.fetch(debug=debug, **kwargs)
@@ -1,5 +1,17 @@
+import os
+import subprocess
+import sys
+
 import numpy as np
-from Backtest.models.EvolutionaryModel import blend_signals, generate_weights
+import pandas as pd
+import pytest
+from Backtest.models.EvolutionaryModel import (THRESHOLD_BOUNDS, EvolutionaryPortfolio, EvolutionaryPortfolioFamily,
+                                               FitnessCache, GeneticSearch, PopulationContext, blend_population,
+                                               blend_signals, compute_sharpe_ratio_fitness, function_key,
+                                               generate_weights, stack_signals)
+from Backtest.models.GenerationLog import GenerationLog, read_generation_log
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def test_blend_signals():
     entries = [
@@ -38,4 +50,278 @@ def test_generate_weights():
     mutated_weights = generate_weights(mutation_rate=mutation_rate)
 
     assert np.allclose(np.sum(mutated_weights), 1.0)  # Check if weights sum to 1
-    assert np.all(mutated_weights >= 0)  # Check if weights are non-negative
\ No newline at end of file
+    assert np.all(mutated_weights >= 0)  # Check if weights are non-negative
+
+def _family_inputs(n_assets=1):
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2023-01-01", periods=200, freq="h")
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(200, n_assets)), axis=0))
+    data = pd.DataFrame(values, index=index, columns=[f"A{i}" for i in range(n_assets)])
+    data = data.iloc[:, 0] if n_assets == 1 else data
+    entries = [rng.random(data.shape) > 0.8 for _ in range(3)]
+    exits = [rng.random(data.shape) > 0.8 for _ in range(3)]
+    return data, entries, exits
+
+def test_blend_population_matches_blend_signals():
+    (_, entries, exits) = _family_inputs()
+    weights = np.array([[0.2, 0.3, 0.5], [0.6, 0.1, 0.3]])
+    (population_entries, population_exits) = blend_population(stack_signals(entries), stack_signals(exits), weights)
+    for (row, individual) in enumerate(weights):
+        (blended_entries, blended_exits) = blend_signals(entries, exits, individual)
+        np.testing.assert_array_equal(population_entries[row], blended_entries.ravel())
+        np.testing.assert_array_equal(population_exits[row], blended_exits.ravel())
+
+def test_family_fitness_matches_individual_portfolios():
+    for (n_assets, kwargs) in ((1, {}), (3, {"cash_sharing": True})):
+        (data, entries, exits) = _family_inputs(n_assets)
+        family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=4,
+                                             init_cash=1000, **kwargs)
+        weights = np.array([[0.2, 0.3, 0.5], [0.6, 0.1, 0.3], [0.1, 0.1, 0.8], [1/3, 1/3, 1/3]])
+        fitnesses = family.evaluate(weights)
+        group_by = {"group_by": True} if n_assets > 1 else {}
+        expected = [
+            EvolutionaryPortfolio(data, individual, entries, exits, init_cash=1000, **kwargs, **group_by).fitness()
+            for individual in weights
+        ]
+        np.testing.assert_allclose(fitnesses, expected)
+
+def test_multi_asset_individuals_reproduce_family_fitness():
+    (data, entries, exits) = _family_inputs(3)
+    family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=3, seed=1,
+                                         init_cash=1000)
+    family.evolve_family(mutation_rate=0.2)
+    for (weights, fitness) in zip(family.weights, family.fitnesses):
+        assert np.ndim(family.build_portfolio(weights).fitness()) == 0
+        np.testing.assert_allclose(family.build_portfolio(weights).fitness(), fitness)
+    np.testing.assert_allclose(family.fetch_best_portfolio().fitness(), family.fitnesses.max())
+
+def test_evolve_family_never_lowers_fitness():
+    (data, entries, exits) = _family_inputs()
+    family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=5,
+                                         init_cash=1000)
+    before = family.fitnesses.copy()
+    family.evolve_family(mutation_rate=0.1)
+    assert family.weights.shape == (5, 3)
+    assert np.all(family.fitnesses >= before)
+    np.testing.assert_allclose(family.fitnesses, family.evaluate(family.weights))
+    family.optimize_genes()
+    assert np.all(family.fitnesses == family.fitnesses[0])
+    assert family.fetch_best_portfolio().fitness() == family.fitnesses[0]
+
+def test_family_is_deterministic_across_executors():
+    (data, entries, exits) = _family_inputs()
+    results = []
+    for (executor, n_workers) in (("serial", None), ("thread", 2), ("process", 3)):
+        with EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=5,
+                                         executor=executor, n_workers=n_workers, seed=11, init_cash=1000) as family:
+            family.run_simulation(n_steps=4, generation_size=2, temperature=0.2)
+            results.append((family.weights.copy(), family.fitnesses.copy()))
+    for (weights, fitnesses) in results[1:]:
+        np.testing.assert_array_equal(weights, results[0][0])
+        np.testing.assert_array_equal(fitnesses, results[0][1])
+
+def test_fitness_cache_eviction():
+    cache = FitnessCache(max_entries=2)
+    keys = [FitnessCache.key(np.array([i & 1, i & 2], dtype=bool), np.zeros(2, dtype=bool)) for i in range(3)]
+    cache.put(keys[0], 0.0)
+    cache.put(keys[1], 1.0)
+    assert cache.get(keys[0]) == 0.0
+    cache.put(keys[2], 2.0)
+    assert cache.get(keys[1]) is None
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 2)
+    small = FitnessCache(max_bytes=2 * (16 + FitnessCache.ENTRY_BYTES))
+    for (value, key) in enumerate(keys):
+        small.put(key, float(value))
+    assert len(small) == 2 and small.nbytes <= small.max_bytes
+
+def test_family_cache_matches_uncached_run():
+    (data, entries, exits) = _family_inputs()
+    families = [
+        EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=6,
+                                    seed=5, cache=cache, init_cash=1000)
+        for cache in (True, False)
+    ]
+    for family in families:
+        family.run_simulation(n_steps=6, generation_size=3, temperature=0.05)
+    np.testing.assert_array_equal(families[0].weights, families[1].weights)
+    np.testing.assert_array_equal(families[0].fitnesses, families[1].fitnesses)
+    assert families[0].cache_hits > families[0].cache_misses
+    assert families[1].cache_hits == 0
+
+def test_family_fast_metric_matches_portfolio_fitness():
+    (data, entries, exits) = _family_inputs()
+    weights = np.array([[0.2, 0.3, 0.5], [0.6, 0.1, 0.3], [0.1, 0.1, 0.8]])
+    family = EvolutionaryPortfolioFamily(data, weights[0], entries, exits, num_portfolios=3, cache=False,
+                                         init_cash=1000)
+    fast = EvolutionaryPortfolioFamily(data, weights[0], entries, exits, num_portfolios=3, cache=False,
+                                       fast_metric="sharpe_ratio", init_cash=1000)
+    np.testing.assert_allclose(fast.evaluate(weights), family.evaluate(weights), rtol=1e-9)
+    with pytest.raises(ValueError):
+        EvolutionaryPortfolioFamily(data, weights[0], entries, exits, fast_metric="sharpe_ratio", fees=0.001)
+
+def test_clone_shares_context_and_copies_weights():
+    (data, entries, exits) = _family_inputs()
+    portfolio = EvolutionaryPortfolio(data, np.array([0.2, 0.3, 0.5]), entries, exits, init_cash=1000)
+    fitness = portfolio.fitness()
+    clone = portfolio.clone()
+    assert clone.context is portfolio.context
+    assert clone.portfolio is portfolio.portfolio and clone.fitness() == fitness
+    clone.weights[0] = 0.9
+    assert portfolio.weights[0] == 0.2
+    with pytest.raises(AttributeError):
+        portfolio.context.data = None
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path):
+    (data, entries, exits) = _family_inputs()
+
+    def family():
+        return EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=4,
+                                           seed=2, init_cash=1000)
+
+    full = family()
+    full.run_simulation(n_steps=6, generation_size=2, temperature=0.2, delta=0.5)
+
+    checkpoint = tmp_path / "run.npz"
+    for (extension, buffer_size) in (("jsonl", 1), ("parquet", 10)):
+        log_path = tmp_path / f"run.{extension}"
+        with GenerationLog(log_path, buffer_size=buffer_size) as log:
+            family().run_simulation(n_steps=4, generation_size=2, temperature=0.2, delta=0.5,
+                                    checkpoint_path=checkpoint, generation_log=log)
+        with GenerationLog(log_path) as log:
+            # A step logged after the last checkpoint by a run that was then killed.
+            log.write(GenerationLog.record(5, 0.1, np.zeros(4), np.ones((4, 3)) / 3))
+        resumed = family()
+        with GenerationLog(log_path, buffer_size=buffer_size) as log:
+            resumed.run_simulation(n_steps=6, generation_size=2, delta=0.5, resume_from=checkpoint,
+                                   generation_log=log)
+        np.testing.assert_array_equal(resumed.weights, full.weights)
+        np.testing.assert_array_equal(resumed.fitnesses, full.fitnesses)
+
+        log = read_generation_log(log_path)
+        assert list(log.index) == [1, 2, 3, 4, 5, 6]
+        assert len(log["fitnesses"].iloc[0]) == 4
+        assert log["temperature"].tolist() == [0.2, 0.2, 0.1, 0.1, 0.05, 0.05]
+
+def test_parquet_log_is_readable_after_a_crash(tmp_path):
+    log_path = tmp_path / "run.parquet"
+    script = (
+        "import os, sys, numpy as np\n"
+        "from Backtest.models.GenerationLog import GenerationLog\n"
+        "log = GenerationLog(sys.argv[1], buffer_size=1)\n"
+        "for step in (1, 2, 3):\n"
+        "    log.write(GenerationLog.record(step, 1.0, np.arange(4.0), np.ones((4, 3)) / 3))\n"
+        "os._exit(1)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(log_path)], cwd=ROOT)
+
+    assert list(read_generation_log(log_path).index) == [1, 2, 3]
+    with GenerationLog(log_path) as log:
+        log.write(GenerationLog.record(4, 1.0, np.arange(4.0), np.ones((4, 3)) / 3))
+    assert list(read_generation_log(log_path).index) == [1, 2, 3, 4]
+
+def test_parquet_flush_only_writes_new_records(tmp_path):
+    log_path = tmp_path / "run.parquet"
+    with GenerationLog(log_path, buffer_size=2) as log:
+        for step in range(1, 6):
+            log.write(GenerationLog.record(step, 1.0, np.arange(4.0), np.ones((4, 3)) / 3))
+    parts = sorted(os.listdir(log_path))
+    assert parts == ["part-000000.parquet", "part-000001.parquet", "part-000002.parquet"]
+    assert list(read_generation_log(log_path).index) == [1, 2, 3, 4, 5]
+
+    with GenerationLog(log_path) as log:
+        log.truncate(3)
+    assert sorted(os.listdir(log_path)) == parts[:2]
+    assert list(read_generation_log(log_path).index) == [1, 2, 3]
+
+def test_hill_climbing_uses_mutation_rate():
+    (data, entries, exits) = _family_inputs()
+    family = EvolutionaryPortfolioFamily(data, np.array([0.2, 0.3, 0.5]), entries, exits, num_portfolios=3,
+                                         seed=1, init_cash=1000)
+    family.evolve_family(mutation_rate=0.0)
+    np.testing.assert_allclose(family.weights, [[0.2, 0.3, 0.5]] * 3)
+
+def test_genetic_search_keeps_best_and_evolves_thresholds():
+    (data, entries, exits) = _family_inputs()
+    family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=8, seed=3,
+                                         strategy=GeneticSearch(evolve_thresholds=True), init_cash=1000)
+    best = [family.fitnesses.max()]
+    for _ in range(5):
+        family.evolve_family(mutation_rate=0.1)
+        best.append(family.fitnesses.max())
+    assert np.all(np.diff(best) >= 0)
+    assert family.thresholds.shape == (8, 2) and not np.all(family.thresholds == 0.5)
+    assert np.all((family.thresholds >= THRESHOLD_BOUNDS[0]) & (family.thresholds <= THRESHOLD_BOUNDS[1]))
+    assert family.strategy.sigma != 0.1
+    best_portfolio = family.fetch_best_portfolio()
+    assert (best_portfolio.entry_threshold, best_portfolio.exit_threshold) == tuple(family.thresholds[family.best_index()])
+    np.testing.assert_allclose(best_portfolio.fitness(), family.fitnesses.max())
+
+def test_run_simulation_stops_early_on_plateau():
+    (data, entries, exits) = _family_inputs()
+    family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=3,
+                                         seed=1, init_cash=1000)
+    assert family.run_simulation(n_steps=50, generation_size=5, temperature=0.0, patience=3) == 15
+
+def test_resumed_run_keeps_early_stopping_state(tmp_path):
+    (data, entries, exits) = _family_inputs()
+
+    def family():
+        return EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=3,
+                                           seed=1, init_cash=1000)
+
+    checkpoint = tmp_path / "run.npz"
+    family().run_simulation(n_steps=4, generation_size=2, temperature=0.0, patience=3, checkpoint_path=checkpoint)
+    state = family().load_checkpoint(checkpoint)
+    assert (state["generations"], state["stale_generations"]) == (2, 2)
+
+    resumed = family()
+    assert resumed.run_simulation(n_steps=50, generation_size=2, patience=3, resume_from=checkpoint,
+                                  checkpoint_path=checkpoint, checkpoint_every=3) == 6
+    assert resumed.load_checkpoint(checkpoint)["generations"] == 3
+
+def test_shared_cache_separates_lambda_criteria():
+    (data, entries, exits) = _family_inputs()
+    cache = FitnessCache()
+    families = [
+        EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=2, cache=cache,
+                                    fitness_criteria=criteria, init_cash=1000)
+        for criteria in (lambda portfolio: portfolio.total_return(), lambda portfolio: -portfolio.total_return())
+    ]
+    assert families[0].fitnesses[0] == -families[1].fitnesses[0] != 0
+    assert families[1].evaluations == 1
+    named = [
+        EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=2, cache=cache,
+                                    fitness_criteria=lambda portfolio: portfolio.total_return(),
+                                    fitness_key="total_return", init_cash=1000)
+        for _ in range(2)
+    ]
+    assert named[1].evaluations == 0
+    np.testing.assert_array_equal(named[1].fitnesses, families[0].fitnesses)
+
+def test_function_key_survives_garbage_collection():
+    keys = [function_key(lambda portfolio: portfolio.total_return()) for _ in range(2)]
+    assert keys[0] == keys[1]
+    assert function_key(lambda portfolio: -portfolio.total_return()) != keys[0]
+
+    def scaled(scale):
+        return lambda portfolio: scale * portfolio.total_return()
+    assert function_key(scaled(1.0)) == function_key(scaled(1.0)) != function_key(scaled(-1.0))
+    assert function_key(scaled(object())) is None
+    assert function_key(compute_sharpe_ratio_fitness).endswith(".compute_sharpe_ratio_fitness")
+
+def test_unkeyed_criteria_bypass_a_shared_cache():
+    (data, entries, exits) = _family_inputs()
+    cache = FitnessCache()
+    marker = object()
+    family = EvolutionaryPortfolioFamily(data, np.array([1/3, 1/3, 1/3]), entries, exits, num_portfolios=2, cache=cache,
+                                         fitness_criteria=lambda portfolio: marker and portfolio.total_return(),
+                                         init_cash=1000)
+    assert family.cache is None and len(cache) == 0
+
+def test_cache_fingerprint_hashes_every_kwarg_value():
+    (data, entries, exits) = _family_inputs()
+    sl_stop = pd.Series(0.05, index=data.index)
+    changed = sl_stop.copy()
+    changed.iloc[100] = 0.01
+    contexts = [PopulationContext(data, entries, exits, portfolio_kwargs={"sl_stop": stop}) for stop in (sl_stop, changed)]
+    assert contexts[0].fingerprint != contexts[1].fingerprint
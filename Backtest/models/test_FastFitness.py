@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+from vectorbt.portfolio import Portfolio
+from Backtest.models.FastFitness import fast_fitness
+
+
+def _close():
+    rng = np.random.default_rng(21)
+    index = pd.date_range("2023-01-01", periods=2000, freq="h")
+    return pd.Series(30000 * np.exp(np.cumsum(rng.normal(0, 0.006, 2000))), index=index, name="BTC-USD")
+
+
+def _ma_signals(close):
+    fast_ma = vbt.MA.run(close, [5, 10, 15], short_name="fast")
+    slow_ma = vbt.MA.run(close, [30, 50, 80], short_name="slow")
+    return fast_ma.ma_crossed_above(slow_ma).to_numpy(), fast_ma.ma_crossed_below(slow_ma).to_numpy()
+
+
+def test_long_only_parity_with_portfolio():
+    close = _close()
+    (entries, exits) = _ma_signals(close)
+    portfolio = Portfolio.from_signals(close, entries, exits, init_cash=100000, freq="1h")
+    for metric in ("sharpe_ratio", "sortino_ratio", "calmar_ratio"):
+        (returns, values) = fast_fitness(close, entries, exits, init_cash=100000, freq="1h", metric=metric)
+        np.testing.assert_allclose(returns, portfolio.returns().to_numpy(), rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(values, getattr(portfolio, metric)().to_numpy(), rtol=1e-9)
+
+
+def test_long_short_parity_with_portfolio():
+    close = _close()
+    (entries, exits) = _ma_signals(close)
+    portfolio = Portfolio.from_signals(close, entries, exits, exits, entries, init_cash=100000, freq="1h")
+    (returns, values) = fast_fitness(close, entries, exits, exits, entries, init_cash=100000, freq="1h")
+    np.testing.assert_allclose(returns, portfolio.returns().to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(values, portfolio.sharpe_ratio().to_numpy(), rtol=1e-9)
+
+
+def test_random_signal_parity_with_portfolio():
+    close = _close()
+    rng = np.random.default_rng(4)
+    signals = [rng.random((len(close), 8)) > 0.9 for _ in range(4)]
+    portfolio = Portfolio.from_signals(close, *signals, init_cash=1000, freq="1h")
+    (returns, values) = fast_fitness(close, *signals, init_cash=1000)
+    np.testing.assert_allclose(returns, portfolio.returns().to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(values, portfolio.sharpe_ratio().to_numpy(), rtol=1e-9)
+
+
+def test_array_close_requires_freq():
+    close = _close()
+    (entries, exits) = _ma_signals(close)
+    with pytest.raises(ValueError):
+        fast_fitness(close.to_numpy(), entries, exits)
+    (_, values) = fast_fitness(close.to_numpy(), entries, exits, freq="1h")
+    np.testing.assert_allclose(values, fast_fitness(close, entries, exits)[1])
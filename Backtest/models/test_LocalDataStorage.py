@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backtest.models.LocalDataStorage import LocalDataStore, get_backend, migrate_csv_store
+
+def make_prices():
+    index = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC", name="Date")
+    return pd.DataFrame({
+        "Close": [100.5, 101.25, 99.0, 102.125, 103.0],
+        "Volume": [1, 2, 3, 4, 5],
+    }, index=index)
+
+@pytest.mark.parametrize("file_name", ["prices.parquet", "prices.feather", "prices.npz"])
+def test_binary_round_trip(tmp_path, file_name):
+    prices = make_prices()
+    store = LocalDataStore(tmp_path / file_name)
+    store.write(prices)
+
+    loaded = store.read()
+
+    expected = prices.astype("float64")
+    pd.testing.assert_frame_equal(loaded, expected, check_freq=False)
+    assert loaded.index.dtype == expected.index.dtype
+
+def test_get_backend():
+    assert get_backend("prices.csv").name == "csv"
+    assert get_backend("prices.parquet").name == "parquet"
+    assert get_backend("prices.feather").name == "feather"
+    assert get_backend("prices.npz").name == "npy"
+    assert get_backend("prices", format="feather").name == "feather"
+    with pytest.raises(ValueError):
+        get_backend("prices.csv", format="xlsx")
+
+def test_migrate_csv_store(tmp_path):
+    prices = make_prices()
+    prices.to_csv(tmp_path / "btc_price.csv")
+
+    converted = migrate_csv_store(tmp_path, format="npy")
+
+    assert converted == [str(tmp_path / "btc_price.npz")]
+    loaded = LocalDataStore(converted[0]).read()
+    np.testing.assert_array_equal(loaded["Close"].values, prices["Close"].values)
+    assert loaded.index.equals(prices.index)
+
+class StubStore(LocalDataStore):
+    """Serves a fixed history and records the start of every fetch_since call."""
+
+    def __init__(self, file_path, history):
+        super().__init__(file_path)
+        self.history = history
+        self.fetch_starts = []
+
+    def fetch(self, end=None):
+        return self.history.loc[:end]
+
+    def fetch_since(self, start, end=None):
+        self.fetch_starts.append(start)
+        return self.history.loc[start:end]
+
+@pytest.mark.parametrize("file_name", ["prices.csv", "prices.parquet"])
+def test_refresh_appends_missing_tail(tmp_path, file_name):
+    prices = make_prices().astype("float64")
+    store = StubStore(tmp_path / file_name, prices)
+    store.load(end=prices.index[2])
+
+    refreshed = store.load(update=True)
+
+    assert store.fetch_starts == [prices.index[2]]
+    pd.testing.assert_frame_equal(refreshed, prices, check_freq=False)
+    pd.testing.assert_frame_equal(store.read(), prices, check_freq=False)
+
+def test_refresh_without_new_rows(tmp_path):
+    prices = make_prices().astype("float64")
+    store = StubStore(tmp_path / "prices.csv", prices)
+    store.load()
+
+    refreshed = store.refresh()
+
+    pd.testing.assert_frame_equal(refreshed, prices, check_freq=False)
+    assert len(store.read()) == len(prices)
+
+def test_refresh_empty_store_fetches_full_history(tmp_path):
+    prices = make_prices().astype("float64")
+    store = StubStore(tmp_path / "prices.csv", prices)
+    store.write(prices.iloc[:0])
+
+    refreshed = store.refresh()
+
+    assert store.fetch_starts == []
+    pd.testing.assert_frame_equal(refreshed, prices, check_freq=False)
+    pd.testing.assert_frame_equal(store.read(), prices, check_freq=False)
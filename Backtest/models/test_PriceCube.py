@@ -0,0 +1,77 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from Backtest.models.LocalDataStorage import LocalDataStore
+from Backtest.models.PriceCube import PriceCube
+
+def make_prices():
+    index = pd.date_range("2024-01-01", periods=6, freq="D", tz="UTC")
+    return pd.DataFrame({
+        "BTC": [100.0, 101.0, 102.0, 103.0, 104.0, 105.0],
+        "ETH": [10.0, 11.0, 12.0, 13.0, 14.0, 15.0],
+        "SOL": [np.nan, np.nan, 1.0, 2.0, 3.0, 4.0],
+    }, index=index)
+
+def test_frame_is_read_only_view(tmp_path):
+    prices = make_prices()
+    cube = PriceCube.write(prices, tmp_path / "prices")
+
+    frame = cube.frame("2024-01-02", "2024-01-04", columns=["ETH", "SOL"])
+
+    pd.testing.assert_frame_equal(frame, prices.loc["2024-01-02":"2024-01-04", ["ETH", "SOL"]], check_freq=False)
+    assert np.shares_memory(frame.values, cube.values)
+    assert not frame.values.flags.writeable
+
+def test_pickles_as_path(tmp_path):
+    prices = make_prices()
+    cube = PriceCube.write(prices, tmp_path / "prices")
+    cube.frame()
+
+    restored = pickle.loads(pickle.dumps(cube))
+
+    assert len(pickle.dumps(cube)) < 512
+    pd.testing.assert_frame_equal(restored.frame(), prices, check_freq=False)
+
+def test_from_stores(tmp_path):
+    prices = make_prices()
+    stores = {}
+    for asset in prices.columns:
+        store = LocalDataStore(tmp_path / f"{asset}.csv")
+        store.data = prices[asset].dropna()
+        stores[asset] = store
+
+    cube = PriceCube.from_stores(stores, tmp_path / "prices")
+
+    pd.testing.assert_frame_equal(cube.frame(), prices, check_freq=False)
+
+def test_empty_column_selection(tmp_path):
+    cube = PriceCube.write(make_prices(), tmp_path / "prices")
+
+    frame = cube.frame("2024-01-02", "2024-01-04", columns=[])
+
+    assert frame.shape == (3, 0)
+    assert frame.index.equals(cube.index[1:4])
+
+def test_from_stores_passes_load_kwargs_per_store(tmp_path):
+    prices = make_prices()
+
+    class FakeStore(LocalDataStore):
+        def load(self, **kwargs):
+            self.kwargs = kwargs
+            self.data = prices[self.asset].dropna()
+            return self.data
+
+    stores = {}
+    for asset in prices.columns:
+        store = FakeStore(tmp_path / f"{asset}.csv")
+        store.asset = asset
+        stores[asset] = store
+
+    cube = PriceCube.from_stores(stores, tmp_path / "prices", load_kwargs={"update": True},
+                                 store_kwargs={"SOL": {"days": 4}})
+
+    pd.testing.assert_frame_equal(cube.frame(), prices, check_freq=False)
+    assert stores["BTC"].kwargs == {"update": True}
+    assert stores["SOL"].kwargs == {"update": True, "days": 4}
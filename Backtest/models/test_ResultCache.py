@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Backtest.models.ResultCache import ResultCache, data_fingerprint
+
+
+def test_fingerprint_tracks_values_index_and_columns():
+    index = pd.date_range("2023-01-01", periods=50, freq="h", tz="UTC")
+    prices = pd.DataFrame(np.arange(100.0).reshape(50, 2), index=index, columns=["BTC", "ETH"])
+    fingerprint = data_fingerprint(prices)
+    assert data_fingerprint(prices.copy()) == fingerprint
+    changed = prices.copy()
+    changed.iloc[10, 1] += 1e-9
+    assert data_fingerprint(changed) != fingerprint
+    assert data_fingerprint(prices.rename(columns={"ETH": "SOL"})) != fingerprint
+    assert data_fingerprint(prices.set_axis(index + pd.Timedelta("1h"))) != fingerprint
+
+
+def test_roundtrip_and_key(tmp_path):
+    cache = ResultCache(tmp_path, store_returns=True)
+    key = ResultCache.key("data", "Strategy", {"window": np.int64(10), "sl_stop": 0.05})
+    assert key == ResultCache.key("data", "Strategy", {"sl_stop": 0.05, "window": 10})
+    assert key != ResultCache.key("data", "Strategy", {"sl_stop": 0.1, "window": 10})
+
+    assert cache.get(key) is None
+    metrics = pd.DataFrame({"sharpe_ratio": [1.5, -0.2], "trade_count": [3, 4]})
+    returns = pd.DataFrame(np.random.default_rng(0).normal(size=(20, 2)),
+                           index=pd.date_range("2023-01-01", periods=20, freq="D", tz="Europe/Berlin"))
+    cache.put(key, metrics, returns)
+
+    (cached_metrics, cached_returns) = cache.get(key)
+    pd.testing.assert_frame_equal(cached_metrics, metrics.astype(float))
+    pd.testing.assert_frame_equal(cached_returns, returns, check_freq=False)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_tracks_array_valued_params():
+    index = pd.date_range("2023-01-01", periods=200, freq="h")
+    sl_stop = pd.Series(np.full(200, 0.05), index=index)
+    changed = sl_stop.copy()
+    changed.iloc[100] = 0.1
+    key = ResultCache.key("data", "Strategy", {"sl_stop": sl_stop})
+    assert key == ResultCache.key("data", "Strategy", {"sl_stop": sl_stop.copy()})
+    assert key != ResultCache.key("data", "Strategy", {"sl_stop": changed})
+    assert key != ResultCache.key("data", "Strategy", {"sl_stop": sl_stop.to_frame()})
+    assert (ResultCache.key("data", "Strategy", {"sl_stop": sl_stop.to_numpy()})
+            != ResultCache.key("data", "Strategy", {"sl_stop": changed.to_numpy()}))
+
+    with pytest.raises(TypeError):
+        ResultCache.key("data", "Strategy", {"callback": object()})
+
+
+def test_evicts_least_recently_used(tmp_path):
+    metrics = pd.DataFrame({"sharpe_ratio": np.zeros(1000)})
+    cache = ResultCache(tmp_path)
+    cache.put("a", metrics)
+    entry_bytes = cache.nbytes
+    cache.max_bytes = 2 * entry_bytes
+    cache.put("b", metrics)
+    cache.get("a")
+    cache.put("c", metrics)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from Backtest.models.SignalStack import SignalStack
+
+
+def _signals(shape, n_signals=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.random(shape) > 0.6 for _ in range(n_signals)]
+
+
+def test_blend_matches_np_average():
+    weights = np.array([0.1, 0.4, 0.2, 0.2, 0.1])
+    for shape in ((1001,), (1001, 3)):
+        signals = _signals(shape)
+        expected = np.average(signals, axis=0, weights=weights) > 0.3
+        for packed in (False, True):
+            stack = SignalStack(signals, packed=packed, chunk_bars=100)
+            np.testing.assert_array_equal(stack.unpack(), np.stack(signals).reshape(5, 1001, -1))
+            np.testing.assert_array_equal(stack.blend(weights, 0.3), expected)
+
+
+def test_blend_population_and_out_buffer():
+    signals = _signals((500, 2))
+    stack = SignalStack(signals, chunk_bars=64)
+    weights = np.array([[0.1, 0.4, 0.2, 0.2, 0.1], [0.5, 0.1, 0.1, 0.1, 0.2]])
+    out = np.empty((2, 500, 2), dtype=bool)
+    blended = stack.blend(weights, [0.3, 0.5], out=out)
+    assert blended.base is out or blended is out
+    for (row, threshold) in zip(range(2), (0.3, 0.5)):
+        np.testing.assert_array_equal(out[row], np.average(signals, axis=0, weights=weights[row]) > threshold)
+
+
+def test_stack_is_compact_and_accepts_frames():
+    index = pd.date_range("2023-01-01", periods=4000, freq="h")
+    signals = [pd.DataFrame(signal, index=index) for signal in _signals((4000, 4), n_signals=10)]
+    float_bytes = 10 * 4000 * 4 * 8
+    assert SignalStack(signals).nbytes * 8 == float_bytes
+    assert SignalStack(signals, packed=True).nbytes * 64 == float_bytes
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backtest.models.VBTYFData import VBTYFPanelData, align_panel
+
+TICKERS = {"BTC": "BTC-USD", "ETH": "ETH-USD", "SOL": "SOL-USD"}
+
+def make_download():
+    index = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC")
+    return pd.DataFrame({
+        "SOL-USD": [np.nan, np.nan, 1.0, np.nan, 3.0],
+        "BTC-USD": [100.0, 101.0, 102.0, 103.0, 104.0],
+        "ETH-USD": [10.0, 11.0, 12.0, 13.0, 14.0],
+    }, index=index)
+
+class StubPanelData(VBTYFPanelData):
+    """Serves a fixed download and counts the batched requests."""
+
+    downloads = 0
+
+    def download(self, start=None, end=None, **kwargs):
+        StubPanelData.downloads += 1
+        return make_download().loc[start:end]
+
+def test_align_panel():
+    prices = make_download()
+
+    nan = align_panel(prices, "nan")
+    drop = align_panel(prices, "drop")
+    ffill = align_panel(prices, "ffill")
+
+    assert nan["SOL-USD"].isna().sum() == 3
+    assert list(drop.index) == [prices.index[2], prices.index[4]]
+    np.testing.assert_array_equal(ffill["SOL-USD"].values, [np.nan, np.nan, 1.0, 1.0, 3.0])
+    with pytest.raises(ValueError):
+        align_panel(prices, "zero")
+
+def test_panel_load(tmp_path):
+    StubPanelData.downloads = 0
+    store = StubPanelData(tmp_path / "prices.parquet", TICKERS, missing="ffill")
+
+    fetched = store.load()
+    loaded = StubPanelData(tmp_path / "prices.parquet", TICKERS, missing="ffill").load()
+
+    assert StubPanelData.downloads == 1
+    assert list(fetched.columns) == ["BTC", "ETH", "SOL"]
+    pd.testing.assert_frame_equal(loaded, fetched, check_freq=False)
@@ -0,0 +1,68 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Backtest import Instrumentation
+from Backtest.Instrumentation import count, instrument, span
+from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+from Backtest.models.LocalDataStorage import LocalDataStore
+
+def make_prices(n_bars=300, seed=7):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n_bars, freq="D")
+    returns = rng.normal(0, 0.03, size=(n_bars, 2))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=["BTC", "ETH"])
+
+def test_disabled_records_nothing():
+    Instrumentation.disable()
+    Instrumentation.get_recorder().reset()
+    with span("stage"):
+        count("events")
+    assert span("stage") is span("other")
+    assert Instrumentation.get_recorder().to_dict() == {"spans": {}, "counters": {}}
+
+def test_spans_and_counters_of_a_run(tmp_path):
+    prices = make_prices()
+    path = tmp_path / "prices.npz"
+    LocalDataStore(path).write(prices)
+
+    report_path = tmp_path / "report.json"
+    with instrument(report=report_path, format="json") as recorder:
+        analysis = MomentumAnalysis(LocalDataStore(path).load())
+        analysis.sweep([5, 10], [20, 30])
+        analysis.MomentumBasedLongOnly(5, 20)
+    assert not Instrumentation.is_enabled()
+
+    summary = recorder.summary()
+    for stage in ("storage.read", "momentum.indicators", "momentum.from_signals", "analysis.metrics"):
+        assert summary[stage]["calls"] >= 1
+        assert summary[stage]["p50"] <= summary[stage]["p99"] <= summary[stage]["max"] <= summary[stage]["total"]
+    assert recorder.counters == {"rows_loaded": 300, "portfolios_built": 5}
+
+    assert json.loads(report_path.read_text()) == json.loads(recorder.report("json"))
+    table = recorder.report()
+    assert "momentum.from_signals" in table and "portfolios_built" in table
+
+def test_threads_record_every_count_and_span():
+    # Switching threads often makes an unguarded read-modify-write lose updates.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def work(_):
+        for _ in range(20000):
+            count("events")
+        for _ in range(1000):
+            with span("stage"):
+                pass
+
+    try:
+        with instrument() as recorder:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(work, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert recorder.counters == {"events": 160000}
+    assert recorder.summary()["stage"]["calls"] == 8000
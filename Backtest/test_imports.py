@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries loaded on first use only: plotting, statistics, simulation and network clients.
+LAZY = ("plotly", "matplotlib", "scipy", "vectorbt", "httpx", "requests", "dotenv")
+
+# Cold import budgets in seconds, well above the measured times (pandas alone takes ~0.4s).
+BUDGETS = {
+    "Backtest.controllers.Analysis": 1.5,
+    "Backtest.controllers.Coinglass": 1.5,
+    "Backtest.models.CoinGlassData": 1.5,
+    "Backtest.models.ResultCache": 1.5,
+    "Backtest.controllers.Streaming": 0.5,
+}
+
+def cold_import(module):
+    """Import module in a fresh interpreter; return (cumulative seconds, loaded top-level packages)."""
+    code = f"import sys, json; import {module}; print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            check=True, capture_output=True, text=True, cwd=ROOT)
+    seconds = next(int(line.split("|")[1]) / 1e6 for line in result.stderr.splitlines()
+                   if line.split("|")[-1].strip() == module)
+    return (seconds, set(json.loads(result.stdout)))
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_import_budget(module):
+    (seconds, packages) = cold_import(module)
+    assert not packages & set(LAZY), f"{module} imports {sorted(packages & set(LAZY))} at import time"
+    assert seconds < BUDGETS[module], f"{module} took {seconds:.2f}s to import"
@@ -0,0 +1,168 @@
+"""
+Benchmark per-generation time and peak memory of evolving a family of blended signal portfolios.
+
+Three layouts run the same hill climbing loop, each in a fresh interpreter on synthetic hourly
+prices with MA crossover signals:
+
+    baseline     The EvolutionaryModel of the baseline commit (the root commit by default), loaded
+                 from git: every member is an EvolutionaryPortfolio and optimize_genes replaces the
+                 family with copy.deepcopy of the best one.
+    individuals  The same loop over the current EvolutionaryPortfolio, whose clone() copies the
+                 weights and shares the PopulationContext, blended signals and portfolio.
+    family       EvolutionaryPortfolioFamily, where members are rows of a weights matrix.
+
+Usage:
+    python benchmarks/bench_evolution.py [--bars N] [--population N] [--generations N] [--baseline REV]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+import numpy as np
+import pandas as pd
+import psutil
+import vectorbt as vbt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Backtest.models.EvolutionaryModel import EvolutionaryPortfolio, EvolutionaryPortfolioFamily
+
+WINDOWS = [(5, 30), (10, 50), (15, 80), (20, 100), (30, 150), (50, 200)]
+
+
+def make_inputs(n_bars, seed=1337):
+    """Return synthetic hourly closes and the entries and exits of several MA crossovers."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2019-01-01", periods=n_bars, freq="h")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars))), index=index)
+    entries, exits = [], []
+    for (short_window, long_window) in WINDOWS:
+        fast_ma = vbt.MA.run(close, short_window)
+        slow_ma = vbt.MA.run(close, long_window)
+        entries.append(fast_ma.ma_crossed_above(slow_ma).to_numpy())
+        exits.append(fast_ma.ma_crossed_below(slow_ma).to_numpy())
+    return close, entries, exits
+
+
+def root_commit():
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout.split()[0]
+
+
+def load_baseline(revision):
+    """Return the EvolutionaryModel module as of revision, loaded from git."""
+    path = "Backtest/models/EvolutionaryModel.py"
+    source = subprocess.run(["git", "show", f"{revision}:{path}"], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    module = types.ModuleType("baseline_EvolutionaryModel")
+    exec(compile(source, f"{revision}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def run_baseline(close, entries, exits, population, generations, revision):
+    """The baseline family: evolve every member, then deep copy the best over the family."""
+    baseline = load_baseline(revision)
+    weights = np.ones(len(entries)) / len(entries)
+    family = baseline.EvolutionaryPortfolioFamily(close, weights, entries, exits, num_portfolios=population,
+                                                  init_cash=100000)
+    for _ in range(generations):
+        family.evolve_family()
+        family.optimize_genes()
+        yield
+
+
+def run_individuals(close, entries, exits, population, generations, revision):
+    """The baseline loop over the current EvolutionaryPortfolio, cloning with a shared context."""
+    weights = np.ones(len(entries)) / len(entries)
+    members = [EvolutionaryPortfolio(close, weights, entries, exits, init_cash=100000) for _ in range(population)]
+    for _ in range(generations):
+        for member in members:
+            member.evolve_portfolio()
+        best = max(members, key=lambda member: member.fitness())
+        members = [best.clone() for _ in range(population)]
+        yield
+
+
+def run_family(close, entries, exits, population, generations, revision):
+    """EvolutionaryPortfolioFamily with the fitness cache disabled, so every candidate is simulated."""
+    weights = np.ones(len(entries)) / len(entries)
+    family = EvolutionaryPortfolioFamily(close, weights, entries, exits, num_portfolios=population,
+                                         cache=False, init_cash=100000)
+    for _ in range(generations):
+        family.evolve_family()
+        family.optimize_genes()
+        yield
+
+
+LAYOUTS = {"baseline": run_baseline, "individuals": run_individuals, "family": run_family}
+
+
+def measure(layout, n_bars, population, generations, revision):
+    """
+    Return the mean seconds per generation and the peak rss growth in MB of one layout, and the
+    peak and retained MB traced by tracemalloc in a second, warm run.
+
+    RSS includes numba compilation and memory the allocator keeps after it is freed, so the traced
+    sizes of the warm run show the memory the layout itself allocates. Retained is what is still
+    allocated after the last generation, including garbage cycles not collected yet.
+    """
+    (close, entries, exits) = make_inputs(n_bars)
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    peak = rss_before
+    timings = []
+    start = time.perf_counter()
+    for _ in LAYOUTS[layout](close, entries, exits, population, generations, revision):
+        now = time.perf_counter()
+        timings.append(now - start)
+        peak = max(peak, process.memory_info().rss)
+        start = time.perf_counter()
+    rss_mb = (peak - rss_before) / 2**20
+    # The first generation includes numba compilation in every layout.
+    seconds = float(np.mean(timings[1:] or timings))
+
+    tracemalloc.start()
+    for _ in LAYOUTS[layout](close, entries, exits, population, generations, revision):
+        retained = tracemalloc.get_traced_memory()[0]
+    (_, traced_peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "rss_mb": rss_mb,
+            "traced_peak_mb": traced_peak / 2**20, "retained_mb": retained / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=3 * 365 * 24)
+    parser.add_argument("--population", type=int, default=10)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--baseline", help="The revision of the baseline layout. Defaults to the root commit.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    revision = args.baseline or root_commit()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.bars, args.population, args.generations, revision)))
+        return
+
+    print(f"{args.bars} bars, {len(WINDOWS)} signals, population {args.population}, {args.generations} generations, "
+          f"baseline {revision[:7]}")
+    print(f"{'layout':<12}{'generation (ms)':>18}{'peak rss (MB)':>16}{'peak traced (MB)':>18}{'retained (MB)':>16}")
+    for layout in LAYOUTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--bars", str(args.bars), "--population", str(args.population),
+             "--generations", str(args.generations), "--baseline", revision, "--child", layout],
+            check=True, capture_output=True, text=True
+        ).stdout
+        measured = json.loads(output.strip().splitlines()[-1])
+        print(f"{layout:<12}{measured['seconds'] * 1000:>18.1f}{measured['rss_mb']:>16.1f}"
+              f"{measured['traced_peak_mb']:>18.1f}{measured['retained_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
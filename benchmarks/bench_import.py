@@ -0,0 +1,76 @@
+"""
+Benchmark the cold import time of the Backtest modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, and the cumulative
+time of the module is reported with its slowest dependencies. A module whose import pulls in
+plotting or network libraries it does not need shows them at the top of its list.
+
+Usage:
+    python benchmarks/bench_import.py [--top N] [--repeat N] [module ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "Backtest.controllers.Analysis",
+    "Backtest.controllers.Coinglass",
+    "Backtest.controllers.Correlation",
+    "Backtest.controllers.Streaming",
+    "Backtest.controllers.MomentumAnalysis",
+    "Backtest.models.CoinGlassData",
+    "Backtest.models.LocalDataStorage",
+    "Backtest.models.PriceCube",
+    "Backtest.models.ResultCache",
+    "Backtest.models.EvolutionaryModel",
+]
+
+
+def import_times(module=None):
+    """
+    Return {imported module: cumulative microseconds} of importing module in a fresh interpreter,
+    leaving out the modules the interpreter imports at startup.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        check=True, capture_output=True, text=True, cwd=ROOT
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        (_, cumulative, name) = line.split("|")
+        times[name.strip()] = int(cumulative)
+    if module is None:
+        return times
+    startup = import_times()
+    return {name: us for (name, us) in times.items() if name not in startup}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest dependencies to show.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported.")
+    args = parser.parse_args()
+
+    print(f"{'module':<42}{'import (ms)':>12}")
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        times = min(runs, key=lambda run: run[module])
+        print(f"{module:<42}{times[module] / 1000:>12.1f}")
+        # The slowest import of each third party package, e.g. vectorbt rather than vectorbt.generic.
+        packages = {}
+        for (name, us) in times.items():
+            package = name.split(".")[0]
+            if package != "Backtest" and us > packages.get(package, (0, ""))[0]:
+                packages[package] = (us, name)
+        for (us, name) in sorted(packages.values(), reverse=True)[:args.top]:
+            print(f"    {name:<38}{us / 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
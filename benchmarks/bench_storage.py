@@ -0,0 +1,92 @@
+"""
+Benchmark LocalDataStore load time and memory for each storage format.
+
+Converts the BTC/ETH/SOL/BNB price caches to every storage format and loads each
+one in a fresh interpreter, reporting the best load time and the RSS held by the loaded frames.
+If the caches are missing from the data directory, synthetic hourly series are used instead.
+
+Usage:
+    python benchmarks/bench_storage.py [data_dir] [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backtest.models.LocalDataStorage import STORAGE_BACKENDS, LocalDataStore, migrate_csv_store
+
+ASSETS = ["btc", "eth", "sol", "bnb"]
+
+
+def write_synthetic_caches(directory, n_bars=5 * 365 * 24, seed=1337):
+    """Write hourly close series shaped like VBTYFData caches for each asset."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2019-01-01", periods=n_bars, freq="h", tz="UTC", name="Date")
+    for asset in ASSETS:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+        pd.DataFrame({"Close": close}, index=index).to_csv(os.path.join(directory, f"{asset}_price.csv"))
+
+
+def measure(paths, repeat):
+    """Load every path with LocalDataStore and return (best seconds, rss growth in MB)."""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    frames = [LocalDataStore(path).read() for path in paths]
+    rss_after = process.memory_info().rss
+    del frames
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = [LocalDataStore(path).read() for path in paths]
+        timings.append(time.perf_counter() - start)
+        del frames
+    return min(timings), (rss_after - rss_before) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", nargs="?", default="data")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        seconds, rss_mb = measure(args.child, args.repeat)
+        print(json.dumps({"seconds": seconds, "rss_mb": rss_mb}))
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_paths = [os.path.join(args.data_dir, f"{asset}_price.csv") for asset in ASSETS]
+        if all(os.path.exists(path) for path in csv_paths):
+            for path in csv_paths:
+                STORAGE_BACKENDS["csv"].write(STORAGE_BACKENDS["csv"].read(path), os.path.join(work_dir, os.path.basename(path)))
+        else:
+            print(f"Price caches not found in {args.data_dir}, using synthetic hourly data.")
+            write_synthetic_caches(work_dir)
+
+        results = {"csv": sorted(os.path.join(work_dir, f"{asset}_price.csv") for asset in ASSETS)}
+        for format in ("parquet", "feather", "npy"):
+            results[format] = migrate_csv_store(work_dir, format=format)
+
+        print(f"{'format':<10}{'load (ms)':>12}{'rss (MB)':>12}")
+        for format, paths in results.items():
+            output = subprocess.run(
+                [sys.executable, __file__, "--repeat", str(args.repeat), "--child", *paths],
+                check=True, capture_output=True, text=True
+            ).stdout
+            measured = json.loads(output.strip().splitlines()[-1])
+            print(f"{format:<10}{measured['seconds'] * 1000:>12.2f}{measured['rss_mb']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
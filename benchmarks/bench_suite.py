@@ -0,0 +1,238 @@
+"""
+Time and measure the peak memory of every hot path at several data scales.
+
+Each case is set up on seeded synthetic prices (benchmarks/synthetic.py), run once to warm up
+numba and vectorbt caches, run once under tracemalloc for the peak memory it allocates, and then
+timed. The results are written as JSON, by default to benchmarks/results/<commit>.json, so runs
+of two commits can be compared with --compare.
+
+Usage:
+    python benchmarks/bench_suite.py [--scales small medium] [--cases NAME ...] [--repeat N] [--output PATH]
+    python benchmarks/bench_suite.py --compare BASELINE.json [CANDIDATE.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import make_close
+
+# (assets, bars) of each scale, hourly bars.
+SCALES = {
+    "small": (4, 2_000),
+    "medium": (8, 20_000),
+    "large": (16, 100_000),
+}
+
+MA_WINDOWS = [(5, 30), (10, 50), (15, 80), (20, 100), (30, 150), (50, 200)]
+
+
+def ma_signals(close):
+    """Return the entries and exits of several MA crossovers of one close series."""
+    import vectorbt as vbt
+
+    entries, exits = [], []
+    for (short_window, long_window) in MA_WINDOWS:
+        fast_ma = vbt.MA.run(close, short_window)
+        slow_ma = vbt.MA.run(close, long_window)
+        entries.append(fast_ma.ma_crossed_above(slow_ma).to_numpy())
+        exits.append(fast_ma.ma_crossed_below(slow_ma).to_numpy())
+    return entries, exits
+
+
+def case_local_data_store_load(prices, work_dir, format):
+    from Backtest.models.LocalDataStorage import LocalDataStore
+
+    path = os.path.join(work_dir, f"prices.{format}")
+    LocalDataStore(path).write(prices)
+    return lambda: LocalDataStore(path).load()
+
+
+def case_divergence_indicator(prices, work_dir):
+    from Backtest.controllers.PairTradeAnalysis import divergence_indicator
+
+    values = prices.iloc[:, :2].to_numpy()
+    return lambda: divergence_indicator(values)
+
+
+def case_generate_pairs(prices, work_dir):
+    from Backtest.controllers.PairTradeAnalysis import generate_pairs
+
+    return lambda: generate_pairs(prices)
+
+
+def case_blend_signals(prices, work_dir):
+    from Backtest.models.EvolutionaryModel import blend_signals
+
+    (entries, exits) = ma_signals(prices.iloc[:, 0])
+    weights = np.random.default_rng(0).random(len(entries))
+    return lambda: blend_signals(entries, exits, weights)
+
+
+def case_momentum_long_only(prices, work_dir):
+    from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+
+    analysis = MomentumAnalysis(prices)
+    return lambda: analysis.MomentumBasedLongOnly(overwrite=True)
+
+
+def case_momentum_long_short(prices, work_dir):
+    from Backtest.controllers.MomentumAnalysis import MomentumAnalysis
+
+    analysis = MomentumAnalysis(prices)
+    return lambda: analysis.MomentumBasedLongShort(overwrite=True)
+
+
+def case_mean_reversion_long_only(prices, work_dir):
+    from Backtest.controllers.MeanReversionAnalysis import MeanReversionAnalysis
+
+    analysis = MeanReversionAnalysis(prices)
+    return lambda: analysis.MeanReversionBasedLongOnly(overwrite=True)
+
+
+def case_pair_corr_long_only(prices, work_dir):
+    from Backtest.controllers.PairTradeAnalysis import PairTradeAnalysis
+
+    analysis = PairTradeAnalysis(prices)
+    pair = tuple(prices.columns[:2])
+    return lambda: analysis.PairCorrLongOnly(pair, overwrite=True)
+
+
+def case_family_generation(prices, work_dir, population=10):
+    from Backtest.models.EvolutionaryModel import EvolutionaryPortfolioFamily
+
+    close = prices.iloc[:, 0]
+    (entries, exits) = ma_signals(close)
+    weights = np.ones(len(entries)) / len(entries)
+    family = EvolutionaryPortfolioFamily(close, weights, entries, exits, num_portfolios=population,
+                                         seed=0, cache=False, init_cash=100000)
+    return lambda: family.run_simulation(n_steps=1, generation_size=1)
+
+
+CASES = {
+    "LocalDataStore.load[csv]": lambda prices, work_dir: case_local_data_store_load(prices, work_dir, "csv"),
+    "LocalDataStore.load[parquet]": lambda prices, work_dir: case_local_data_store_load(prices, work_dir, "parquet"),
+    "LocalDataStore.load[npz]": lambda prices, work_dir: case_local_data_store_load(prices, work_dir, "npz"),
+    "divergence_indicator": case_divergence_indicator,
+    "generate_pairs": case_generate_pairs,
+    "blend_signals": case_blend_signals,
+    "MomentumAnalysis.MomentumBasedLongOnly": case_momentum_long_only,
+    "MomentumAnalysis.MomentumBasedLongShort": case_momentum_long_short,
+    "MeanReversionAnalysis.MeanReversionBasedLongOnly": case_mean_reversion_long_only,
+    "PairTradeAnalysis.PairCorrLongOnly": case_pair_corr_long_only,
+    "EvolutionaryPortfolioFamily.run_simulation[1 generation]": case_family_generation,
+}
+
+
+def measure(run, repeat):
+    """Return (best seconds, peak MB allocated) of run, after one warm-up call."""
+    run()
+    tracemalloc.start()
+    run()
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), peak / 2**20
+
+
+def environment():
+    """Return the commit and versions the results were measured with."""
+    import pandas as pd
+    import vectorbt as vbt
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    check=True, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        (commit, dirty) = ("unknown", False)
+    return {
+        "commit": commit + ("-dirty" if dirty else ""),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "vectorbt": vbt.__version__,
+    }
+
+
+def run_suite(scales, cases, repeat):
+    """Return the result record of every case at every scale."""
+    results = []
+    for scale in scales:
+        (n_assets, n_bars) = SCALES[scale]
+        prices = make_close(n_assets, n_bars)
+        with tempfile.TemporaryDirectory() as work_dir:
+            for name in cases:
+                (seconds, peak_mb) = measure(CASES[name](prices, work_dir), repeat)
+                results.append({"case": name, "scale": scale, "assets": n_assets, "bars": n_bars,
+                                "seconds": seconds, "peak_mb": peak_mb})
+                print(f"{name:<58}{scale:<8}{seconds * 1000:>12.2f}{peak_mb:>12.2f}", flush=True)
+    return results
+
+
+def compare(baseline_path, candidate_path):
+    """Print the time and memory ratio of every case measured in both result files."""
+    with open(baseline_path) as file:
+        baseline = {(r["case"], r["scale"]): r for r in json.load(file)["results"]}
+    with open(candidate_path) as file:
+        candidate = json.load(file)["results"]
+
+    print(f"{'case':<58}{'scale':<8}{'time ratio':>12}{'peak ratio':>12}")
+    for result in candidate:
+        base = baseline.get((result["case"], result["scale"]))
+        if base is None:
+            continue
+        time_ratio = result["seconds"] / base["seconds"]
+        peak_ratio = result["peak_mb"] / base["peak_mb"] if base["peak_mb"] else float("nan")
+        print(f"{result['case']:<58}{result['scale']:<8}{time_ratio:>12.2f}{peak_ratio:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), metavar="NAME")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Defaults to benchmarks/results/<commit>.json.")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="Compare a baseline result file with a candidate, or with a new run.")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        compare(*args.compare)
+        return
+
+    meta = environment()
+    print(f"{'case':<58}{'scale':<8}{'time (ms)':>12}{'peak (MB)':>12}")
+    results = run_suite(args.scales, args.cases, args.repeat)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{meta['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump({"meta": meta, "scales": {scale: SCALES[scale] for scale in args.scales}, "results": results},
+                  file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(args.compare[0], output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Seeded synthetic market data for the benchmarks.
+
+Prices follow a geometric random walk driven by one common market factor plus noise per asset,
+so assets are correlated like crypto majors and generate_pairs finds pairs at every scale.
+"""
+import numpy as np
+import pandas as pd
+
+FIELDS = ("Open", "High", "Low", "Close")
+
+
+def make_close(n_assets=4, n_bars=10_000, freq="h", seed=1337, volatility=0.01, market_share=0.8):
+    """
+    Return a (bars x assets) frame of close prices.
+
+    Args:
+        n_assets (int): The number of assets, named A0, A1, ...
+        n_bars (int): The number of bars.
+        freq (str): The bar frequency, e.g. "h" or "D".
+        seed (int): The random seed; the same arguments always give the same prices.
+        volatility (float): The standard deviation of the log return of each bar.
+        market_share (float): The share of each asset's variance explained by the market factor.
+    """
+    return make_ohlc(n_assets, n_bars, freq, seed, volatility, market_share)["Close"]
+
+
+def make_ohlc(n_assets=4, n_bars=10_000, freq="h", seed=1337, volatility=0.01, market_share=0.8):
+    """
+    Return {"Open", "High", "Low", "Close"} frames of (bars x assets) prices. See make_close.
+
+    Each bar opens at the previous close, and high and low extend beyond the open and close by a
+    random fraction of the bar's volatility.
+    """
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 1, (n_bars, 1))
+    noise = rng.normal(0, 1, (n_bars, n_assets))
+    log_returns = volatility * (np.sqrt(market_share) * market + np.sqrt(1 - market_share) * noise)
+    close = 100 * np.exp(np.cumsum(log_returns, axis=0))
+    open_ = np.vstack([np.full((1, n_assets), 100.0), close[:-1]])
+    wicks = volatility * np.abs(rng.normal(0, 1, (2, n_bars, n_assets)))
+    high = np.maximum(open_, close) * (1 + wicks[0])
+    low = np.minimum(open_, close) * (1 - wicks[1])
+
+    index = pd.date_range("2019-01-01", periods=n_bars, freq=freq, tz="UTC", name="Date")
+    columns = [f"A{i}" for i in range(n_assets)]
+    return {field: pd.DataFrame(values, index=index, columns=columns)
+            for (field, values) in zip(FIELDS, (open_, high, low, close))}